@@ -8,8 +8,10 @@ through the Model Context Protocol (MCP).
 
 import logging
 import sys
+import threading
 import traceback
 import os
+from urllib.parse import urlsplit
 from mcp.server.fastmcp import FastMCP
 
 # Import from our reorganized structure
@@ -18,7 +20,15 @@ from src.core import formatters
 from src.core import prompts
 from src.core import tools
 from src.core import resources
-from src.core.cache import APICache
+from src.core.cache import open_server_cache
+from src.core.cache_bundle import import_bundle
+from src.core.cache_policy import CAMPAIGN_CACHE_TTL_SECONDS
+from src.core.class_spells import ClassSpellLists
+from src.core.http_client import configure_client
+from src.core.monster_index import MonsterFacets
+from src.core.priority import background_priority
+from src.core.rate_limit import RateLimit, RateLimiters
+from src.core.srd_store import SRDStore, ingest as ingest_srd
 from src.core.supabase_client import SupabaseClient
 
 # Configure more detailed logging
@@ -37,6 +47,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Approximate memory bound for the in-memory API cache
+CACHE_MAX_BYTES = int(os.environ.get("DND_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Timeout for every outgoing HTTP request, and keep-alive connections pooled per host
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("DND_HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("DND_HTTP_POOL_MAXSIZE", "16"))
+
+# Outbound request limits per upstream: sustained rate, burst and concurrent requests
+DND_API_RATE_LIMIT = RateLimit(rate=float(os.environ.get("DND_API_RATE_PER_SECOND", "20")),
+                               burst=int(os.environ.get("DND_API_BURST", "40")),
+                               max_in_flight=int(os.environ.get("DND_API_MAX_IN_FLIGHT", "8")))
+SUPABASE_RATE_LIMIT = RateLimit(rate=float(os.environ.get("SUPABASE_RATE_PER_SECOND", "10")),
+                                burst=int(os.environ.get("SUPABASE_BURST", "20")),
+                                max_in_flight=int(os.environ.get("SUPABASE_MAX_IN_FLIGHT", "4")))
+
+# First retry delay when SRD ingestion loads nothing (e.g. offline); doubled up to the store's max_age
+SRD_INGEST_RETRY_SECONDS = float(os.environ.get("DND_SRD_INGEST_RETRY_SECONDS", "60"))
+
 
 def main():
     """Main entry point for the D&D Knowledge Navigator server."""
@@ -53,16 +81,69 @@ def main():
         app = FastMCP("dnd-knowledge-navigator")
         print("FastMCP server created successfully", file=sys.stderr)
 
-        # Create shared cache with 24-hour TTL and persistence
+        # One pooled keep-alive session for the D&D 5e API and Supabase
+        rate_limits = {urlsplit(api_helpers.API_BASE_URL).netloc: DND_API_RATE_LIMIT}
+        if os.environ.get("SUPABASE_URL"):
+            rate_limits[urlsplit(os.environ["SUPABASE_URL"]).netloc] = SUPABASE_RATE_LIMIT
+        http_client = configure_client(timeout=HTTP_TIMEOUT_SECONDS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                                       limiters=RateLimiters(rate_limits))
+
+        # Create shared cache with per-namespace TTLs and journal-backed persistence.
+        # The cache directory may be shared by several server processes (one per client).
         cache_dir = os.path.join(os.path.dirname(__file__), "cache")
-        cache = APICache(ttl_hours=24, persistent=True, cache_dir=cache_dir)
+        cache = open_server_cache(cache_dir, max_bytes=CACHE_MAX_BYTES, lazy=True)
+
+        # Preload a pre-built SRD bundle so fresh deployments start warm without network calls
+        bundle_path = os.environ.get("DND_CACHE_BUNDLE")
+        if bundle_path:
+            try:
+                imported = import_bundle(cache, bundle_path)
+                print(f"Imported {imported} cache entries from bundle {bundle_path}", file=sys.stderr)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Failed to import cache bundle {bundle_path}: {e}", file=sys.stderr)
+        # Category lists are read by nearly every tool, so load them before the first call
+        cache.warm_up(prefixes=("dnd_categories", "dnd_items_"))
         print(
-            f"API cache initialized (24-hour TTL, persistent cache in {cache_dir})", file=sys.stderr)
+            f"API cache initialized (24-hour SRD TTL, {CAMPAIGN_CACHE_TTL_SECONDS}-second campaign TTL, "
+            f"{CACHE_MAX_BYTES // (1024 * 1024)} MB memory bound, "
+            f"persistent journal cache in {cache_dir})", file=sys.stderr)
+
+        # Local SRD store; tools query it for each category once fully ingested.
+        # Ingestion reads the persistent cache first, so restarts cost few requests.
+        srd_store = SRDStore(os.path.join(cache_dir, "srd.sqlite3"))
+        stop_ingesting = threading.Event()
+
+        def ingest_in_background() -> None:
+            # Categories are refreshed once they are older than the store's max_age;
+            # a run that loads nothing is retried sooner, with a growing backoff
+            retry_seconds = SRD_INGEST_RETRY_SECONDS
+            while not stop_ingesting.is_set():
+                try:
+                    with background_priority():
+                        counts = ingest_srd(srd_store, cache)
+                except Exception as e:
+                    logger.exception(f"SRD ingestion failed: {e}")
+                    counts = {}
+                max_age = srd_store.max_age.total_seconds()
+                if counts:
+                    print(f"SRD store holds {sum(counts.values())} items from {len(counts)} categories",
+                          file=sys.stderr)
+                    retry_seconds = SRD_INGEST_RETRY_SECONDS
+                    stop_ingesting.wait(max_age)
+                else:
+                    print(f"SRD ingestion loaded nothing; retrying in {retry_seconds:.0f}s", file=sys.stderr)
+                    stop_ingesting.wait(retry_seconds)
+                    retry_seconds = min(retry_seconds * 2, max_age)
+
+        ingest_thread = threading.Thread(target=ingest_in_background, daemon=True)
+        ingest_thread.start()
 
         # Register D&D 5e API components
         resources.register_resources(app, cache)
-        tools.register_tools(app, cache)
-        prompts.register_prompts(app)
+        tools.register_tools(app, cache, store=srd_store)
+        class_spells = ClassSpellLists(srd_store, cache)
+        prompts.register_prompts(app, cache, class_spells=class_spells,
+                                 monster_facets=MonsterFacets(srd_store, cache))
 
         # Initialize Supabase client for campaign database (optional)
         supabase_url = os.environ.get("SUPABASE_URL")
@@ -74,7 +155,8 @@ def main():
                 api_url=supabase_url,
                 api_key=supabase_key,
                 cache=cache,
-                cache_prefix="campaign"
+                cache_prefix="campaign",
+                timeout=HTTP_TIMEOUT_SECONDS
             )
 
             # Verify connection
@@ -82,7 +164,7 @@ def main():
             if health.get("connected"):
                 print("Supabase connected successfully", file=sys.stderr)
                 # Register campaign tools
-                tools.register_campaign_tools(app, supabase_client)
+                tools.register_campaign_tools(app, supabase_client, class_spells=class_spells)
             else:
                 print(f"Warning: Supabase connection failed: {health.get('error')}", file=sys.stderr)
                 print("Campaign tools will not be available", file=sys.stderr)
@@ -93,6 +175,11 @@ def main():
         # Run the app
         print("Running FastMCP app...", file=sys.stderr)
         app.run()
+        stop_ingesting.set()
+        ingest_thread.join(timeout=5)
+        cache.close()
+        srd_store.close()
+        http_client.close()
         print("App run completed", file=sys.stderr)
         return 0
     except Exception as e:
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional, Callable
 from enum import Enum
 import time
 import functools
+import inspect
 
 
 class ToolCategory(Enum):
@@ -109,36 +110,44 @@ def track_tool_usage(category: ToolCategory,
         def output_summary_func(x): return str(
             x)[:100] + "..." if len(str(x)) > 100 else str(x)
 
+    def record(func, args, kwargs, result, start_time):
+        # Generate input summary
+        args_summary = ", ".join(input_summary_func(arg) for arg in args)
+        kwargs_summary = ", ".join(
+            f"{k}={input_summary_func(v)}" for k, v in kwargs.items())
+        input_summary = f"{args_summary}{', ' if args_summary and kwargs_summary else ''}{kwargs_summary}"
+
+        # Calculate execution time
+        execution_time = time.time() - start_time
+
+        # Generate output summary
+        output_summary = output_summary_func(result)
+
+        # Create and add tool usage record
+        usage = ToolUsage(
+            tool_name=func.__name__,
+            category=category,
+            input_summary=input_summary,
+            output_summary=output_summary,
+            execution_time=execution_time
+        )
+        tool_tracker.add_usage(usage)
+
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.time()
+                result = await func(*args, **kwargs)
+                record(func, args, kwargs, result, start_time)
+                return result
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
-
-            # Generate input summary
-            args_summary = ", ".join(input_summary_func(arg) for arg in args)
-            kwargs_summary = ", ".join(
-                f"{k}={input_summary_func(v)}" for k, v in kwargs.items())
-            input_summary = f"{args_summary}{', ' if args_summary and kwargs_summary else ''}{kwargs_summary}"
-
-            # Execute the function
             result = func(*args, **kwargs)
-
-            # Calculate execution time
-            execution_time = time.time() - start_time
-
-            # Generate output summary
-            output_summary = output_summary_func(result)
-
-            # Create and add tool usage record
-            usage = ToolUsage(
-                tool_name=func.__name__,
-                category=category,
-                input_summary=input_summary,
-                output_summary=output_summary,
-                execution_time=execution_time
-            )
-            tool_tracker.add_usage(usage)
-
+            record(func, args, kwargs, result, start_time)
             return result
         return wrapper
     return decorator
@@ -1,57 +1,166 @@
 #!/usr/bin/env python3
 import sys
-import json
-import urllib.request
-import urllib.error
+
+from src.core.cache import Uncached
+from src.core.cache_keys import normalize_category, normalize_index, category_items_key, item_key
+from src.core.http_client import fetch_json
 
 # D&D API endpoint
 API_BASE_URL = "https://www.dnd5eapi.co/api"
 
 
-def validate_dnd_entity(endpoint: str, name: str) -> bool:
-    """Check if an entity exists in the D&D API."""
-    if not name:
-        return False
-
-    try:
-        name = name.lower().replace(' ', '-')
-        url = f"{API_BASE_URL}/{endpoint}/{name}"
-        print(f"Validating entity: {url}", file=sys.stderr)
-
-        with urllib.request.urlopen(url) as response:
-            return response.status == 200
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            print(f"Entity not found: {endpoint}/{name}", file=sys.stderr)
-            return False
-        print(f"HTTP error validating entity: {e}", file=sys.stderr)
-        return False
-    except Exception as e:
-        print(f"Error validating entity: {e}", file=sys.stderr)
-        return False
-
-
-def fetch_dnd_entity(endpoint: str, name: str) -> dict:
-    """Fetch entity details from the D&D API."""
-    if not name:
+def validate_dnd_entity(endpoint: str, name: str, cache=None) -> bool:
+    """Check if an entity exists in the D&D API.
+
+    The entity is fetched through ``fetch_dnd_entity``, so with a cache a
+    following fetch of the same entity is answered without a request.
+    """
+    return bool(fetch_dnd_entity(endpoint, name, cache=cache))
+
+
+def fetch_dnd_entity(endpoint: str, name: str, cache=None) -> dict:
+    """Fetch entity details from the D&D API.
+
+    Names are normalized to API indexes ("Tasha's Hideous Laughter" ->
+    "tashas-hideous-laughter"). When a cache is given, entities are cached
+    under the same key the tools and resources use, recent "not found"
+    results are answered without a request, and 404s are recorded as
+    negative entries.
+    """
+    endpoint = normalize_category(endpoint)
+    index = normalize_index(name)
+    if not endpoint or not index:
         return {}
 
-    try:
-        name = name.lower().replace(' ', '-')
-        url = f"{API_BASE_URL}/{endpoint}/{name}"
-        print(f"Fetching entity: {url}", file=sys.stderr)
+    cache_key = item_key(endpoint, index)
+    if cache is not None and cache.get_negative(cache_key):
+        return {}
 
-        with urllib.request.urlopen(url) as response:
-            if response.status == 200:
-                return json.loads(response.read())
+    def load() -> dict:
+        url = f"{API_BASE_URL}/{endpoint}/{index}"
+        print(f"Fetching entity: {url}", file=sys.stderr)
+        try:
+            result = fetch_json(url, cache=cache, cache_key=cache_key)
+        except Exception as e:
+            print(f"Error fetching entity: {e}", file=sys.stderr)
+            return {}
+        if result.from_cache:
+            return Uncached(result.data) if result.stale else result.data
+        if result.status_code != 200:
+            print(f"HTTP {result.status_code} fetching entity: {endpoint}/{index}", file=sys.stderr)
+            if result.status_code == 404 and cache is not None:
+                cache.set_negative(cache_key)
             return {}
-    except urllib.error.HTTPError as e:
-        print(f"HTTP error fetching entity: {e}", file=sys.stderr)
+        data = result.data
+        data["source"] = "D&D 5e API"
+        return data
+
+    if cache is None:
+        return load()
+    return cache.get_or_fetch(cache_key, load, cacheable=bool) or {}
+
+
+def fetch_dnd_category(endpoint: str, cache=None) -> dict:
+    """Fetch the list of entities in a category from the D&D API.
+
+    Returns the same shape the category tools and resources cache under
+    ``dnd_items_{category}``: a dict with "category", "items" (each with
+    "name", "index", "description", "uri" and "source") and "count". Failures
+    return an empty dict.
+    """
+    endpoint = normalize_category(endpoint)
+    if not endpoint:
         return {}
-    except Exception as e:
-        print(f"Error fetching entity: {e}", file=sys.stderr)
+
+    cache_key = category_items_key(endpoint)
+    if cache is not None and cache.get_negative(cache_key):
         return {}
 
+    def load() -> dict:
+        url = f"{API_BASE_URL}/{endpoint}"
+        print(f"Fetching category: {url}", file=sys.stderr)
+        try:
+            result = fetch_json(url, cache=cache, cache_key=cache_key)
+        except Exception as e:
+            print(f"Error fetching category: {e}", file=sys.stderr)
+            return {}
+        if result.from_cache:
+            return Uncached(result.data) if result.stale else result.data
+        if result.status_code != 200:
+            print(f"HTTP {result.status_code} fetching category: {endpoint}", file=sys.stderr)
+            if result.status_code == 404 and cache is not None:
+                cache.set_negative(cache_key)
+            return {}
+        return category_items_from_api(endpoint, result.data)
+
+    if cache is None:
+        return load()
+    return cache.get_or_fetch(cache_key, load, cacheable=bool) or {}
+
+
+# Category descriptions for better resource discovery
+CATEGORY_DESCRIPTIONS = {
+    "ability-scores": "The six abilities that describe a character's physical and mental characteristics",
+    "alignments": "The moral and ethical attitudes and behaviors of creatures",
+    "backgrounds": "Character backgrounds and their features",
+    "classes": "Character classes with features, proficiencies, and subclasses",
+    "conditions": "Status conditions that affect creatures",
+    "damage-types": "Types of damage that can be dealt",
+    "equipment": "Items, weapons, armor, and gear for adventuring",
+    "equipment-categories": "Categories of equipment",
+    "feats": "Special abilities and features",
+    "features": "Class and racial features",
+    "languages": "Languages spoken throughout the multiverse",
+    "magic-items": "Magical equipment with special properties",
+    "magic-schools": "Schools of magic specialization",
+    "monsters": "Creatures and foes",
+    "proficiencies": "Skills and tools characters can be proficient with",
+    "races": "Character races and their traits",
+    "rule-sections": "Sections of the game rules",
+    "rules": "Game rules",
+    "skills": "Character skills tied to ability scores",
+    "spells": "Magic spells with effects, components, and descriptions",
+    "subclasses": "Specializations within character classes",
+    "subraces": "Variants of character races",
+    "traits": "Racial traits",
+    "weapon-properties": "Special properties of weapons"
+}
+
+
+def categories_from_api(data: dict) -> dict:
+    """Convert the API root listing to the cached ``dnd_categories`` shape."""
+    categories = []
+    for key in data.keys():
+        description = CATEGORY_DESCRIPTIONS.get(
+            key, f"Collection of D&D 5e {key}")
+        categories.append({
+            "name": key,
+            "description": description,
+            "uri": f"resource://dnd/items/{key}"
+        })
+
+    return {
+        "categories": categories,
+        "count": len(categories)
+    }
+
+
+def category_items_from_api(endpoint: str, data: dict) -> dict:
+    """Convert an API category listing to the cached ``dnd_items_{category}`` shape."""
+    items = [{
+        "name": item["name"],
+        "index": item["index"],
+        "description": f"Details about {item['name']}",
+        "uri": f"resource://dnd/item/{endpoint}/{item['index']}",
+        "source": "D&D 5e API"
+    } for item in data.get("results", [])]
+    return {
+        "category": endpoint,
+        "items": items,
+        "count": len(items),
+        "source": "D&D 5e API"
+    }
+
 
 def get_primary_ability(class_name: str) -> str:
     """Return the primary ability for a class."""
@@ -0,0 +1,176 @@
+"""
+Concurrent fetching for fan-out queries.
+
+A search across every category needs dozens of category lists and then the
+details of every candidate item. ``AsyncFetcher`` issues each wave of
+requests concurrently with ``httpx``, bounded by a semaphore, so an uncached
+query costs roughly one round trip per wave instead of one per request::
+
+    async with AsyncFetcher(cache) as fetcher:
+        results = await fetcher.fetch_all({item_key("spells", "fireball"): url})
+
+Requests revalidate cached entries, retry transient failures, honour the
+per-host circuit breakers and rate limits, and fall back to cached values exactly like
+``http_client.fetch_json``.
+"""
+
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+
+import httpx
+
+from src.core.cache import APICache
+from src.core.http_client import (FetchResult, POOL_MAXSIZE, get_client, conditional_headers,
+                                  result_from_response, stale_result)
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight at once during a fan-out
+DEFAULT_CONCURRENCY = POOL_MAXSIZE
+
+
+class AsyncFetcher:
+    """Fetch many JSON resources concurrently over one pooled async client.
+
+    A fetcher can be kept for the life of the server: its client (and the
+    keep-alive connections in its pool) is created on first use and reused
+    by every later wave on the same event loop. ``aclose`` releases it;
+    ``async with`` closes it on exit, for one-off batches.
+    """
+
+    def __init__(self, cache: Optional[APICache] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: Optional[float] = None):
+        """Initialize the fetcher.
+
+        Args:
+            cache: Cache holding values and validators for revalidation
+            concurrency: Maximum requests in flight at once
+            timeout: Request timeout in seconds (defaults to the shared client's)
+        """
+        self.cache = cache
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        await self._open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _open(self) -> httpx.AsyncClient:
+        """Return the client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            await self.aclose()
+        if self._client is None:
+            # Clients and semaphores are bound to the event loop they were first used on
+            limits = httpx.Limits(max_connections=self.concurrency,
+                                  max_keepalive_connections=self.concurrency)
+            timeout = self.timeout if self.timeout is not None else get_client().timeout
+            self._client = httpx.AsyncClient(timeout=timeout, limits=limits,
+                                             follow_redirects=True,
+                                             headers={"Accept": "application/json"})
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the client and its pooled connections.
+
+        A client opened on another event loop is closed on that loop if it is
+        still running, and otherwise discarded.
+        """
+        client, loop = self._client, self._loop
+        self._client, self._loop = None, None
+        if client is None:
+            return
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # Its loop is closed: the client is marked closed and its pool dropped,
+            # and the sockets are released with it
+            logger.debug(f"Discarded async client from a closed event loop: {e}")
+
+    async def fetch(self, url: str, cache_key: Optional[str] = None) -> FetchResult:
+        """Fetch one JSON resource.
+
+        Transient failures are retried, and the host's circuit breaker and rate
+        limiter are honoured, with the same policies as the shared ``HTTPClient``.
+
+        Args:
+            url: The URL to fetch
+            cache_key: Key the caller caches the result under
+
+        Returns:
+            The fetch result. If the request fails and a value is cached, it
+            is returned as a stale result. Other network errors are logged and
+            reported with status code 0 so one failure does not cancel the
+            whole wave.
+        """
+        headers, cached = conditional_headers(self.cache, cache_key)
+        http = await self._open()
+        client = get_client()
+        host = urlsplit(url).netloc
+        breaker = client.breakers.for_host(host)
+        if not breaker.allow():
+            logger.debug(f"Circuit open for {host}, not fetching {url}")
+            return stale_result(self.cache, cache_key) or FetchResult(0)
+        limiter = client.limiters.for_host(host)
+
+        response = None
+        try:
+            async with self._semaphore:
+                for attempt in range(client.retry.attempts):
+                    if attempt:
+                        await asyncio.sleep(client.retry.delay(attempt - 1))
+                    if limiter is not None:
+                        await limiter.acquire_async()
+                    try:
+                        response = await http.get(url, headers=headers)
+                    except httpx.HTTPError as e:
+                        logger.debug(f"Request failed for {url}: {e}")
+                        response = None
+                        continue
+                    finally:
+                        if limiter is not None:
+                            limiter.release()
+                    if response.status_code not in client.retry.retry_statuses:
+                        break
+        except BaseException:
+            # Cancelled or failed unexpectedly: still settle a half-open circuit's trial
+            breaker.record_failure()
+            raise
+
+        if response is None or response.status_code in client.retry.retry_statuses:
+            breaker.record_failure()
+            status_code = response.status_code if response is not None else 0
+            fallback = stale_result(self.cache, cache_key, status_code)
+            if fallback is not None:
+                return fallback
+            logger.warning(f"Request failed for {url} (status {status_code})")
+            return FetchResult(status_code)
+
+        breaker.record_success()
+        return result_from_response(response, cached, self.cache, cache_key)
+
+    async def fetch_all(self, urls: Dict[str, str]) -> Dict[str, FetchResult]:
+        """Fetch a wave of resources concurrently.
+
+        Args:
+            urls: Mapping of cache key to URL
+
+        Returns:
+            Mapping of cache key to fetch result
+        """
+        keys = list(urls)
+        results = await asyncio.gather(*(self.fetch(urls[key], key) for key in keys))
+        return dict(zip(keys, results))
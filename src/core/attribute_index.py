@@ -0,0 +1,123 @@
+"""
+Sorted numeric attribute indexes for range filters.
+
+The filter tools answer questions like "spells of level 1 to 3" or "equipment
+costing at most 10 gp". ``SortedAttributeIndex`` holds one category's result
+rows sorted by the attribute, so a range query is two bisections and a slice;
+no item details are read or parsed per query. ``AttributeIndexes`` keeps the
+built indexes and rebuilds one only when the data it was built from changes::
+
+    index = indexes.get("spells", stamp, lambda: [(spell["level"], row(spell)) for spell in spells])
+    index.range(1, 3)
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+import heapq
+import threading
+
+
+class SortedAttributeIndex:
+    """Rows sorted by one numeric attribute, answering range queries by bisection."""
+
+    def __init__(self, entries: Iterable[Tuple[float, Dict[str, Any]]], stamp: Any = None,
+                 group_by: Optional[str] = None):
+        """Build the index.
+
+        Args:
+            entries: (attribute value, result row) pairs; rows with equal
+                values are ordered by their "name"
+            stamp: Marker of the data the index was built from
+            group_by: Row field to partition by (e.g. a spell's "school"), so a
+                range query can be limited to some groups without scanning others
+        """
+        ordered = sorted(entries, key=lambda entry: (entry[0], entry[1].get("name", "")))
+        self.values = [value for value, _ in ordered]
+        self.rows = [row for _, row in ordered]
+        self.stamp = stamp
+        self.group_by = group_by
+        self._groups: Dict[str, Tuple[List[float], List[Dict[str, Any]]]] = {}
+        if group_by:
+            for value, row in ordered:
+                values, rows = self._groups.setdefault(str(row.get(group_by, "")).lower(), ([], []))
+                values.append(value)
+                rows.append(row)
+
+    @property
+    def groups(self) -> List[str]:
+        """The lowercase group names, if the index is grouped."""
+        return sorted(self._groups)
+
+    def range(self, low: Optional[float] = None, high: Optional[float] = None,
+              groups: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return the rows with low <= value <= high, in value order.
+
+        Args:
+            low: Inclusive lower bound (None for no bound)
+            high: Inclusive upper bound (None for no bound)
+            groups: Only rows from these groups (None for all)
+
+        Returns:
+            Copies of the matching rows, so callers may modify them
+        """
+        if groups is None:
+            start, end = self._bounds(self.values, low, high)
+            return [dict(row) for row in self.rows[start:end]]
+        slices = []
+        for group in dict.fromkeys(groups):
+            if group in self._groups:
+                values, rows = self._groups[group]
+                start, end = self._bounds(values, low, high)
+                slices.append(zip(values[start:end], rows[start:end]))
+        merged = heapq.merge(*slices, key=lambda entry: (entry[0], entry[1].get("name", "")))
+        return [dict(row) for _, row in merged]
+
+    @staticmethod
+    def _bounds(values: List[float], low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        return start, end
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class AttributeIndexes:
+    """The attribute indexes of a server, rebuilt when their source data changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, SortedAttributeIndex] = {}
+
+    def get(self, name: str, stamp: Any, build: Callable[[], Iterable[Tuple[float, Dict[str, Any]]]],
+            group_by: Optional[str] = None) -> SortedAttributeIndex:
+        """Return an index, building it if it is missing or was built from other data.
+
+        Args:
+            name: Index name, e.g. "spells"
+            stamp: Marker of the current source data; None marks data that is
+                incomplete, so the index is rebuilt on the next call
+            build: Returns the index's (value, row) entries
+            group_by: Row field to partition the index by
+
+        Returns:
+            The index
+        """
+        with self._lock:
+            index = self._indexes.get(name)
+        if index is not None and stamp is not None and index.stamp == stamp:
+            return index
+        index = SortedAttributeIndex(build(), stamp, group_by)
+        with self._lock:
+            self._indexes[name] = index
+        return index
+
+    def invalidate(self, name: str) -> None:
+        """Drop an index so the next ``get`` rebuilds it."""
+        with self._lock:
+            self._indexes.pop(name, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of rows in each built index."""
+        with self._lock:
+            return {name: len(index) for name, index in sorted(self._indexes.items())}
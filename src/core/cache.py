@@ -1,77 +1,369 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Tuple, Optional
 import logging
-import json
 import os
-import pickle
+import sys
+import threading
+import time
+
+from src.core.cache_index import KeyIndex
+from src.core.cache_policy import CachePolicy, SERVER_CACHE_POLICIES, SRD_MAX_STALE_HOURS
+from src.core.cache_serialization import Serializer
+from src.core.cache_stats import CacheStats
+from src.core.priority import background_priority
+from src.core.cache_storage import CacheStore, create_store
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Approximate the in-memory size of a cached value in bytes.
+
+    Walks dicts, lists, tuples and sets so nested API payloads are counted,
+    guarding against shared references being counted twice.
+
+    Args:
+        value: The value to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _seen) + estimate_size(v, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _seen)
+    return size
+
+
+# Persisted HTTP validators for a key are stored under this prefix plus the key
+VALIDATORS_PREFIX = "validators:"
+
+
+class _Flight:
+    """A single in-progress load shared by every caller that missed on a key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Uncached:
+    """A loader result that is returned to callers but not stored.
+
+    Loaders wrap a stale value served in place of a failed fetch, so the
+    entry keeps its original timestamp and still expires on schedule instead
+    of being re-stamped as freshly fetched.
+    """
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
 class APICache:
-    """A time-based cache for API responses with optional persistence."""
+    """A time-based cache for API responses with optional persistence.
+
+    The cache is safe to share between the prefetch threads and tool handlers.
+    In-memory state is guarded by one lock, negative entries and in-flight
+    loads by their own locks, and writes for the same key are serialized by a
+    striped per-key lock so memory and disk agree on the latest value.
+
+    With ``shared=True`` several server processes can use one journal-backed
+    cache directory. Disk access is serialized with file locks, and entries
+    other processes change are dropped from memory and re-read from disk.
+    """
+
+    # Number of set() calls between sweeps for expired entries
+    PURGE_INTERVAL = 1000
 
-    def __init__(self, ttl_hours: int = 24, persistent: bool = True, cache_dir: str = "cache"):
+    # Number of striped locks used to serialize writes per key
+    KEY_LOCK_STRIPES = 64
+
+    # Number of threads running background refreshes; further stale keys queue
+    REFRESH_WORKERS = 4
+
+    def __init__(self, ttl_hours: int = 24, persistent: bool = True, cache_dir: str = "cache",
+                 backend: str = "pickle", max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, lazy: bool = False,
+                 max_stale_hours: float = 0, negative_ttl_seconds: float = 300,
+                 serializer: Optional[Serializer] = None,
+                 policies: Optional[Dict[str, CachePolicy]] = None,
+                 shared: bool = False, sync_interval_seconds: float = 1.0):
         """Initialize the cache with a specified TTL (time-to-live).
 
         Args:
             ttl_hours: Number of hours before cached items expire
             persistent: Whether to persist the cache to disk
             cache_dir: Directory to store persistent cache files
+            backend: Persistent storage backend ("pickle" for one pickle file per
+                key, "file" for one serialized file per key, "journal" for an
+                append-only log with a compact index)
+            max_entries: Maximum number of entries held in memory (None for unbounded)
+            max_bytes: Approximate maximum memory used by cached values (None for unbounded)
+            lazy: Only load the persistent index at startup and read each value
+                from disk on its first get
+            max_stale_hours: How long past its TTL an entry may still be served by
+                get_or_refresh while it is refreshed in the background
+            negative_ttl_seconds: How long "not found" results are remembered
+            serializer: How persisted values are encoded (None for the backend's
+                default; the "file" and "journal" backends use compressed JSON)
+            policies: Caching rules keyed by key prefix. The longest matching
+                prefix wins; other keys use the TTL, staleness and negative TTL
+                given above.
+            shared: Share the cache directory with other server processes
+                (journal backend only). Their writes and invalidations become
+                visible here within ``sync_interval_seconds``.
+            sync_interval_seconds: Minimum time between checks for changes made
+                by other processes
         """
-        self.cache: Dict[str, Tuple[Any, datetime]] = {}
+        # Guards the in-memory entries, sizes, persisted index and counters
+        self._lock = threading.RLock()
+        self._key_locks = [threading.Lock() for _ in range(self.KEY_LOCK_STRIPES)]
+        # Ordered from least to most recently used
+        self.cache: "OrderedDict[str, Tuple[Any, datetime]]" = OrderedDict()
         self.ttl = timedelta(hours=ttl_hours)
+        self.max_stale = timedelta(hours=max_stale_hours)
+        # Entries are kept (in memory and on reload) until TTL plus the staleness bound
+        self.retention = self.ttl + self.max_stale
+        self.default_policy = CachePolicy(
+            ttl=self.ttl, max_stale=self.max_stale,
+            negative_ttl=timedelta(seconds=negative_ttl_seconds))
+        # Longest prefixes first so the most specific policy wins
+        self.policies: List[Tuple[str, CachePolicy]] = sorted(
+            (policies or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.stats = CacheStats()
+        self.startup_load_seconds = 0.0
+        self._sizes: Dict[str, int] = {}
+        self._sets_since_purge = 0
+        # Loads currently running, keyed by cache key (single-flight)
+        self._inflight: Dict[str, "_Flight"] = {}
+        self._inflight_lock = threading.Lock()
+        # Runs background refreshes, created on the first one
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        # Keys known not to exist upstream, kept in memory only
+        self.negative: Dict[str, Tuple[str, datetime]] = {}
+        self._negative_keys = KeyIndex()
+        self._negative_lock = threading.Lock()
+        self.negative_ttl = timedelta(seconds=negative_ttl_seconds)
         self.persistent = persistent
         self.cache_dir = cache_dir
+        self.backend = backend
+        self.lazy = lazy
+        self.shared = shared and persistent
+        self.sync_interval = sync_interval_seconds
+        self._last_sync = 0.0
+        self.store: Optional[CacheStore] = None
+        # Persisted keys and their timestamps, whether or not they are in memory
+        self._persisted: Dict[str, datetime] = {}
+        # Sorted index of every key in memory or on disk, for prefix invalidation
+        self._keys = KeyIndex()
+        # HTTP validators (ETag / Last-Modified) by key, and keys with validators on disk
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._validator_keys: set = set()
 
         if self.persistent:
             os.makedirs(self.cache_dir, exist_ok=True)
+            start = time.perf_counter()
+            self.store = create_store(backend, self.cache_dir, serializer, shared=self.shared)
             self._load_cache()
+            self.startup_load_seconds = time.perf_counter() - start
 
         logger.debug(
-            f"Initialized API cache with TTL of {ttl_hours} hours (persistent: {persistent})")
+            f"Initialized API cache with TTL of {ttl_hours} hours (persistent: {persistent}, backend: {backend})")
 
-    def _get_cache_path(self, key: str) -> str:
-        """Get the file path for a cache key.
+    def policy_for(self, key: str) -> CachePolicy:
+        """Return the caching policy that applies to a key.
 
         Args:
             key: The cache key
 
         Returns:
-            The file path for the cache key
+            The policy of the longest matching prefix, or the default policy
+        """
+        for prefix, policy in self.policies:
+            if key.startswith(prefix):
+                return policy
+        return self.default_policy
+
+    def _sync_store(self, force: bool = False) -> None:
+        """Apply changes other processes made to a shared cache directory.
+
+        Entries they rewrote or deleted are dropped from memory, so the next
+        lookup reads the current value from disk.
+
+        Args:
+            force: Check now even if the sync interval has not elapsed
         """
-        # Convert the key to a valid filename
-        filename = key.replace("/", "_").replace(":", "_")
-        return os.path.join(self.cache_dir, f"{filename}.pickle")
+        if not self.shared:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = now
+
+        changes = self.store.refresh()
+        if not changes:
+            return
+        with self._lock:
+            for key, timestamp in changes.items():
+                if key.startswith(VALIDATORS_PREFIX):
+                    key = key[len(VALIDATORS_PREFIX):]
+                    if timestamp is None:
+                        self._validator_keys.discard(key)
+                    else:
+                        self._validator_keys.add(key)
+                    self._validators.pop(key, None)
+                    continue
+                if timestamp is None:
+                    self._persisted.pop(key, None)
+                else:
+                    self._persisted[key] = timestamp
+                    self._keys.add(key)
+                self._discard_from_memory(key)
+                self.stats.record("remote_changes", key)
+        logger.debug(f"Applied {len(changes)} cache changes from other processes")
 
     def _load_cache(self) -> None:
-        """Load the cache from disk."""
+        """Load the cache from disk.
+
+        In lazy mode only the index is loaded; values are read on first access.
+        """
         try:
-            # Load the cache index if it exists
-            index_path = os.path.join(self.cache_dir, "index.json")
-            if os.path.exists(index_path):
-                with open(index_path, "r") as f:
-                    index = json.load(f)
-
-                # Load each cache item
-                for key, timestamp_str in index.items():
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                    if datetime.now() - timestamp < self.ttl:
-                        cache_path = self._get_cache_path(key)
-                        if os.path.exists(cache_path):
-                            try:
-                                with open(cache_path, "rb") as f:
-                                    value = pickle.load(f)
-                                    self.cache[key] = (value, timestamp)
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to load cache item {key}: {e}")
+            self._persisted = self.store.load_index()
+            validator_keys = [key for key in self._persisted if key.startswith(VALIDATORS_PREFIX)]
+            for key in validator_keys:
+                del self._persisted[key]
+            self._validator_keys = {key[len(VALIDATORS_PREFIX):] for key in validator_keys}
+
+            # Drop entries persisted before their namespace opted out of persistence
+            unpersisted = [key for key in self._persisted if not self.policy_for(key).persistent]
+            unpersisted_validators = [key for key in self._validator_keys
+                                      if not self.policy_for(key).persistent]
+            if unpersisted or unpersisted_validators:
+                self.store.delete(unpersisted + [VALIDATORS_PREFIX + key for key in unpersisted_validators])
+                for key in unpersisted:
+                    del self._persisted[key]
+                self._validator_keys.difference_update(unpersisted_validators)
+                logger.info(f"Removed {len(unpersisted)} non-persistent items from persistent cache")
+
+            with self._lock:
+                self._keys = KeyIndex(list(self.cache) + list(self._persisted))
 
+            if self.lazy:
                 logger.info(
-                    f"Loaded {len(self.cache)} items from persistent cache")
+                    f"Indexed {len(self._persisted)} items from persistent cache (lazy loading)")
+                return
+
+            # Load each cache item
+            for key, timestamp in list(self._persisted.items()):
+                if datetime.now() - timestamp < self.policy_for(key).retention:
+                    self._load_persisted_item(key)
+
+            logger.info(
+                f"Loaded {len(self.cache)} items from persistent cache")
         except Exception as e:
             logger.warning(f"Failed to load cache from disk: {e}")
 
+    def _load_persisted_item(self, key: str) -> Any:
+        """Read a persisted entry into memory.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The persisted value, or None if it could not be read
+        """
+        with self._lock:
+            timestamp = self._persisted.get(key)
+        if timestamp is None:
+            return None
+        start = time.perf_counter()
+        try:
+            value = self.store.read(key)
+        except KeyError:
+            with self._lock:
+                if self._persisted.get(key) == timestamp:
+                    del self._persisted[key]
+                    if key not in self.cache:
+                        self._keys.discard(key)
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load cache item {key}: {e}")
+            return None
+        self.stats.observe("disk_load", key, time.perf_counter() - start)
+        self.stats.record("disk_loads", key)
+
+        size = estimate_size(value)
+        with self._lock:
+            # Another thread may have set or cleared the key while we read it
+            if self._persisted.get(key) != timestamp:
+                return None
+            current = self.cache.get(key)
+            if current is not None and current[1] >= timestamp:
+                return current[0]
+            self._store_in_memory(key, value, timestamp, size)
+        return value
+
+    def warm_up(self, prefixes: Optional[Iterable[str]] = None, limit: Optional[int] = None,
+                background: bool = True) -> Optional[threading.Thread]:
+        """Load persisted entries into memory ahead of their first get.
+
+        The most recently cached entries are loaded first, since those are the
+        ones the server was using before it restarted.
+
+        Args:
+            prefixes: Only warm keys starting with one of these prefixes (None for all)
+            limit: Maximum number of entries to load (None for no limit)
+            background: Load in a daemon thread instead of blocking
+
+        Returns:
+            The warm-up thread when running in the background, otherwise None
+        """
+        if not self.persistent:
+            return None
+
+        prefixes = tuple(prefixes) if prefixes else None
+        now = datetime.now()
+        with self._lock:
+            candidates = [
+                (key, timestamp) for key, timestamp in self._persisted.items()
+                if now - timestamp < self.policy_for(key).retention and key not in self.cache
+                and (prefixes is None or key.startswith(prefixes))
+            ]
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        keys = [key for key, _ in candidates[:limit]]
+
+        def load_keys() -> None:
+            loaded = 0
+            for key in keys:
+                if key not in self.cache and self._load_persisted_item(key) is not None:
+                    loaded += 1
+            logger.info(f"Warmed {loaded} items from persistent cache")
+
+        if not background:
+            load_keys()
+            return None
+
+        thread = threading.Thread(target=load_keys, name="cache-warm-up", daemon=True)
+        thread.start()
+        return thread
+
     def _save_cache_item(self, key: str, value: Any, timestamp: datetime) -> None:
         """Save a cache item to disk.
 
@@ -80,32 +372,114 @@ class APICache:
             value: The value to cache
             timestamp: The timestamp when the item was cached
         """
-        if not self.persistent:
+        if not self.persistent or not self.policy_for(key).persistent:
             return
 
         try:
-            # Save the cache item
-            cache_path = self._get_cache_path(key)
-            with open(cache_path, "wb") as f:
-                pickle.dump(value, f)
-
-            # Update the cache index
-            index_path = os.path.join(self.cache_dir, "index.json")
-            index = {}
-            if os.path.exists(index_path):
-                try:
-                    with open(index_path, "r") as f:
-                        index = json.load(f)
-                except Exception:
-                    pass
-
-            index[key] = timestamp.isoformat()
-
-            with open(index_path, "w") as f:
-                json.dump(index, f)
+            self.store.write(key, value, timestamp)
+            with self._lock:
+                self._persisted[key] = timestamp
+                self._keys.add(key)
         except Exception as e:
             logger.warning(f"Failed to save cache item {key} to disk: {e}")
 
+    def _store_in_memory(self, key: str, value: Any, timestamp: datetime, size: int = 0) -> None:
+        """Insert or replace an in-memory entry and enforce the size bounds.
+
+        Must be called with ``self._lock`` held. ``size`` is the value's
+        estimated size, computed by the caller outside the lock.
+        """
+        if key in self.cache:
+            del self.cache[key]
+            self.current_bytes -= self._sizes.pop(key, 0)
+        else:
+            self._keys.add(key)
+        self.cache[key] = (value, timestamp)
+        self._sizes[key] = size
+        self.current_bytes += size
+        self._evict_if_needed()
+
+    def _discard_from_memory(self, key: str) -> bool:
+        """Remove an in-memory entry, returning whether it was present.
+
+        Must be called with ``self._lock`` held.
+        """
+        if key not in self.cache:
+            return False
+        del self.cache[key]
+        self.current_bytes -= self._sizes.pop(key, 0)
+        if key not in self._persisted:
+            self._keys.discard(key)
+        return True
+
+    def _evict_if_needed(self) -> None:
+        """Evict least recently used entries until the cache is within its bounds.
+
+        Evicted entries stay in the persistent store and are only dropped from memory.
+        Must be called with ``self._lock`` held.
+        """
+        while self.cache and (
+                (self.max_entries is not None and len(self.cache) > self.max_entries) or
+                (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            key = next(iter(self.cache))
+            self._discard_from_memory(key)
+            self.stats.record("evictions", key)
+            logger.debug(f"Evicted cache key: {key}")
+
+    def purge_expired(self) -> int:
+        """Remove entries past the retention window (TTL plus staleness bound) from memory.
+
+        Returns:
+            The number of entries removed
+        """
+        now = datetime.now()
+        with self._lock:
+            expired = [key for key, (_, timestamp) in self.cache.items()
+                       if now - timestamp >= self.policy_for(key).retention]
+            for key in expired:
+                self._discard_from_memory(key)
+        if expired:
+            logger.debug(f"Purged {len(expired)} expired cache entries")
+
+        with self._negative_lock:
+            for key in [key for key, (_, timestamp) in self.negative.items()
+                        if now - timestamp >= self.policy_for(key).negative_ttl]:
+                del self.negative[key]
+                self._negative_keys.discard(key)
+        return len(expired)
+
+    def _lookup(self, key: str) -> Tuple[Optional[Tuple[Any, datetime]], bool]:
+        """Find an entry that is still within the retention window.
+
+        Entries past the retention window are dropped from memory. Entries only
+        on disk (lazily loaded or evicted) are read back into memory. No stats
+        are recorded here; callers that count lookups record the expiration.
+
+        Returns:
+            The (value, timestamp) pair, or None if there is no usable entry, and
+            whether an entry past the retention window was dropped
+        """
+        self._sync_store()
+        now = datetime.now()
+        retention = self.policy_for(key).retention
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                value, timestamp = entry
+                if now - timestamp < retention:
+                    self.cache.move_to_end(key)
+                    return (value, timestamp), False
+                self._discard_from_memory(key)
+                return None, True
+            timestamp = self._persisted.get(key)
+
+        if timestamp is not None and now - timestamp < retention:
+            value = self._load_persisted_item(key)
+            if value is not None:
+                logger.debug(f"Loaded key from disk: {key}")
+                return (value, timestamp), False
+        return None, False
+
     def get(self, key: str) -> Any:
         """Get a value from the cache if it exists and is not expired.
 
@@ -115,43 +489,502 @@ class APICache:
         Returns:
             The cached value or None if not found or expired
         """
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            if datetime.now() - timestamp < self.ttl:
-                logger.debug(f"Cache hit for key: {key}")
-                return value
-            else:
-                logger.debug(f"Cache expired for key: {key}")
-        else:
+        entry, dropped = self._lookup(key)
+        if entry is None:
             logger.debug(f"Cache miss for key: {key}")
+            if dropped:
+                self.stats.record("expirations", key)
+            self.stats.record("misses", key)
+            return None
+
+        value, timestamp = entry
+        if datetime.now() - timestamp < self.policy_for(key).ttl:
+            logger.debug(f"Cache hit for key: {key}")
+            self.stats.record("hits", key)
+            return value
+
+        logger.debug(f"Cache expired for key: {key}")
+        self.stats.record("expirations", key)
+        self.stats.record("misses", key)
         return None
 
-    def set(self, key: str, value: Any) -> None:
+    def get_or_refresh(self, key: str, loader: Callable[[], Any],
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Get a value, serving stale entries while refreshing them in the background.
+
+        Fresh entries are returned directly. Entries past their TTL but within
+        ``max_stale_hours`` are returned immediately and ``loader`` is run in a
+        background thread to replace them. At most one refresh runs per key.
+
+        Args:
+            key: The cache key to retrieve
+            loader: Callable returning a fresh value
+            cacheable: Predicate deciding whether a loaded value is stored
+                (defaults to storing any value that is not None)
+
+        Returns:
+            The cached value (fresh or stale), or None if the caller must fetch it
+        """
+        entry, dropped = self._lookup(key)
+        if entry is None:
+            logger.debug(f"Cache miss for key: {key}")
+            if dropped:
+                self.stats.record("expirations", key)
+            self.stats.record("misses", key)
+            return None
+
+        value, timestamp = entry
+        if datetime.now() - timestamp < self.policy_for(key).ttl:
+            logger.debug(f"Cache hit for key: {key}")
+            self.stats.record("hits", key)
+            return value
+
+        logger.debug(f"Serving stale value for key: {key}")
+        self.stats.record("stale_hits", key)
+        self.refresh_in_background(key, loader, cacheable)
+        return value
+
+    def get_or_fetch(self, key: str, loader: Callable[[], Any],
+                     cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Get a value, running ``loader`` on a miss with single-flight coalescing.
+
+        Concurrent misses on the same key share one loader call: the first
+        caller runs it and every other caller waits for its result. Stale
+        entries are served as in ``get_or_refresh``.
+
+        Args:
+            key: The cache key to retrieve
+            loader: Callable returning the value for the key, or an ``Uncached``
+                wrapping a value that must not be stored
+            cacheable: Predicate deciding whether a loaded value is stored
+                (defaults to storing any value that is not None)
+
+        Returns:
+            The cached or freshly loaded value. Values rejected by ``cacheable``
+            (such as error payloads) are returned to every waiting caller but not stored.
+
+        Raises:
+            Exception: Whatever ``loader`` raised, re-raised in every waiting caller
+        """
+        value = self.get_or_refresh(key, loader, cacheable)
+        if value is not None:
+            return value
+
+        flight, is_leader = self._join_flight(key)
+        if is_leader:
+            self._run_flight(key, flight, loader, cacheable)
+        else:
+            logger.debug(f"Waiting on in-flight load for key: {key}")
+            self.stats.record("coalesced_waits", key)
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _join_flight(self, key: str) -> Tuple["_Flight", bool]:
+        """Return the in-flight load for a key, creating it if there is none.
+
+        Returns:
+            The flight and whether the caller created it (and must run it)
+        """
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                return flight, False
+            flight = _Flight()
+            self._inflight[key] = flight
+            return flight, True
+
+    def _run_flight(self, key: str, flight: "_Flight", loader: Callable[[], Any],
+                    cacheable: Optional[Callable[[Any], bool]]) -> None:
+        """Run a loader for a flight, cache its result and wake any waiters."""
+        start = time.perf_counter()
+        self.stats.record("loads", key)
+        try:
+            value = loader()
+            self.stats.observe("load", key, time.perf_counter() - start)
+            store = not isinstance(value, Uncached)
+            flight.value = value if store else value.value
+            should_cache = store and (cacheable(flight.value) if cacheable else flight.value is not None)
+            if should_cache:
+                self.set(key, flight.value)
+        except Exception as e:
+            flight.error = e
+            self.stats.record("load_errors", key)
+        finally:
+            self._land_flight(key, flight)
+
+    def _land_flight(self, key: str, flight: "_Flight") -> None:
+        """Remove a finished (or abandoned) flight and wake its waiters."""
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        flight.done.set()
+
+    def refresh_in_background(self, key: str, loader: Callable[[], Any],
+                              cacheable: Optional[Callable[[Any], bool]] = None) -> bool:
+        """Queue a loader on the cache's refresh workers and cache its result.
+
+        The refresh joins the same single-flight table as ``get_or_fetch``, so a
+        foreground miss during a refresh waits for it instead of fetching again,
+        and a key is queued at most once. At most ``REFRESH_WORKERS`` refreshes
+        run at a time however many keys go stale together.
+
+        Args:
+            key: The cache key to refresh
+            loader: Callable returning a fresh value
+            cacheable: Predicate deciding whether a loaded value is stored
+
+        Returns:
+            True if a refresh was queued, False if a load is already running for the
+            key or the cache is closed
+        """
+        flight, is_leader = self._join_flight(key)
+        if not is_leader:
+            return False
+
+        def refresh() -> None:
+            # Refreshes yield to requests made for tool calls
+            with background_priority():
+                self._run_flight(key, flight, loader, cacheable)
+            if flight.error is not None:
+                logger.warning(f"Background refresh failed for {key}: {flight.error}")
+            else:
+                logger.debug(f"Refreshed stale key: {key}")
+
+        def abandon(future: Future) -> None:
+            # Refreshes still queued when the cache closes are dropped, releasing their waiters
+            if future.cancelled():
+                self._land_flight(key, flight)
+
+        with self._inflight_lock:
+            if self._refresh_pool is None and not self._closed:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=self.REFRESH_WORKERS,
+                                                        thread_name_prefix="cache-refresh")
+            future = self._refresh_pool.submit(refresh) if self._refresh_pool is not None else None
+        if future is None:
+            self._land_flight(key, flight)
+            return False
+        future.add_done_callback(abandon)
+        return True
+
+    def get_negative(self, key: str) -> Optional[str]:
+        """Check whether a key was recently recorded as not found.
+
+        Args:
+            key: The cache key to check
+
+        Returns:
+            The recorded reason if the key is negatively cached, otherwise None
+        """
+        with self._negative_lock:
+            entry = self.negative.get(key)
+            if entry is None:
+                return None
+
+            reason, timestamp = entry
+            if datetime.now() - timestamp >= self.policy_for(key).negative_ttl:
+                del self.negative[key]
+                self._negative_keys.discard(key)
+                return None
+
+            self.stats.record("negative_hits", key)
+        logger.debug(f"Negative cache hit for key: {key}")
+        return reason
+
+    def set_negative(self, key: str, reason: str = "not found") -> None:
+        """Record that a key does not exist upstream.
+
+        Args:
+            key: The cache key that was looked up
+            reason: Short description of why the lookup failed
+        """
+        with self._negative_lock:
+            self.negative[key] = (reason, datetime.now())
+            self._negative_keys.add(key)
+            self.stats.record("negative_stores", key)
+        logger.debug(f"Negatively cached key: {key} ({reason})")
+
+    def negative_stats(self) -> Dict[str, int]:
+        """Return negative cache metrics."""
+        with self._negative_lock:
+            entries = len(self.negative)
+        return {
+            "entries": entries,
+            "hits": self.negative_hits,
+            "stores": self.negative_stores,
+        }
+
+    @property
+    def evictions(self) -> int:
+        """Total number of entries evicted from memory."""
+        return self.stats.total("evictions")
+
+    @property
+    def negative_hits(self) -> int:
+        """Total number of lookups answered by the negative cache."""
+        return self.stats.total("negative_hits")
+
+    @property
+    def negative_stores(self) -> int:
+        """Total number of keys recorded as not found."""
+        return self.stats.total("negative_stores")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics and configuration for introspection.
+
+        Returns:
+            Event counters, hit rates and latencies (overall and per key
+            namespace), plus current memory and persistence figures
+        """
+        with self._lock:
+            entries = len(self.cache)
+            persisted = len(self._persisted)
+            current_bytes = self.current_bytes
+            bytes_by_namespace: Dict[str, int] = {}
+            entries_by_namespace: Dict[str, int] = {}
+            for key, size in self._sizes.items():
+                namespace = self.stats.namespace_for(key)
+                bytes_by_namespace[namespace] = bytes_by_namespace.get(namespace, 0) + size
+                entries_by_namespace[namespace] = entries_by_namespace.get(namespace, 0) + 1
+        with self._negative_lock:
+            negative_entries = len(self.negative)
+        with self._inflight_lock:
+            inflight = len(self._inflight)
+
+        stats = self.stats.snapshot()
+        for namespace, namespace_stats in stats["namespaces"].items():
+            namespace_stats["entries"] = entries_by_namespace.get(namespace, 0)
+            namespace_stats["bytes"] = bytes_by_namespace.get(namespace, 0)
+
+        return {
+            "entries": entries,
+            "persisted_entries": persisted,
+            "negative_entries": negative_entries,
+            "inflight_loads": inflight,
+            "bytes": current_bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "ttl_hours": self.ttl.total_seconds() / 3600,
+            "max_stale_hours": self.max_stale.total_seconds() / 3600,
+            "negative_ttl_seconds": self.negative_ttl.total_seconds(),
+            "policies": {prefix: policy.to_dict() for prefix, policy in self.policies},
+            "persistent": self.persistent,
+            "backend": self.backend if self.persistent else None,
+            "lazy": self.lazy,
+            "shared": self.shared,
+            "startup_load_ms": round(self.startup_load_seconds * 1000, 3),
+            **stats,
+        }
+
+    def set(self, key: str, value: Any, timestamp: Optional[datetime] = None) -> None:
         """Set a value in the cache with the current timestamp.
 
         Args:
             key: The cache key
             value: The value to cache
+            timestamp: When the value was fetched (defaults to now)
         """
-        timestamp = datetime.now()
-        self.cache[key] = (value, timestamp)
-        logger.debug(f"Cached value for key: {key}")
+        size = estimate_size(value)
 
-        if self.persistent:
-            self._save_cache_item(key, value, timestamp)
+        # Serialize writes to the same key so memory and disk end on the same value
+        with self._key_locks[hash(key) % self.KEY_LOCK_STRIPES]:
+            timestamp = timestamp or datetime.now()
+            with self._lock:
+                self._store_in_memory(key, value, timestamp, size)
+                self.stats.record("sets", key)
+                # Expired entries that are never read again would otherwise linger forever
+                self._sets_since_purge += 1
+                purge_due = self._sets_since_purge >= self.PURGE_INTERVAL
+                if purge_due:
+                    self._sets_since_purge = 0
+            with self._negative_lock:
+                if self.negative.pop(key, None) is not None:
+                    self._negative_keys.discard(key)
+            logger.debug(f"Cached value for key: {key}")
+
+            if self.persistent:
+                self._save_cache_item(key, value, timestamp)
+
+        if purge_due:
+            self.purge_expired()
+
+    def get_retained(self, key: str) -> Any:
+        """Return a key's value if it is within the retention window, fresh or stale.
+
+        Unlike ``get`` this does not count as a lookup. Used to serve a cached
+        value in place of a failed fetch, within the key's staleness bound.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The value, or None if there is none within the retention window
+        """
+        entry, _ = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    def peek(self, key: str) -> Any:
+        """Return a key's value whatever its age, without counting it as a lookup.
+
+        Used to answer a 304 Not Modified response with the value already held.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The value in memory or on disk, or None if there is none
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry[0]
+            persisted = key in self._persisted
+        if not persisted:
+            return None
+        try:
+            return self.store.read(key)
+        except Exception as e:
+            logger.debug(f"Could not read cache item {key}: {e}")
+            return None
+
+    def get_validators(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the HTTP validators recorded for a key's cached response.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            A dict with "etag" and/or "last_modified", or None if there are none
+        """
+        with self._lock:
+            validators = self._validators.get(key)
+            on_disk = validators is None and key in self._validator_keys
+        if not on_disk:
+            return validators
+        try:
+            validators = self.store.read(VALIDATORS_PREFIX + key)
+        except Exception as e:
+            logger.debug(f"Could not read validators for {key}: {e}")
+            return None
+        with self._lock:
+            self._validators[key] = validators
+        return validators
+
+    def set_validators(self, key: str, validators: Optional[Dict[str, str]]) -> None:
+        """Record the HTTP validators of the response a key's value came from.
+
+        Args:
+            key: The cache key
+            validators: A dict with "etag" and/or "last_modified" (None or empty to forget them)
+        """
+        persist = self.persistent and self.policy_for(key).persistent
+        with self._lock:
+            if validators:
+                self._validators[key] = dict(validators)
+            else:
+                self._validators.pop(key, None)
+            had_persisted = key in self._validator_keys
+            if persist:
+                if validators:
+                    self._validator_keys.add(key)
+                else:
+                    self._validator_keys.discard(key)
+        if not persist:
+            return
+        try:
+            if validators:
+                self.store.write(VALIDATORS_PREFIX + key, dict(validators), datetime.now())
+            elif had_persisted:
+                self.store.delete([VALIDATORS_PREFIX + key])
+        except Exception as e:
+            logger.warning(f"Failed to save validators for {key}: {e}")
+
+    def keys(self, prefixes: Optional[Iterable[str]] = None) -> List[str]:
+        """Return the cached keys, in memory or on disk, in sorted order.
+
+        Args:
+            prefixes: Only return keys starting with one of these prefixes (None for all)
+        """
+        self._sync_store()
+        with self._lock:
+            if prefixes is None:
+                return list(self._keys)
+            return sorted({key for prefix in prefixes for key in self._keys.with_prefix(prefix)})
+
+    def entries(self, prefixes: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Any, datetime]]:
+        """Iterate over the entries still within their retention window.
+
+        Entries only on disk are read from the store without being loaded into
+        memory, so exporting a large namespace does not evict the working set.
+
+        Args:
+            prefixes: Only include keys starting with one of these prefixes (None for all)
+
+        Yields:
+            (key, value, timestamp) tuples in key order
+        """
+        now = datetime.now()
+        for key in self.keys(prefixes):
+            with self._lock:
+                entry = self.cache.get(key)
+                timestamp = entry[1] if entry is not None else self._persisted.get(key)
+            if timestamp is None or now - timestamp >= self.policy_for(key).retention:
+                continue
+            if entry is not None:
+                yield key, entry[0], timestamp
+                continue
+            try:
+                value = self.store.read(key)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache item {key}: {e}")
+                continue
+            yield key, value, timestamp
+
+    def load_entries(self, entries: Iterable[Tuple[str, Any, datetime]],
+                     overwrite: bool = False, keep_timestamps: bool = True) -> int:
+        """Add entries produced elsewhere (for example by ``entries`` on another node).
+
+        Args:
+            entries: (key, value, timestamp) tuples
+            overwrite: Replace keys that are already cached
+            keep_timestamps: Keep each entry's original timestamp instead of
+                treating it as fetched now
+
+        Returns:
+            The number of entries added
+        """
+        loaded = 0
+        for key, value, timestamp in entries:
+            if not overwrite:
+                with self._lock:
+                    entry = self.cache.get(key)
+                    existing = entry[1] if entry is not None else self._persisted.get(key)
+                if existing is not None and datetime.now() - existing < self.policy_for(key).retention:
+                    continue
+            self.set(key, value, timestamp if keep_timestamps else None)
+            loaded += 1
+        logger.debug(f"Loaded {loaded} entries into the cache")
+        return loaded
 
     def clear(self) -> None:
         """Clear the entire cache."""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self._sizes.clear()
+            self._persisted.clear()
+            self._keys.clear()
+            self._validators.clear()
+            self._validator_keys.clear()
+            self.current_bytes = 0
+        with self._negative_lock:
+            self.negative.clear()
+            self._negative_keys.clear()
         logger.debug("Cache cleared")
 
         if self.persistent:
             try:
-                # Clear the cache directory
-                for filename in os.listdir(self.cache_dir):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    if os.path.isfile(file_path):
-                        os.unlink(file_path)
+                self.store.clear()
                 logger.debug("Persistent cache cleared")
             except Exception as e:
                 logger.warning(f"Failed to clear persistent cache: {e}")
@@ -165,44 +998,89 @@ class APICache:
         Returns:
             The number of items cleared from the cache
         """
-        # Find all keys that match the prefix
-        keys_to_remove = [key for key in self.cache.keys() if key.startswith(prefix)]
+        return self.clear_prefixes([prefix])
+
+    def clear_prefixes(self, prefixes: Iterable[str]) -> int:
+        """Clear the entries under several prefixes with one persistent-store update.
+
+        Matching keys are found through the sorted key index, so the cost
+        depends on the number of matching entries rather than the cache size.
+
+        Args:
+            prefixes: Prefixes to match against cache keys
+
+        Returns:
+            The number of items cleared from the cache
+        """
+        prefixes = list(dict.fromkeys(prefixes))
+        # Invalidate entries other processes added, too
+        self._sync_store(force=True)
+
+        with self._negative_lock:
+            for prefix in prefixes:
+                for key in self._negative_keys.with_prefix(prefix):
+                    del self.negative[key]
+                    self._negative_keys.discard(key)
+
+        with self._lock:
+            # The key index covers entries in memory and entries only on disk
+            keys_to_remove = list(dict.fromkeys(
+                key for prefix in prefixes for key in self._keys.with_prefix(prefix)))
+
+            for key in keys_to_remove:
+                self._persisted.pop(key, None)
+                self._discard_from_memory(key)
+                self._keys.discard(key)
+                self._validators.pop(key, None)
+            validator_keys = [VALIDATORS_PREFIX + key for key in keys_to_remove
+                              if key in self._validator_keys]
+            self._validator_keys.difference_update(keys_to_remove)
 
         if not keys_to_remove:
-            logger.debug(f"No cache entries found with prefix: {prefix}")
+            logger.debug(f"No cache entries found with prefixes: {', '.join(prefixes)}")
             return 0
 
-        # Remove from in-memory cache
-        for key in keys_to_remove:
-            del self.cache[key]
-
-        # Remove from persistent storage
+        # Remove from persistent storage in a single batch
         if self.persistent:
             try:
-                # Delete the pickle files
-                for key in keys_to_remove:
-                    cache_path = self._get_cache_path(key)
-                    if os.path.exists(cache_path):
-                        os.unlink(cache_path)
-
-                # Update the index file
-                index_path = os.path.join(self.cache_dir, "index.json")
-                if os.path.exists(index_path):
-                    with open(index_path, "r") as f:
-                        index = json.load(f)
-
-                    # Remove cleared keys from index
-                    for key in keys_to_remove:
-                        index.pop(key, None)
-
-                    with open(index_path, "w") as f:
-                        json.dump(index, f)
+                self.store.delete(keys_to_remove + validator_keys)
             except Exception as e:
-                logger.warning(f"Failed to clear persistent cache for prefix {prefix}: {e}")
+                logger.warning(f"Failed to clear persistent cache for prefixes {prefixes}: {e}")
 
-        logger.debug(f"Cleared {len(keys_to_remove)} cache entries with prefix: {prefix}")
+        logger.debug(f"Cleared {len(keys_to_remove)} cache entries with prefixes: {', '.join(prefixes)}")
         return len(keys_to_remove)
 
     def __len__(self) -> int:
         """Return the number of items in the cache."""
-        return len(self.cache)
+        with self._lock:
+            return len(self.cache)
+
+    def close(self) -> None:
+        """Drop queued refreshes, then flush and release the persistent storage backend."""
+        with self._inflight_lock:
+            pool, self._refresh_pool = self._refresh_pool, None
+            self._closed = True
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self.store is not None:
+            self.store.close()
+
+
+def open_server_cache(cache_dir: str = "cache", backend: str = "journal", **kwargs) -> APICache:
+    """Open a persistent cache directory the way the server does.
+
+    The server and the cache command-line tools open the same directory, so
+    they must agree on the per-namespace policies (or entries the server still
+    keeps would look expired) and take the same file locks.
+
+    Args:
+        cache_dir: Persistent cache directory
+        backend: Persistent storage backend (only "journal" can be shared)
+        **kwargs: Further ``APICache`` arguments, such as ``max_bytes`` or ``lazy``
+
+    Returns:
+        The cache, shared with other processes when the backend allows it
+    """
+    return APICache(ttl_hours=24, persistent=True, cache_dir=cache_dir, backend=backend,
+                    max_stale_hours=SRD_MAX_STALE_HOURS, policies=SERVER_CACHE_POLICIES,
+                    shared=backend == "journal", **kwargs)
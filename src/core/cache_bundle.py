@@ -0,0 +1,188 @@
+"""
+Portable cache bundles for offline cold starts.
+
+A bundle is a gzip-compressed JSON Lines file. The first line is a header
+describing the bundle; every following line is one cache entry::
+
+    {"format": "dnd-mcp-cache-bundle", "version": 1, "created": "...", "prefixes": ["dnd_"], "count": 1234}
+    {"key": "dnd_item_spells_fireball", "timestamp": "...", "value": {...}}
+
+Export a warmed cache and preload it on a fresh node::
+
+    python -m src.core.cache_bundle export srd.bundle --cache-dir cache
+    python -m src.core.cache_bundle import srd.bundle --cache-dir cache
+
+The server also imports the bundle named by ``DND_CACHE_BUNDLE`` at startup.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, Tuple
+import argparse
+import gzip
+import json
+import logging
+import sys
+
+from src.core.cache import APICache, open_server_cache
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = "dnd-mcp-cache-bundle"
+BUNDLE_VERSION = 1
+
+# SRD data from the D&D 5e API; campaign data is never bundled
+SRD_PREFIXES = ("dnd_",)
+
+
+def export_bundle(cache: APICache, path: str, prefixes: Iterable[str] = SRD_PREFIXES) -> int:
+    """Write the cache entries under the given prefixes to a bundle file.
+
+    Args:
+        cache: The cache to export from
+        path: Destination bundle path
+        prefixes: Key prefixes to export
+
+    Returns:
+        The number of entries exported
+    """
+    prefixes = list(prefixes)
+    entries = list(cache.entries(prefixes))
+    header = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": datetime.now().isoformat(),
+        "prefixes": prefixes,
+        "count": len(entries),
+    }
+
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for key, value, timestamp in entries:
+            f.write(json.dumps({"key": key, "timestamp": timestamp.isoformat(), "value": value},
+                               separators=(",", ":")) + "\n")
+
+    logger.info(f"Exported {len(entries)} cache entries to {path}")
+    return len(entries)
+
+
+def read_bundle_header(path: str) -> Dict[str, Any]:
+    """Read and validate a bundle's header line.
+
+    Args:
+        path: Bundle path
+
+    Returns:
+        The bundle header
+
+    Raises:
+        ValueError: If the file is not a bundle or uses an unsupported version
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return _parse_header(f.readline())
+
+
+def read_bundle(path: str) -> Iterator[Tuple[str, Any, datetime]]:
+    """Iterate over the entries in a bundle file.
+
+    Args:
+        path: Bundle path
+
+    Yields:
+        (key, value, timestamp) tuples
+
+    Raises:
+        ValueError: If the file is not a bundle or uses an unsupported version
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        _parse_header(f.readline())
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            yield entry["key"], entry["value"], datetime.fromisoformat(entry["timestamp"])
+
+
+def import_bundle(cache: APICache, path: str, overwrite: bool = False,
+                  keep_timestamps: bool = False) -> int:
+    """Preload a cache from a bundle file.
+
+    Args:
+        cache: The cache to load into
+        path: Bundle path
+        overwrite: Replace entries that are already cached
+        keep_timestamps: Keep the timestamps recorded in the bundle. By default
+            entries are treated as fetched now, so an older bundle still starts
+            the node fully fresh.
+
+    Returns:
+        The number of entries imported
+
+    Raises:
+        ValueError: If the file is not a bundle or uses an unsupported version
+    """
+    loaded = cache.load_entries(read_bundle(path), overwrite=overwrite,
+                                keep_timestamps=keep_timestamps)
+    logger.info(f"Imported {loaded} cache entries from {path}")
+    return loaded
+
+
+def _parse_header(line: str) -> Dict[str, Any]:
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != BUNDLE_FORMAT:
+        raise ValueError("Not a D&D MCP cache bundle")
+    if header.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"Unsupported cache bundle version {header.get('version')}")
+    return header
+
+
+def main(argv=None) -> int:
+    """Command-line entry point for exporting and importing bundles."""
+    parser = argparse.ArgumentParser(description="Export or import a D&D MCP cache bundle")
+    parser.add_argument("--cache-dir", default="cache", help="Persistent cache directory")
+    parser.add_argument("--backend", default="journal", help="Persistent cache backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write cached SRD entries to a bundle")
+    export_parser.add_argument("bundle", help="Bundle file to write")
+    export_parser.add_argument("--prefix", action="append", dest="prefixes",
+                               help="Key prefix to export (repeatable, default: dnd_)")
+
+    import_parser = subparsers.add_parser("import", help="Load a bundle into the cache")
+    import_parser.add_argument("bundle", help="Bundle file to read")
+    import_parser.add_argument("--overwrite", action="store_true",
+                               help="Replace entries that are already cached")
+    import_parser.add_argument("--keep-timestamps", action="store_true",
+                               help="Keep the bundle's timestamps instead of treating entries as fresh")
+
+    info_parser = subparsers.add_parser("info", help="Show a bundle's header")
+    info_parser.add_argument("bundle", help="Bundle file to inspect")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "info":
+            print(json.dumps(read_bundle_header(args.bundle), indent=2))
+            return 0
+
+        cache = open_server_cache(args.cache_dir, backend=args.backend, lazy=True)
+        try:
+            if args.command == "export":
+                count = export_bundle(cache, args.bundle, args.prefixes or SRD_PREFIXES)
+                print(f"Exported {count} entries to {args.bundle}", file=sys.stderr)
+            else:
+                count = import_bundle(cache, args.bundle, overwrite=args.overwrite,
+                                      keep_timestamps=args.keep_timestamps)
+                print(f"Imported {count} entries into {args.cache_dir}", file=sys.stderr)
+        finally:
+            cache.close()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Sorted key index for the APICache.
+
+Cache keys are namespaced by prefix (``dnd_items_``, ``campaign_characters_``
+and so on), so keeping them sorted lets prefix lookups binary-search to the
+first match and read only the matching keys instead of scanning every key.
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List
+
+
+class KeyIndex:
+    """A sorted set of keys supporting prefix range queries.
+
+    Not thread-safe on its own; callers guard it with the cache lock.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """Initialize the index.
+
+        Args:
+            keys: Keys to index initially
+        """
+        self._keys: List[str] = sorted(set(keys))
+
+    def add(self, key: str) -> None:
+        """Add a key if it is not already indexed."""
+        position = bisect_left(self._keys, key)
+        if position == len(self._keys) or self._keys[position] != key:
+            self._keys.insert(position, key)
+
+    def discard(self, key: str) -> None:
+        """Remove a key if it is indexed."""
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Return the indexed keys starting with a prefix.
+
+        Args:
+            prefix: The prefix to match
+
+        Returns:
+            Matching keys in sorted order
+        """
+        start = bisect_left(self._keys, prefix)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(prefix):
+            end += 1
+        return self._keys[start:end]
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self._keys = []
+
+    def __contains__(self, key: str) -> bool:
+        position = bisect_left(self._keys, key)
+        return position < len(self._keys) and self._keys[position] == key
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(list(self._keys))
@@ -0,0 +1,90 @@
+"""
+Canonical cache keys for SRD data.
+
+Tools, resources and prompts all reach the same D&D 5e API entities, often
+from user-typed names ("Fireball", "Tasha's Hideous Laughter", "bag_of_holding").
+Every SRD access builds its key here so one entity is cached once, under the
+same index the API uses in its URLs::
+
+    dnd_categories
+    dnd_items_{category}
+    dnd_item_{category}_{index}
+    dnd_summaries_{category}
+
+``dnd_item_`` entries are always complete REST detail records. Partial
+records from GraphQL bulk loads are kept apart, under ``dnd_summaries_``, and
+are only read by the index builders that need a few fields of every item.
+"""
+
+import re
+
+SRD_PREFIX = "dnd_"
+
+# Straight and typographic apostrophes and backticks are dropped, as in the
+# API's own indexes ("tashas-hideous-laughter")
+_APOSTROPHES = re.compile(r"['‘’`]")
+_SEPARATORS = re.compile(r"[\s_/]+")
+_INVALID = re.compile(r"[^a-z0-9-]")
+_HYPHENS = re.compile(r"-{2,}")
+
+
+def normalize_index(name: str) -> str:
+    """Convert an entity name or index to its API index.
+
+    Args:
+        name: Entity name or index, e.g. "Tasha's Hideous Laughter"
+
+    Returns:
+        The lowercase, hyphenated index, e.g. "tashas-hideous-laughter"
+    """
+    index = _APOSTROPHES.sub("", (name or "").strip().lower())
+    index = _SEPARATORS.sub("-", index)
+    index = _INVALID.sub("", index)
+    return _HYPHENS.sub("-", index).strip("-")
+
+
+def normalize_category(category: str) -> str:
+    """Convert a category name to its API endpoint, e.g. "Magic Items" -> "magic-items"."""
+    return normalize_index(category)
+
+
+def categories_key() -> str:
+    """Key for the list of SRD categories."""
+    return f"{SRD_PREFIX}categories"
+
+
+def category_items_key(category: str) -> str:
+    """Key for the list of items in a category.
+
+    Args:
+        category: Category name or endpoint
+
+    Returns:
+        The canonical cache key
+    """
+    return f"{SRD_PREFIX}items_{normalize_category(category)}"
+
+
+def item_key(category: str, index: str) -> str:
+    """Key for a single item.
+
+    Args:
+        category: Category name or endpoint
+        index: Item name or index
+
+    Returns:
+        The canonical cache key
+    """
+    return f"{SRD_PREFIX}item_{normalize_category(category)}_{normalize_index(index)}"
+
+
+def category_summaries_key(category: str) -> str:
+    """Key for the partial records of every item in a category, from a bulk load.
+
+    Args:
+        category: Category name or endpoint
+
+    Returns:
+        The canonical cache key
+    """
+    return f"{SRD_PREFIX}summaries_{normalize_category(category)}"
@@ -0,0 +1,88 @@
+"""
+Inter-process file locks for the persistent cache.
+
+Several server processes (one per MCP client) can share one cache directory.
+``InterProcessLock`` serializes their access with ``fcntl.flock`` on a lock
+file next to the data it protects. Shared locks allow concurrent readers;
+exclusive locks are taken for writes, compaction and index rewrites.
+
+On platforms without ``fcntl`` the lock only serializes threads within the
+current process, so a cache directory must not be shared there.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class InterProcessLock:
+    """A reader/writer lock shared by every process using the same lock file.
+
+    The lock is not reentrant. Within one process it also serializes threads,
+    since ``flock`` locks belong to the open file and not to a thread.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the lock.
+
+        Args:
+            path: Lock file path; created if it does not exist
+        """
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        if fcntl is None:
+            logger.warning("fcntl is unavailable; cache locks only apply within this process")
+
+    def _acquire(self, operation: int) -> None:
+        self._thread_lock.acquire()
+        if fcntl is None:
+            return
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, operation)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def _release(self) -> None:
+        try:
+            if fcntl is not None and self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Hold the lock in shared (read) mode."""
+        self._acquire(fcntl.LOCK_SH if fcntl is not None else 0)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Hold the lock in exclusive (write) mode."""
+        self._acquire(fcntl.LOCK_EX if fcntl is not None else 0)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def close(self) -> None:
+        """Close the lock file descriptor."""
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,60 @@
+"""
+Per-namespace cache policies for the APICache.
+
+SRD data almost never changes, while campaign rows from Supabase change
+whenever a player edits their character. A ``CachePolicy`` lets each key
+prefix choose its own freshness, staleness bound, negative-result lifetime
+and whether its entries are written to disk.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+import os
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Caching rules for the keys under one prefix.
+
+    Attributes:
+        ttl: How long an entry is fresh
+        max_stale: How long past its TTL an entry may still be served by
+            get_or_refresh while it is refreshed in the background
+        negative_ttl: How long "not found" results are remembered
+        persistent: Whether entries are written to the persistent store
+    """
+    ttl: timedelta
+    max_stale: timedelta = field(default_factory=timedelta)
+    negative_ttl: timedelta = timedelta(minutes=5)
+    persistent: bool = True
+
+    @property
+    def retention(self) -> timedelta:
+        """How long an entry is kept at all (TTL plus the staleness bound)."""
+        return self.ttl + self.max_stale
+
+    def to_dict(self) -> dict:
+        """Convert the policy to a dictionary of seconds for reporting."""
+        return {
+            "ttl_seconds": self.ttl.total_seconds(),
+            "max_stale_seconds": self.max_stale.total_seconds(),
+            "negative_ttl_seconds": self.negative_ttl.total_seconds(),
+            "persistent": self.persistent,
+        }
+
+
+# How long expired SRD entries may still be served while they are refreshed.
+# SRD content effectively never changes, so it is kept for a year and revalidated.
+SRD_MAX_STALE_HOURS = 24 * 365
+
+# How long campaign query results are fresh; players edit these during play
+CAMPAIGN_CACHE_TTL_SECONDS = int(os.environ.get("DND_CAMPAIGN_CACHE_SECONDS", "60"))
+
+# Caching rules per key prefix used by the server and the cache command-line
+# tools; keys without a matching prefix use the SRD defaults
+SERVER_CACHE_POLICIES = {
+    "dnd_": CachePolicy(ttl=timedelta(hours=24), max_stale=timedelta(hours=SRD_MAX_STALE_HOURS)),
+    "campaign_": CachePolicy(ttl=timedelta(seconds=CAMPAIGN_CACHE_TTL_SECONDS),
+                             negative_ttl=timedelta(minutes=1), persistent=False),
+}
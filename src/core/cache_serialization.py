@@ -0,0 +1,197 @@
+"""
+Value serialization for the persistent cache.
+
+Every serialized value starts with a small versioned header::
+
+    b"DNDC" | format version | codec | compression
+
+followed by the encoded (and possibly compressed) payload. Values written
+before the header existed are plain pickles. Unpickling runs arbitrary code,
+so serializers refuse pickled data unless created with ``allow_pickle=True``;
+only ``legacy_loads``, used once to migrate old cache directories and journal
+records to the current format, does so.
+
+Codecs:
+
+- ``json``: compact UTF-8 JSON. SRD and Supabase payloads are JSON already,
+  so this round-trips them exactly and is safe to read from a shared directory.
+  As with any JSON round-trip, tuples come back as lists and dictionary keys
+  as strings.
+- ``msgpack``: a denser binary encoding of the same data model, used when the
+  optional ``msgpack`` package is installed.
+- ``pickle``: a fallback for values that are not JSON-compatible, only with
+  ``allow_pickle=True``.
+
+Compression is ``none``, ``zlib`` or ``zstd`` (requires the optional
+``zstandard`` package). Small payloads are stored uncompressed.
+"""
+
+from typing import Any
+import json
+import pickle
+import struct
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"DNDC"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct(">4sBBB")
+
+CODECS = {"json": 1, "msgpack": 2, "pickle": 3}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+
+_CODEC_NAMES = {code: name for name, code in CODECS.items()}
+_COMPRESSION_NAMES = {code: name for name, code in COMPRESSIONS.items()}
+
+
+class Serializer:
+    """Encode cache values with a versioned header and optional compression."""
+
+    def __init__(self, codec: str = "json", compression: str = "zlib",
+                 compress_min_bytes: int = 512, level: int = 6, allow_pickle: bool = False):
+        """Initialize the serializer.
+
+        Args:
+            codec: Payload encoding ("json", "msgpack" or "pickle")
+            compression: Payload compression ("none", "zlib" or "zstd")
+            compress_min_bytes: Payloads smaller than this are not compressed
+            level: Compression level
+            allow_pickle: Whether pickled values (legacy files and the fallback
+                codec) may be written and read. Without it, values that are not
+                JSON-compatible cannot be serialized.
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown cache codec '{codec}'. Choose from: {', '.join(CODECS)}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown cache compression '{compression}'. Choose from: {', '.join(COMPRESSIONS)}")
+        if codec == "msgpack" and msgpack is None:
+            raise ValueError("The msgpack codec requires the 'msgpack' package")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        if codec == "pickle" and not allow_pickle:
+            raise ValueError("The pickle codec cannot be used with allow_pickle=False")
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+        self.allow_pickle = allow_pickle
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value.
+
+        Args:
+            value: The value to serialize
+
+        Returns:
+            The header followed by the encoded payload
+        """
+        codec = self.codec
+        try:
+            payload = self._encode(codec, value)
+        except (TypeError, ValueError):
+            if not self.allow_pickle:
+                raise
+            codec = "pickle"
+            payload = self._encode(codec, value)
+
+        compression = "none"
+        if self.compression != "none" and len(payload) >= self.compress_min_bytes:
+            compressed = self._compress(payload)
+            if len(compressed) < len(payload):
+                compression = self.compression
+                payload = compressed
+
+        return _HEADER.pack(MAGIC, FORMAT_VERSION, CODECS[codec], COMPRESSIONS[compression]) + payload
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize a value written by ``dumps`` or by the legacy pickle format.
+
+        Args:
+            data: Serialized bytes
+
+        Returns:
+            The deserialized value
+
+        Raises:
+            ValueError: If the format is unknown or pickled data is not allowed
+        """
+        if not data.startswith(MAGIC):
+            if not self.allow_pickle:
+                raise ValueError("Refusing to load a legacy pickle cache value")
+            return pickle.loads(data)
+
+        _, version, codec_id, compression_id = _HEADER.unpack_from(data)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version {version}")
+        codec = _CODEC_NAMES.get(codec_id)
+        compression = _COMPRESSION_NAMES.get(compression_id)
+        if codec is None or compression is None:
+            raise ValueError(f"Unknown cache codec {codec_id} or compression {compression_id}")
+
+        payload = data[_HEADER.size:]
+        if compression == "zlib":
+            payload = zlib.decompress(payload)
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ValueError("Reading zstd cache values requires the 'zstandard' package")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+
+        if codec == "json":
+            return json.loads(payload)
+        if codec == "msgpack":
+            if msgpack is None:
+                raise ValueError("Reading msgpack cache values requires the 'msgpack' package")
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if not self.allow_pickle:
+            raise ValueError("Refusing to load a pickled cache value")
+        return pickle.loads(payload)
+
+    def is_current(self, data: bytes) -> bool:
+        """Return whether serialized bytes use the current header format.
+
+        Values in older formats (legacy pickles or earlier header versions)
+        should be rewritten when they are migrated.
+        """
+        if not data.startswith(MAGIC) or len(data) < _HEADER.size:
+            return False
+        return _HEADER.unpack_from(data)[1] == FORMAT_VERSION
+
+    def _encode(self, codec: str, value: Any) -> bytes:
+        if codec == "json":
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=False,
+                              allow_nan=False).encode("utf-8")
+        if codec == "msgpack":
+            return msgpack.packb(value, use_bin_type=True)
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(payload)
+        return zlib.compress(payload, self.level)
+
+
+def legacy_loads(data: bytes) -> Any:
+    """Read a value written by an older version, including plain pickles.
+
+    Only for migrating legacy cache files and journal records, which are
+    rewritten in the current format once read.
+
+    Args:
+        data: Serialized bytes
+
+    Returns:
+        The deserialized value
+    """
+    return Serializer(allow_pickle=True).loads(data)
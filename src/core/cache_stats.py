@@ -0,0 +1,141 @@
+"""
+Statistics for the APICache.
+
+Counts cache events and times loads, both overall and broken down by key
+namespace, so TTLs and prefetch lists can be tuned from real traffic.
+"""
+
+from collections import defaultdict
+from typing import Dict, Any, Iterable
+import threading
+
+# Key prefixes reported separately, longest first so the most specific wins
+DEFAULT_NAMESPACES = ("dnd_categories", "dnd_items_", "dnd_item_", "campaign_")
+
+# Event counters tracked for every namespace
+EVENTS = (
+    "hits",
+    "misses",
+    "expirations",
+    "stale_hits",
+    "disk_loads",
+    "sets",
+    "evictions",
+    "negative_hits",
+    "negative_stores",
+    "loads",
+    "load_errors",
+    "coalesced_waits",
+    "remote_changes",
+    "revalidations",
+    "fallbacks",
+)
+
+
+class LatencyTimer:
+    """Running count, total and maximum of observed durations."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class CacheStats:
+    """Thread-safe event counters and latency timers for a cache."""
+
+    def __init__(self, namespaces: Iterable[str] = DEFAULT_NAMESPACES):
+        """Initialize the statistics.
+
+        Args:
+            namespaces: Key prefixes to break the statistics down by
+        """
+        self.namespaces = tuple(sorted(namespaces, key=len, reverse=True))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(EVENTS, 0))
+        self._timers: Dict[str, Dict[str, LatencyTimer]] = defaultdict(lambda: defaultdict(LatencyTimer))
+
+    def namespace_for(self, key: str) -> str:
+        """Return the namespace a key is reported under."""
+        for namespace in self.namespaces:
+            if key.startswith(namespace):
+                return namespace
+        return "other"
+
+    def record(self, event: str, key: str, count: int = 1) -> None:
+        """Count an event for a key."""
+        namespace = self.namespace_for(key)
+        with self._lock:
+            self._counters[namespace][event] += count
+
+    def observe(self, timer: str, key: str, seconds: float) -> None:
+        """Record the duration of an operation for a key."""
+        namespace = self.namespace_for(key)
+        with self._lock:
+            self._timers[namespace][timer].observe(seconds)
+
+    def total(self, event: str) -> int:
+        """Return the total count of an event across all namespaces."""
+        with self._lock:
+            return sum(counters[event] for counters in self._counters.values())
+
+    def reset(self) -> None:
+        """Reset all counters and timers."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters and timers, totalled and per namespace."""
+        with self._lock:
+            totals = dict.fromkeys(EVENTS, 0)
+            total_timers: Dict[str, LatencyTimer] = defaultdict(LatencyTimer)
+            namespaces = {}
+
+            for namespace in sorted(set(self._counters) | set(self._timers)):
+                counters = dict(self._counters.get(namespace, dict.fromkeys(EVENTS, 0)))
+                timers = self._timers.get(namespace, {})
+                for event, value in counters.items():
+                    totals[event] += value
+                for name, timer in timers.items():
+                    merged = total_timers[name]
+                    merged.count += timer.count
+                    merged.total += timer.total
+                    merged.max = max(merged.max, timer.max)
+
+                namespaces[namespace] = {
+                    **counters,
+                    "hit_rate": _hit_rate(counters),
+                    "latency": {name: timer.to_dict() for name, timer in timers.items()},
+                }
+
+            return {
+                **totals,
+                "hit_rate": _hit_rate(totals),
+                "latency": {name: timer.to_dict() for name, timer in total_timers.items()},
+                "namespaces": namespaces,
+            }
+
+
+def _hit_rate(counters: Dict[str, int]) -> float:
+    """Fraction of lookups answered from the cache (fresh or stale).
+
+    Expirations are also counted as misses, so they are not added again here.
+    """
+    served = counters["hits"] + counters["stale_hits"]
+    lookups = served + counters["misses"]
+    return round(served / lookups, 4) if lookups else 0.0
@@ -0,0 +1,756 @@
+"""
+Persistent storage backends for the APICache.
+
+Three backends are provided:
+
+- ``PickleFileStore``: the original layout, one pickle file per key plus an
+  ``index.json`` mapping keys to timestamps.
+- ``FileStore``: the same layout with values written by a ``Serializer``
+  (compact JSON, optionally compressed) to ``.bin`` files. Legacy ``.pickle``
+  files are still read and are replaced on the next write.
+- ``JournalStore``: an append-only log of records with a compact on-disk
+  index. Each write is a single append, so warming thousands of SRD entries
+  does not re-read and rewrite a growing index file on every ``set``.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import logging
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import zlib
+
+from src.core.cache_locking import InterProcessLock
+from src.core.cache_serialization import Serializer, legacy_loads
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write a file so readers see either the old or the new contents, never a mix.
+
+    The data is written to a temporary file in the same directory, flushed to
+    disk and renamed over the target.
+
+    Args:
+        path: Destination file path
+        data: Bytes to write
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CacheStore:
+    """Base class for persistent cache backends."""
+
+    def load_index(self) -> Dict[str, datetime]:
+        """Return the persisted keys mapped to the time they were cached."""
+        raise NotImplementedError
+
+    def read(self, key: str) -> Any:
+        """Read a persisted value.
+
+        Raises:
+            KeyError: If the key is not persisted
+        """
+        raise NotImplementedError
+
+    def write(self, key: str, value: Any, timestamp: datetime) -> None:
+        """Persist a value."""
+        raise NotImplementedError
+
+    def delete(self, keys: List[str]) -> None:
+        """Remove keys from persistent storage."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove every persisted entry."""
+        raise NotImplementedError
+
+    def refresh(self) -> Dict[str, Optional[datetime]]:
+        """Return keys changed by other processes since the last call.
+
+        Returns:
+            Changed keys mapped to their new timestamp, or None if deleted.
+            Backends that do not track other processes return an empty dict.
+        """
+        return {}
+
+    def close(self) -> None:
+        """Release any open file handles."""
+
+
+class PickleFileStore(CacheStore):
+    """One pickle file per key with a JSON index of timestamps.
+
+    Value files and the index are replaced atomically, and index updates are
+    serialized (across processes, through ``index.json.lock``) so concurrent
+    writers cannot drop each other's entries.
+    """
+
+    EXTENSION = ".pickle"
+
+    def __init__(self, cache_dir: str, serializer: Optional[Serializer] = None):
+        """Initialize the store.
+
+        Args:
+            cache_dir: Directory to store cache files
+            serializer: Value serializer (None to write plain pickles)
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.serializer = serializer
+        self._index_lock = InterProcessLock(self.index_path + ".lock")
+
+    def path_for(self, key: str) -> str:
+        """Get the file path for a cache key.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The file path for the cache key
+        """
+        # Convert the key to a valid filename
+        filename = key.replace("/", "_").replace(":", "_")
+        return os.path.join(self.cache_dir, f"{filename}{self.EXTENSION}")
+
+    def _dumps(self, value: Any) -> bytes:
+        if self.serializer is None:
+            return pickle.dumps(value)
+        return self.serializer.dumps(value)
+
+    def _loads(self, data: bytes) -> Any:
+        if self.serializer is None:
+            return pickle.loads(data)
+        return self.serializer.loads(data)
+
+    def _read_index_file(self) -> Dict[str, str]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _write_index_file(self, index: Dict[str, str]) -> None:
+        atomic_write(self.index_path, json.dumps(index).encode("utf-8"))
+
+    def load_index(self) -> Dict[str, datetime]:
+        with self._index_lock.shared():
+            index = self._read_index_file()
+        return {key: datetime.fromisoformat(timestamp_str)
+                for key, timestamp_str in index.items()}
+
+    def read(self, key: str) -> Any:
+        cache_path = self.path_for(key)
+        if not os.path.exists(cache_path):
+            raise KeyError(key)
+        with open(cache_path, "rb") as f:
+            return self._loads(f.read())
+
+    def write(self, key: str, value: Any, timestamp: datetime) -> None:
+        # The value file lands before the index entry that points at it
+        atomic_write(self.path_for(key), self._dumps(value))
+
+        with self._index_lock.exclusive():
+            index = self._read_index_file()
+            index[key] = timestamp.isoformat()
+            self._write_index_file(index)
+
+    def delete(self, keys: List[str]) -> None:
+        # Drop index entries first so a crash never leaves entries without files
+        with self._index_lock.exclusive():
+            if os.path.exists(self.index_path):
+                index = self._read_index_file()
+                for key in keys:
+                    index.pop(key, None)
+                self._write_index_file(index)
+
+        for key in keys:
+            cache_path = self.path_for(key)
+            if os.path.exists(cache_path):
+                os.unlink(cache_path)
+
+    def clear(self) -> None:
+        with self._index_lock.exclusive():
+            for filename in os.listdir(self.cache_dir):
+                file_path = os.path.join(self.cache_dir, filename)
+                # Other processes may be holding the lock file
+                if os.path.isfile(file_path) and not filename.endswith(".lock"):
+                    os.unlink(file_path)
+
+    def close(self) -> None:
+        self._index_lock.close()
+
+
+class FileStore(PickleFileStore):
+    """One serialized file per key with a JSON index of timestamps.
+
+    Reads fall back to a legacy ``.pickle`` file for keys written by
+    ``PickleFileStore``, the one case this store unpickles; the next write of
+    the key replaces it.
+    """
+
+    EXTENSION = ".bin"
+
+    def __init__(self, cache_dir: str, serializer: Optional[Serializer] = None):
+        """Initialize the store.
+
+        Args:
+            cache_dir: Directory to store cache files
+            serializer: Value serializer (defaults to compressed compact JSON)
+        """
+        super().__init__(cache_dir, serializer or Serializer())
+
+    def legacy_path_for(self, key: str) -> str:
+        """Get the path a ``PickleFileStore`` would have used for a key."""
+        return os.path.splitext(self.path_for(key))[0] + PickleFileStore.EXTENSION
+
+    def read(self, key: str) -> Any:
+        try:
+            return super().read(key)
+        except KeyError:
+            legacy_path = self.legacy_path_for(key)
+            if not os.path.exists(legacy_path):
+                raise
+            with open(legacy_path, "rb") as f:
+                return legacy_loads(f.read())
+
+    def write(self, key: str, value: Any, timestamp: datetime) -> None:
+        super().write(key, value, timestamp)
+        legacy_path = self.legacy_path_for(key)
+        if os.path.exists(legacy_path):
+            os.unlink(legacy_path)
+
+    def delete(self, keys: List[str]) -> None:
+        super().delete(keys)
+        for key in keys:
+            legacy_path = self.legacy_path_for(key)
+            if os.path.exists(legacy_path):
+                os.unlink(legacy_path)
+
+
+class JournalStore(CacheStore):
+    """Append-only journal with a compact index and periodic compaction.
+
+    Every record is ``header + key + value`` where the header holds the
+    operation, the key and value lengths, the timestamp and a CRC32 of the
+    payload. Deletes append tombstones. The in-memory index maps each live key
+    to the offset of its latest record, and is snapshotted to ``journal.idx``
+    every ``snapshot_interval`` records and on compaction, so startup only
+    replays the tail of the log.
+
+    Values are read through a read-only memory map of the journal, so
+    processes sharing a cache directory share one copy in the page cache.
+    In shared mode every operation holds an inter-process lock on
+    ``journal.lock`` and first catches up with records appended by other
+    processes; a replaced journal (after another process compacts or clears
+    it) is replayed from scratch. Keys changed by other processes are
+    reported by ``refresh``.
+    """
+
+    JOURNAL_FILE = "journal.log"
+    INDEX_FILE = "journal.idx"
+    LOCK_FILE = "journal.lock"
+    INDEX_VERSION = 1
+
+    _HEADER = struct.Struct(">BHIdI")
+    _OP_SET = 1
+    _OP_DELETE = 2
+
+    def __init__(self, cache_dir: str, compact_min_bytes: int = 4 * 1024 * 1024,
+                 compact_ratio: float = 0.5, snapshot_interval: int = 1000,
+                 serializer: Optional[Serializer] = None, shared: bool = False):
+        """Initialize the store and replay the journal.
+
+        Args:
+            cache_dir: Directory to store the journal and index
+            compact_min_bytes: Dead bytes required before compaction is considered
+            compact_ratio: Fraction of the journal that must be dead to compact
+            snapshot_interval: Number of appended records between index snapshots
+            serializer: Value serializer (defaults to compressed compact JSON).
+                A journal written by an older version is compacted once when
+                opened, rewriting records stored as plain pickles in the
+                current format.
+            shared: Whether other processes use the same cache directory
+        """
+        self.cache_dir = cache_dir
+        self.serializer = serializer or Serializer()
+        self.journal_path = os.path.join(cache_dir, self.JOURNAL_FILE)
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self.snapshot_interval = snapshot_interval
+        self.shared = shared
+
+        # key -> (record offset, record length, timestamp)
+        self._index: Dict[str, Tuple[int, int, float]] = {}
+        self._dead_bytes = 0
+        self._live_bytes = 0
+        self._appends_since_snapshot = 0
+        self._lock = threading.Lock()
+        self._journal = None
+        self._map = None
+        self._map_file = None
+        # Journal bytes already replayed and the identity of the file they came from
+        self._scanned = 0
+        self._journal_id: Optional[Tuple[int, int]] = None
+        # Keys changed by other processes since the last refresh (None when deleted)
+        self._changes: Dict[str, Optional[float]] = {}
+        self._process_lock = (
+            InterProcessLock(os.path.join(cache_dir, self.LOCK_FILE)) if shared else None)
+        # Whether every record is known to be in the current value format
+        self._values_current = False
+
+        with self._locked(exclusive=True, sync=False):
+            self._replay(truncate=True)
+            if not self._values_current:
+                self._compact()
+
+    @contextmanager
+    def _locked(self, exclusive: bool, sync: bool = True) -> Iterator[None]:
+        """Hold the store lock, and in shared mode the inter-process lock.
+
+        Args:
+            exclusive: Take the inter-process lock for writing
+            sync: Catch up with other processes' changes before continuing
+        """
+        with self._lock:
+            if self._process_lock is None:
+                yield
+                return
+            with (self._process_lock.exclusive() if exclusive else self._process_lock.shared()):
+                if sync:
+                    self._sync(truncate=exclusive)
+                yield
+
+    # -- on-disk format -----------------------------------------------------
+
+    def _encode(self, op: int, key: str, payload: bytes, timestamp: float) -> bytes:
+        key_bytes = key.encode("utf-8")
+        crc = zlib.crc32(key_bytes + payload)
+        header = self._HEADER.pack(op, len(key_bytes), len(payload), timestamp, crc)
+        return header + key_bytes + payload
+
+    def _file_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return st.st_dev, st.st_ino
+
+    def _load_snapshot(self) -> int:
+        """Load the index snapshot and return the journal offset it covers."""
+        self._index = {}
+        self._dead_bytes = 0
+        self._values_current = False
+        if not os.path.exists(self.index_path):
+            return 0
+        try:
+            with open(self.index_path, "r") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != self.INDEX_VERSION:
+                return 0
+            journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+            covered = snapshot.get("journal_size", 0)
+            if covered > journal_size:
+                # Snapshot is newer than the log it describes; rebuild from scratch
+                return 0
+            self._index = {key: (entry[0], entry[1], entry[2])
+                           for key, entry in snapshot.get("entries", {}).items()}
+            self._dead_bytes = snapshot.get("dead_bytes", 0)
+            self._values_current = snapshot.get("values_current", False)
+            return covered
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable journal index: {e}")
+            self._index = {}
+            self._dead_bytes = 0
+            return 0
+
+    def _replay(self, truncate: bool) -> None:
+        """Rebuild the in-memory index from the snapshot and the journal tail.
+
+        Args:
+            truncate: Whether a torn trailing record may be cut off (only safe
+                while holding the journal exclusively)
+        """
+        self._close_files()
+        offset = self._load_snapshot()
+        self._journal_id = self._file_id()
+        if self._journal_id is None:
+            self._index = {}
+            self._dead_bytes = 0
+            self._live_bytes = 0
+            self._scanned = 0
+            self._values_current = True
+            return
+        snapshot_offset = offset
+
+        self._live_bytes = sum(entry[1] for entry in self._index.values())
+        offset = self._scan(offset, truncate)
+        if truncate and offset > snapshot_offset:
+            self._write_snapshot(offset)
+
+    def _scan(self, offset: int, truncate: bool,
+              changes: Optional[Dict[str, Optional[float]]] = None) -> int:
+        """Apply the journal records from ``offset`` onwards to the index.
+
+        Args:
+            offset: Journal offset to start reading at
+            truncate: Whether a torn trailing record may be cut off
+            changes: Collects the keys touched by the scanned records
+
+        Returns:
+            The offset just past the last complete record
+        """
+        journal_size = os.path.getsize(self.journal_path)
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            while offset + self._HEADER.size <= journal_size:
+                header = f.read(self._HEADER.size)
+                op, key_len, value_len, timestamp, crc = self._HEADER.unpack(header)
+                record_len = self._HEADER.size + key_len + value_len
+                if op not in (self._OP_SET, self._OP_DELETE) or offset + record_len > journal_size:
+                    break
+                body = f.read(key_len + value_len)
+                if zlib.crc32(body) != crc:
+                    break
+                key = body[:key_len].decode("utf-8")
+
+                previous = self._index.pop(key, None)
+                if previous is not None:
+                    self._dead_bytes += previous[1]
+                    self._live_bytes -= previous[1]
+                if op == self._OP_SET:
+                    self._index[key] = (offset, record_len, timestamp)
+                    self._live_bytes += record_len
+                else:
+                    self._dead_bytes += record_len
+                if changes is not None:
+                    changes[key] = timestamp if op == self._OP_SET else None
+                offset += record_len
+
+        if offset < journal_size and truncate:
+            # A torn write from a crash; drop the partial record
+            logger.warning(
+                f"Truncating {journal_size - offset} trailing bytes from cache journal")
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(offset)
+
+        self._scanned = offset
+        return offset
+
+    def _sync(self, truncate: bool) -> None:
+        """Catch up with changes other processes made to the journal."""
+        journal_id = self._file_id()
+        if journal_id is not None and journal_id == self._journal_id:
+            if os.path.getsize(self.journal_path) > self._scanned:
+                self._scan(self._scanned, truncate, self._changes)
+            return
+
+        # The journal was compacted, cleared or created by another process
+        before = {key: entry[2] for key, entry in self._index.items()}
+        self._replay(truncate)
+        after = {key: entry[2] for key, entry in self._index.items()}
+        for key in before.keys() | after.keys():
+            if before.get(key) != after.get(key):
+                self._changes[key] = after.get(key)
+
+    def _close_files(self) -> None:
+        """Close the append handle and memory map, e.g. after the file was replaced."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._map_file is not None:
+            self._map_file.close()
+            self._map_file = None
+
+    def _read_record(self, offset: int, record_len: int) -> bytes:
+        """Read a record through the memory map, remapping when the journal has grown."""
+        if self._map is None or offset + record_len > len(self._map):
+            if self._map is not None:
+                self._map.close()
+                self._map_file.close()
+            self._map_file = open(self.journal_path, "rb")
+            self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:offset + record_len]
+
+    def _append(self, record: bytes, count: int = 1) -> int:
+        """Append one or more encoded records and return the starting offset."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        self._journal.seek(0, os.SEEK_END)
+        offset = self._journal.tell()
+        self._journal.write(record)
+        self._journal.flush()
+        if self._journal_id is None:
+            self._journal_id = self._file_id()
+        self._scanned = offset + len(record)
+        self._appends_since_snapshot += count
+        return offset
+
+    def _after_append(self) -> None:
+        """Compact or snapshot the index once enough records have accumulated."""
+        if self._should_compact():
+            self._compact()
+        elif self._appends_since_snapshot >= self.snapshot_interval:
+            self._write_snapshot(self._scanned)
+
+    def _write_snapshot(self, journal_size: int) -> None:
+        snapshot = {
+            "version": self.INDEX_VERSION,
+            "journal_size": journal_size,
+            "dead_bytes": self._dead_bytes,
+            "values_current": self._values_current,
+            "entries": {key: list(entry) for key, entry in self._index.items()},
+        }
+        atomic_write(self.index_path, json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+        self._appends_since_snapshot = 0
+
+    def _should_compact(self) -> bool:
+        if self._dead_bytes < self.compact_min_bytes:
+            return False
+        return self._dead_bytes >= (self._live_bytes + self._dead_bytes) * self.compact_ratio
+
+    def _compact(self) -> None:
+        """Rewrite the journal with only live records.
+
+        Records whose values are in an older serialization format are
+        re-encoded in the current one.
+        """
+        self._close_files()
+
+        tmp_path = self.journal_path + ".tmp"
+        new_index: Dict[str, Tuple[int, int, float]] = {}
+        offset = 0
+        with open(self.journal_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for key, (record_offset, record_len, timestamp) in sorted(
+                    self._index.items(), key=lambda item: item[1][0]):
+                src.seek(record_offset)
+                record = src.read(record_len)
+                record = self._migrate_record(key, record, timestamp)
+                record_len = len(record)
+                dst.write(record)
+                new_index[key] = (offset, record_len, timestamp)
+                offset += record_len
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+        self._index = new_index
+        self._dead_bytes = 0
+        self._values_current = True
+        self._live_bytes = offset
+        self._scanned = offset
+        self._journal_id = self._file_id()
+        self._write_snapshot(offset)
+        logger.debug(f"Compacted cache journal to {len(new_index)} records ({offset} bytes)")
+
+    def _migrate_record(self, key: str, record: bytes, timestamp: float) -> bytes:
+        """Return a record re-encoded in the current value format if it is outdated."""
+        key_len = self._HEADER.unpack_from(record)[1]
+        payload = record[self._HEADER.size + key_len:]
+        if self.serializer.is_current(payload):
+            return record
+        try:
+            value = legacy_loads(payload)
+        except Exception as e:
+            logger.warning(f"Keeping unreadable journal record for {key}: {e}")
+            return record
+        return self._encode(self._OP_SET, key, self.serializer.dumps(value), timestamp)
+
+    # -- CacheStore API -----------------------------------------------------
+
+    def load_index(self) -> Dict[str, datetime]:
+        with self._locked(exclusive=False):
+            self._changes = {}
+            return {key: datetime.fromtimestamp(entry[2]) for key, entry in self._index.items()}
+
+    def refresh(self) -> Dict[str, Optional[datetime]]:
+        """Return the keys other processes changed since the last call.
+
+        Returns:
+            Changed keys mapped to their new timestamp, or None if deleted.
+            Always empty unless the store is shared.
+        """
+        if not self.shared:
+            return {}
+        with self._locked(exclusive=False):
+            changes, self._changes = self._changes, {}
+        return {key: datetime.fromtimestamp(ts) if ts is not None else None
+                for key, ts in changes.items()}
+
+    def read(self, key: str) -> Any:
+        with self._locked(exclusive=False):
+            entry = self._index.get(key)
+            if entry is None:
+                raise KeyError(key)
+            offset, record_len, _ = entry
+            record = self._read_record(offset, record_len)
+
+        _, key_len, value_len, _, crc = self._HEADER.unpack_from(record)
+        body = record[self._HEADER.size:]
+        if zlib.crc32(body) != crc:
+            raise ValueError(f"Corrupt journal record for {key}")
+        return self.serializer.loads(body[key_len:key_len + value_len])
+
+    def write(self, key: str, value: Any, timestamp: datetime) -> None:
+        payload = self.serializer.dumps(value)
+        ts = timestamp.timestamp()
+        record = self._encode(self._OP_SET, key, payload, ts)
+        with self._locked(exclusive=True):
+            offset = self._append(record)
+            previous = self._index.get(key)
+            if previous is not None:
+                self._dead_bytes += previous[1]
+                self._live_bytes -= previous[1]
+            self._index[key] = (offset, len(record), ts)
+            self._live_bytes += len(record)
+            self._after_append()
+
+    def delete(self, keys: List[str]) -> None:
+        with self._locked(exclusive=True):
+            records = []
+            for key in keys:
+                previous = self._index.pop(key, None)
+                if previous is None:
+                    continue
+                record = self._encode(self._OP_DELETE, key, b"", datetime.now().timestamp())
+                self._dead_bytes += previous[1] + len(record)
+                self._live_bytes -= previous[1]
+                records.append(record)
+            if records:
+                self._append(b"".join(records), count=len(records))
+                self._after_append()
+
+    def clear(self) -> None:
+        with self._locked(exclusive=True):
+            self._close_files()
+            for path in (self.journal_path, self.index_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+            self._index = {}
+            self._dead_bytes = 0
+            self._live_bytes = 0
+            self._appends_since_snapshot = 0
+            self._scanned = 0
+            self._journal_id = None
+            self._values_current = True
+
+    def compact(self) -> None:
+        """Force a compaction and write a fresh index snapshot."""
+        with self._locked(exclusive=True):
+            if os.path.exists(self.journal_path):
+                self._compact()
+
+    def close(self) -> None:
+        """Snapshot the index and close the journal file handle."""
+        with self._locked(exclusive=True):
+            if self._journal is not None:
+                self._write_snapshot(self._scanned)
+            self._close_files()
+        if self._process_lock is not None:
+            self._process_lock.close()
+
+
+def import_legacy_files(store: CacheStore, cache_dir: str) -> int:
+    """Move entries from the one-file-per-key layout into another store.
+
+    Cache directories written by ``PickleFileStore`` or ``FileStore`` (an
+    ``index.json`` plus ``.pickle``/``.bin`` files) would otherwise be
+    ignored, and left on disk, after switching to the journal. Entries the
+    store already holds are kept. The legacy files are deleted once read, so
+    the import runs only once.
+
+    Args:
+        store: The store to import into
+        cache_dir: Directory that may hold legacy cache files
+
+    Returns:
+        The number of entries imported
+    """
+    if not os.path.exists(os.path.join(cache_dir, "index.json")):
+        return 0
+    # Legacy files are the one place pickled values are still accepted
+    legacy = FileStore(cache_dir, Serializer(allow_pickle=True))
+    index = legacy.load_index()
+    known = store.load_index()
+    imported = 0
+    for key, timestamp in index.items():
+        if key in known:
+            continue
+        try:
+            value = legacy.read(key)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable legacy cache entry {key}: {e}")
+            continue
+        store.write(key, value, timestamp)
+        imported += 1
+    legacy.delete(list(index))
+    legacy.close()
+    for path in (legacy.index_path, legacy.index_path + ".lock"):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    logger.info(f"Imported {imported} legacy cache entries from {cache_dir}")
+    return imported
+
+
+STORAGE_BACKENDS = {
+    "pickle": PickleFileStore,
+    "file": FileStore,
+    "journal": JournalStore,
+}
+
+
+def create_store(backend: str, cache_dir: str, serializer: Optional[Serializer] = None,
+                 shared: bool = False) -> CacheStore:
+    """Create a storage backend by name.
+
+    Args:
+        backend: Backend name ("pickle", "file" or "journal")
+        cache_dir: Directory to store persistent cache files
+        serializer: Value serializer (None for the backend's default)
+        shared: Whether other processes use the same cache directory. Only the
+            journal backend makes their writes visible to this process.
+
+    Returns:
+        The storage backend instance. A journal store first imports any
+        entries left in the directory by the file-per-key backends.
+    """
+    try:
+        store_class = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache backend '{backend}'. Choose from: {', '.join(STORAGE_BACKENDS)}")
+    if shared and store_class is not JournalStore:
+        raise ValueError("Sharing a cache directory between processes requires the journal backend")
+    if store_class is JournalStore:
+        store = JournalStore(cache_dir, serializer=serializer, shared=shared)
+        import_legacy_files(store, cache_dir)
+        return store
+    return store_class(cache_dir, serializer=serializer)
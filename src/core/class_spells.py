@@ -0,0 +1,153 @@
+"""
+Class spell lists: which spells each class can learn, by spell level.
+
+The spells' ``classes`` field is the only place the SRD records class spell
+lists, so answering "which 2nd-level spells can a bard learn?" used to mean
+fetching every spell. ``ClassSpellIndex`` inverts that field once into
+``class -> level -> [spell]`` with constant-time membership checks.
+
+The SRD store persists the same lists in its ``class_spells`` table, updated
+whenever spells are ingested. ``ClassSpellLists`` keeps the in-memory index
+in step with the store, rebuilding it when the spells are re-ingested, and
+falls back to the cached spell details when the store has no spells yet.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+import logging
+import threading
+
+from src.core import graphql_loader
+from src.core.cache_keys import normalize_index
+
+logger = logging.getLogger(__name__)
+
+
+def class_spell_entries(spell: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return a spell's class spell list entries, one per class that can learn it.
+
+    Args:
+        spell: Spell details with "index", "name", "level", "school" and "classes"
+
+    Returns:
+        Dicts with "class", "spell" (the spell's index), "name", "level" and "school"
+    """
+    index = normalize_index(spell["index"])
+    school = spell.get("school", {})
+    classes = {normalize_index(ref.get("index") or ref.get("name", ""))
+               for ref in spell.get("classes", []) if isinstance(ref, dict)}
+    return [{"class": class_index, "spell": index, "name": spell.get("name", index),
+             "level": spell.get("level"), "school": school.get("name") if isinstance(school, dict) else school}
+            for class_index in sorted(classes) if class_index]
+
+
+class ClassSpellIndex:
+    """Spells by class and level, with O(1) lookups."""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = (), stamp: Any = None):
+        """Build the index.
+
+        Args:
+            entries: Dicts with "class" and "spell" (indexes), "name", "level" and
+                "school", as returned by ``SRDStore.class_spells``
+            stamp: Marker of the data the index was built from
+        """
+        self.stamp = stamp
+        self._by_class: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+        self._members: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._spell_classes: Dict[str, List[str]] = {}
+        for entry in sorted(entries, key=lambda e: (e["class"], e.get("level") or 0, e["name"])):
+            spell = {"index": entry["spell"], "name": entry["name"],
+                     "level": entry.get("level") or 0, "school": entry.get("school")}
+            self._by_class.setdefault(entry["class"], {}).setdefault(spell["level"], []).append(spell)
+            self._members.setdefault(entry["class"], {})[spell["index"]] = spell
+            self._spell_classes.setdefault(spell["index"], []).append(entry["class"])
+
+    @classmethod
+    def from_spells(cls, spells: Iterable[Dict[str, Any]], stamp: Any = None) -> "ClassSpellIndex":
+        """Build the index from spell details carrying a "classes" list."""
+        return cls((entry for spell in spells if isinstance(spell, dict) and spell.get("index")
+                    for entry in class_spell_entries(spell)), stamp)
+
+    def classes(self) -> List[str]:
+        """Return the classes with a spell list."""
+        return sorted(self._by_class)
+
+    def has_class(self, class_name: str) -> bool:
+        """Return whether a class has a spell list."""
+        return normalize_index(class_name) in self._by_class
+
+    def levels(self, class_name: str) -> Dict[int, List[Dict[str, Any]]]:
+        """Return a class's spells keyed by spell level (0 for cantrips)."""
+        return {level: list(spells) for level, spells in
+                sorted(self._by_class.get(normalize_index(class_name), {}).items())}
+
+    def spells(self, class_name: str, min_level: int = 0, max_level: int = 9) -> List[Dict[str, Any]]:
+        """Return a class's spells within a level range, ordered by level and name.
+
+        Args:
+            class_name: Class name or index, e.g. "Wizard"
+            min_level: Minimum spell level
+            max_level: Maximum spell level
+
+        Returns:
+            Dicts with "index", "name", "level" and "school"
+        """
+        by_level = self._by_class.get(normalize_index(class_name), {})
+        return [dict(spell) for level in range(min_level, max_level + 1) for spell in by_level.get(level, [])]
+
+    def has_spell(self, class_name: str, spell_name: str) -> bool:
+        """Return whether a spell is on a class's spell list."""
+        return normalize_index(spell_name) in self._members.get(normalize_index(class_name), {})
+
+    def spell_level(self, spell_name: str) -> Optional[int]:
+        """Return a spell's level, or None if no class list has it."""
+        index = normalize_index(spell_name)
+        classes = self._spell_classes.get(index)
+        return self._members[classes[0]][index]["level"] if classes else None
+
+    def classes_for(self, spell_name: str) -> List[str]:
+        """Return the classes whose spell list has a spell."""
+        return list(self._spell_classes.get(normalize_index(spell_name), []))
+
+    def __len__(self) -> int:
+        return len(self._spell_classes)
+
+
+class ClassSpellLists:
+    """The current class spell index, kept in step with the SRD store or the cache."""
+
+    def __init__(self, store=None, cache=None):
+        """Initialize the lists.
+
+        Args:
+            store: SRD store holding the persisted class spell lists
+            cache: API cache whose spells are indexed while the store has none
+        """
+        self.store = store
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._index = ClassSpellIndex()
+
+    def current(self) -> ClassSpellIndex:
+        """Return the index, rebuilding it if the spells changed since it was built.
+
+        Until the store holds every spell, the index covers the spells the
+        cache already holds (bulk-load summaries or cached details) and may be
+        partial; it never fetches spells itself, which is left to ingestion.
+        """
+        if self.store is not None and self.store.is_loaded("spells"):
+            stamp = ("store", self.store.loaded_at("spells"))
+            if self._index.stamp != stamp:
+                self._replace(ClassSpellIndex(self.store.class_spells(), stamp))
+            return self._index
+
+        spells = graphql_loader.cached_records(self.cache, "spells")
+        stamp = ("cache", len(spells))
+        if self._index.stamp != stamp:
+            self._replace(ClassSpellIndex.from_spells(spells, stamp))
+        return self._index
+
+    def _replace(self, index: ClassSpellIndex) -> None:
+        with self._lock:
+            self._index = index
+        logger.debug(f"Class spell lists rebuilt: {len(index)} spells, {len(index.classes())} classes")
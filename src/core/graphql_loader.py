@@ -0,0 +1,208 @@
+"""
+Bulk loading of whole SRD categories through the D&D 5e API's GraphQL endpoint.
+
+The REST API needs one request per item, so reading one field of every monster
+costs over 300 requests. The GraphQL endpoint returns every item of a
+category, with the fields we ask for, in a single query. ``load_category``
+caches that response as the category's summaries, under
+``dnd_summaries_{category}``, and fills in the ``dnd_items_{category}``
+listing if it is not cached yet.
+
+Summaries keep the REST field names but are partial records: nested
+references carry ``index`` and ``name`` only (no ``url``), and fields not
+listed below (such as a monster's armor class or a weapon's damage) are
+absent. They are never written under the ``dnd_item_`` keys, which hold
+complete REST detail records; only index builders that need a few fields of
+every item (class spell lists, monster facets) read them. Prefetching a
+category this module supports stops at the one query, so item details are
+fetched over REST only when a tool asks for them.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from src.core.api_helpers import category_items_from_api
+from src.core.cache import APICache
+from src.core.cache_keys import normalize_category, category_items_key, category_summaries_key, item_key
+from src.core.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://www.dnd5eapi.co/graphql"
+
+# Upper bound on items per category; the largest (equipment) has a few hundred
+QUERY_LIMIT = 2000
+
+_REF = "{ index name }"
+
+SPELL_FIELDS = f"""
+    index name desc higher_level range components material ritual duration
+    concentration casting_time level attack_type
+    school {_REF} classes {_REF} subclasses {_REF}
+"""
+
+MONSTER_FIELDS = f"""
+    index name size type subtype alignment
+    hit_points hit_dice hit_points_roll
+    speed {{ walk swim fly burrow climb hover }}
+    strength dexterity constitution intelligence wisdom charisma
+    damage_vulnerabilities damage_resistances damage_immunities
+    condition_immunities {_REF}
+    senses {{ blindsight darkvision passive_perception tremorsense truesight }}
+    languages challenge_rating proficiency_bonus xp
+    special_abilities {{ name desc }}
+    actions {{ name desc }}
+    reactions {{ name desc }}
+    legendary_actions {{ name desc }}
+"""
+
+EQUIPMENT_FIELDS = f"""
+    index name desc
+    equipment_category {_REF}
+    cost {{ quantity unit }}
+    weight
+"""
+
+MAGIC_ITEM_FIELDS = f"""
+    index name desc
+    equipment_category {_REF}
+    rarity {{ name }}
+    variant
+"""
+
+# REST category -> (GraphQL root field, fields selected per item)
+GRAPHQL_CATEGORIES: Dict[str, Tuple[str, str]] = {
+    "spells": ("spells", SPELL_FIELDS),
+    "monsters": ("monsters", MONSTER_FIELDS),
+    "equipment": ("equipments", EQUIPMENT_FIELDS),
+    "magic-items": ("magicItems", MAGIC_ITEM_FIELDS),
+}
+
+
+def supports(category: str) -> bool:
+    """Return whether a category can be bulk loaded."""
+    return normalize_category(category) in GRAPHQL_CATEGORIES
+
+
+def build_query(category: str) -> str:
+    """Build the GraphQL query returning every item of a category.
+
+    Args:
+        category: REST category name, e.g. "magic-items"
+
+    Returns:
+        The query text
+
+    Raises:
+        ValueError: If the category cannot be bulk loaded
+    """
+    category = normalize_category(category)
+    if category not in GRAPHQL_CATEGORIES:
+        raise ValueError(f"Category '{category}' cannot be bulk loaded. "
+                         f"Choose from: {', '.join(GRAPHQL_CATEGORIES)}")
+    root, fields = GRAPHQL_CATEGORIES[category]
+    return f"query {{ {root}(limit: {QUERY_LIMIT}) {{ {' '.join(fields.split())} }} }}"
+
+
+def fetch_category(category: str, url: str = GRAPHQL_URL,
+                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Fetch every item of a category in one GraphQL request.
+
+    Args:
+        category: REST category name
+        url: GraphQL endpoint
+        timeout: Request timeout in seconds (defaults to the shared client's)
+
+    Returns:
+        The items, with REST field names
+
+    Raises:
+        ValueError: If the category cannot be bulk loaded or the response
+            reports errors
+        requests.RequestException: If the request fails
+    """
+    query = build_query(category)
+    root = GRAPHQL_CATEGORIES[normalize_category(category)][0]
+    client = get_client()
+    response = client.post(url, json={"query": query},
+                           timeout=timeout if timeout is not None else client.timeout)
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("errors"):
+        messages = "; ".join(error.get("message", "unknown error") for error in payload["errors"])
+        raise ValueError(f"GraphQL query for {category} failed: {messages}")
+    items = (payload.get("data") or {}).get(root)
+    if not isinstance(items, list):
+        raise ValueError(f"GraphQL response for {category} has no '{root}' list")
+    return items
+
+
+def load_category(cache: APICache, category: str, url: str = GRAPHQL_URL,
+                  overwrite: bool = False) -> int:
+    """Cache the summaries of every item of a category from one GraphQL response.
+
+    Args:
+        cache: The cache to fill
+        category: REST category name
+        url: GraphQL endpoint
+        overwrite: Query again even if the summaries are already cached
+
+    Returns:
+        The number of items summarized (0 if the summaries were already cached)
+
+    Raises:
+        ValueError: If the category cannot be bulk loaded or the response
+            reports errors
+        requests.RequestException: If the request fails
+    """
+    category = normalize_category(category)
+    if not overwrite and is_loaded(cache, category):
+        return 0
+    items = [item for item in fetch_category(category, url) if item.get("index")]
+    for item in items:
+        item["source"] = "D&D 5e API"
+    now = datetime.now()
+
+    listing = {"results": [{"index": item["index"], "name": item.get("name", item["index"])}
+                           for item in items]}
+    cache.load_entries([(category_items_key(category), category_items_from_api(category, listing), now)],
+                       keep_timestamps=False)
+    cache.set(category_summaries_key(category), items)
+
+    logger.info(f"Bulk loaded {len(items)} {category} summaries")
+    return len(items)
+
+
+def is_loaded(cache: APICache, category: str) -> bool:
+    """Return whether a category's summaries and listing are cached and fresh."""
+    category = normalize_category(category)
+    return (cache.get(category_summaries_key(category)) is not None
+            and cache.get(category_items_key(category)) is not None)
+
+
+def cached_summaries(cache: APICache, category: str) -> Optional[List[Dict[str, Any]]]:
+    """Return a category's cached summaries, or None if it has not been bulk loaded."""
+    summaries = cache.get_retained(category_summaries_key(category))
+    return summaries if isinstance(summaries, list) else None
+
+
+def cached_records(cache: Optional[APICache], category: str) -> List[Dict[str, Any]]:
+    """Return the records of a category the cache already holds, without fetching.
+
+    The bulk-load summaries are used if cached, otherwise the detail records
+    cached for the items of the cached listing. Until the category is bulk
+    loaded or ingested the result may be partial, or empty.
+    """
+    if cache is None:
+        return []
+    category = normalize_category(category)
+    summaries = cached_summaries(cache, category)
+    if summaries is not None:
+        return summaries
+    listing = cache.get_retained(category_items_key(category))
+    if not isinstance(listing, dict):
+        return []
+    records = (cache.get_retained(item_key(category, item["index"]))
+               for item in listing.get("items", []) if item.get("index"))
+    return [record for record in records if isinstance(record, dict)]
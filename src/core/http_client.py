@@ -0,0 +1,380 @@
+"""
+HTTP fetch layer for the D&D 5e API.
+
+``fetch_json`` revalidates cached entries instead of downloading them again.
+When the cache holds validators (ETag / Last-Modified) for a key and still
+has its value, the request carries ``If-None-Match`` / ``If-Modified-Since``.
+A 304 Not Modified response returns the cached value; the caller caches it
+again, which restarts its TTL.
+
+All HTTP traffic (D&D 5e API and Supabase) goes through one shared
+``HTTPClient``, a pooled ``requests.Session`` that keeps connections alive,
+so prefetching hundreds of items reuses a handful of TLS connections instead
+of handshaking for each one. The client retries transient failures of GETs and
+keeps a circuit breaker per host (see ``resilience``), and can hold requests
+to a host to a rate and concurrency limit (see ``rate_limit``). When a request fails,
+or the host's circuit is open, ``fetch_json`` falls back to the cached value
+if there is one.
+"""
+
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.core.cache import APICache
+from src.core.rate_limit import RateLimiters
+from src.core.resilience import (CircuitBreakers, CircuitOpenError, RetryPolicy,
+                                 IDEMPOTENT_METHODS, RETRY_STATUSES)
+
+logger = logging.getLogger(__name__)
+
+# Request timeout in seconds
+REQUEST_TIMEOUT = 10
+
+# Number of hosts whose connections are pooled, and connections kept alive per host
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+
+class HTTPClient:
+    """A pooled, keep-alive HTTP session with a uniform default timeout.
+
+    Connections are pooled per host: up to ``pool_maxsize`` idle connections
+    are kept alive for each of ``pool_connections`` hosts. With
+    ``pool_block=True`` no more than ``pool_maxsize`` requests to a host run at
+    once; otherwise extra connections are opened and discarded after use.
+
+    GETs that fail with a connection error, a timeout or a retryable status
+    are retried with jittered backoff. Requests to a host whose circuit is
+    open raise ``CircuitOpenError`` without being sent. Each attempt waits for
+    a slot from the host's rate limiter, if it has one.
+    """
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE, pool_block: bool = False,
+                 headers: Optional[Dict[str, str]] = None, retry: Optional[RetryPolicy] = None,
+                 breakers: Optional[CircuitBreakers] = None,
+                 limiters: Optional[RateLimiters] = None):
+        """Initialize the client.
+
+        Args:
+            timeout: Default request timeout in seconds
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Maximum connections kept alive per host
+            pool_block: Whether to wait for a free connection instead of
+                opening more than ``pool_maxsize`` per host
+            headers: Headers sent with every request
+            retry: Retry policy for idempotent requests
+            breakers: Per-host circuit breakers
+            limiters: Per-host rate and concurrency limits (unlimited by default)
+        """
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breakers = breakers or CircuitBreakers()
+        self.limiters = limiters or RateLimiters()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        if headers:
+            self.session.headers.update(headers)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, applying the default timeout unless one is given.
+
+        Args:
+            method: HTTP method
+            url: The URL to request
+            **kwargs: Passed to ``requests.Session.request``
+
+        Returns:
+            The response; after the last attempt it may still have a
+            retryable status
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+            requests.RequestException: If the last attempt fails
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        breaker = self.breakers.for_host(host)
+        if not breaker.allow():
+            raise CircuitOpenError(host, breaker.retry_in())
+        limiter = self.limiters.for_host(host)
+
+        attempts = self.retry.attempts if method.upper() in IDEMPOTENT_METHODS else 1
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(self.retry.delay(attempt - 1))
+            last_attempt = attempt == attempts - 1
+            try:
+                with limiter.slot() if limiter is not None else nullcontext():
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not last_attempt:
+                    logger.debug(f"Retrying {method} {url} after error: {e}")
+                    continue
+                breaker.record_failure()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            if response.status_code in self.retry.retry_statuses and not last_attempt:
+                logger.debug(f"Retrying {method} {url} after status {response.status_code}")
+                response.close()
+                continue
+            break
+
+        if response.status_code in self.retry.retry_statuses:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        """Send a PATCH request."""
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        """Send a DELETE request."""
+        return self.request("DELETE", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the pool, retry, circuit breaker and rate limiter state for reporting."""
+        return {
+            "timeout_seconds": self.timeout,
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "retry": self.retry.to_dict(),
+            "circuits": self.breakers.to_dict(),
+            "rate_limits": self.limiters.to_dict(),
+        }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """Return the shared HTTP client, creating it with the defaults on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient()
+        return _client
+
+
+def configure_client(**kwargs) -> HTTPClient:
+    """Replace the shared HTTP client.
+
+    Args:
+        **kwargs: ``HTTPClient`` arguments
+
+    Returns:
+        The new shared client
+    """
+    global _client
+    client = HTTPClient(**kwargs)
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None:
+        previous.close()
+    return client
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of a fetch.
+
+    Attributes:
+        status_code: HTTP status code of the response, or 0 if no usable
+            response was received
+        data: Parsed JSON body on success, or the cached value if not modified
+            or stale
+        not_modified: True when the server answered 304 and ``data`` is the
+            value already cached (in whatever form the caller cached it)
+        stale: True when the upstream failed and ``data`` is the cached value
+            served in its place. Stale data must not be cached again, so it
+            keeps its original timestamp (loaders return it as ``Uncached``).
+        headers: Response headers
+    """
+    status_code: int
+    data: Any = None
+    not_modified: bool = False
+    stale: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def from_cache(self) -> bool:
+        """Whether ``data`` is the value already cached for the key."""
+        return self.not_modified or self.stale
+
+    @property
+    def ok(self) -> bool:
+        """Whether the fetch produced usable data."""
+        return self.status_code == 200 or self.from_cache
+
+
+def fetch_json(url: str, cache: Optional[APICache] = None, cache_key: Optional[str] = None,
+               timeout: Optional[float] = None) -> FetchResult:
+    """GET a JSON resource, revalidating the cached copy when possible.
+
+    Args:
+        url: The URL to fetch
+        cache: Cache holding the value and validators for ``cache_key``
+        cache_key: Key the caller caches the result under
+        timeout: Request timeout in seconds (defaults to the shared client's)
+
+    Returns:
+        The fetch result. Validators from a successful response are recorded
+        in the cache for ``cache_key``. If the upstream fails after retries
+        (or its circuit is open) and a value within the key's staleness bound
+        is cached, that value is returned as a stale result.
+
+    Raises:
+        requests.RequestException: If the request fails and nothing is cached
+    """
+    headers, cached = conditional_headers(cache, cache_key)
+    client = get_client()
+    try:
+        response = client.get(url, headers=headers,
+                              timeout=timeout if timeout is not None else client.timeout)
+    except requests.RequestException as e:
+        fallback = stale_result(cache, cache_key)
+        if fallback is None:
+            raise
+        logger.warning(f"Serving cached value for {url}: {e}")
+        return fallback
+
+    result = result_from_response(response, cached, cache, cache_key)
+    if result.status_code in RETRY_STATUSES:
+        fallback = stale_result(cache, cache_key, result.status_code)
+        if fallback is not None:
+            logger.warning(f"Serving cached value for {url} after status {result.status_code}")
+            return fallback
+    return result
+
+
+def stale_result(cache: Optional[APICache], cache_key: Optional[str],
+                 status_code: int = 0) -> Optional[FetchResult]:
+    """Build a stale result from the cached value, if any, for a failed fetch.
+
+    Args:
+        cache: Cache holding the value for ``cache_key``
+        cache_key: Key the caller caches the result under
+        status_code: Status of the failed response, or 0 if none was received
+
+    Returns:
+        The stale result, or None if nothing within the key's retention window
+        (TTL plus staleness bound) is cached
+    """
+    if cache is None or not cache_key:
+        return None
+    value = cache.get_retained(cache_key)
+    if value is None:
+        return None
+    cache.stats.record("fallbacks", cache_key)
+    return FetchResult(status_code, value, stale=True)
+
+
+def conditional_headers(cache: Optional[APICache], cache_key: Optional[str]) -> Tuple[Dict[str, str], Any]:
+    """Build the revalidation headers for a cached entry.
+
+    Args:
+        cache: Cache holding the value and validators for ``cache_key``
+        cache_key: Key the caller caches the result under
+
+    Returns:
+        (headers, cached value) -- both empty/None unless the cache holds
+        validators and a value for the key
+    """
+    headers = {}
+    cached = None
+    if cache is not None and cache_key:
+        validators = cache.get_validators(cache_key)
+        if validators:
+            cached = cache.peek(cache_key)
+            if cached is not None:
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+    return headers, cached
+
+
+def result_from_response(response, cached: Any, cache: Optional[APICache],
+                         cache_key: Optional[str]) -> FetchResult:
+    """Turn a response to a (possibly conditional) request into a FetchResult.
+
+    Works with both ``requests`` and ``httpx`` responses.
+
+    Args:
+        response: The HTTP response
+        cached: The cached value sent for revalidation, if any
+        cache: Cache to record validators and revalidations in
+        cache_key: Key the caller caches the result under
+
+    Returns:
+        The fetch result. A 200 response whose body is not JSON (such as a
+        proxy's HTML error page) is served from the cache as a stale result
+        if it can be, and otherwise reported with status code 0.
+    """
+    if response.status_code == 304 and cached is not None:
+        logger.debug(f"Not modified, reusing cached value: {response.url}")
+        cache.stats.record("revalidations", cache_key)
+        return FetchResult(304, cached, not_modified=True, headers=dict(response.headers))
+
+    if response.status_code != 200:
+        return FetchResult(response.status_code, headers=dict(response.headers))
+
+    try:
+        data = response.json()
+    except ValueError as e:
+        logger.warning(f"Invalid JSON from {response.url}: {e}")
+        return stale_result(cache, cache_key) or FetchResult(0, headers=dict(response.headers))
+    if cache is not None and cache_key:
+        cache.set_validators(cache_key, validators_from(response.headers))
+    return FetchResult(200, data, headers=dict(response.headers))
+
+
+def validators_from(headers) -> Dict[str, str]:
+    """Extract the cache validators from response headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        A dict with "etag" and/or "last_modified" for the headers present
+    """
+    validators = {}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators
@@ -0,0 +1,253 @@
+"""
+Faceted monster index for encounter building.
+
+``encounter_builder`` used to fetch monster after monster until five had a
+fitting challenge rating, so it always suggested the first matches in list
+order. ``MonsterFacetIndex`` holds every monster once, ordered by challenge
+rating and name, with a bitmask of monster positions per facet value:
+
+    type         "dragon", "undead", ...
+    size         "tiny" to "gargantuan"
+    alignment    "chaotic evil", "unaligned", ...
+    environment  "forest", "underdark", ... (from an "environment" list)
+
+A challenge rating range is a contiguous run of positions, and combined
+filters are bitwise ANDs of the masks, so filtering and sampling read no item
+details. ``sample`` spreads its picks across the matching challenge ratings.
+The SRD API records no environments, so monsters without environment tags
+match any environment.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, Iterable, List, Optional, Union
+import logging
+import random
+import threading
+
+from src.core import graphql_loader
+
+logger = logging.getLogger(__name__)
+
+# The facets monsters can be filtered by, besides challenge rating
+FACETS = ("type", "size", "alignment", "environment")
+
+FacetFilter = Optional[Union[str, Iterable[str]]]
+
+
+def monster_facets(monster: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Return a monster's lowercase facet values, e.g. {"type": ["dragon"], ...}."""
+    environment = monster.get("environment") or monster.get("environments") or []
+    if isinstance(environment, str):
+        environment = [environment]
+    facets = {facet: [str(monster[facet]).strip().lower()] if monster.get(facet) else []
+              for facet in ("type", "size", "alignment")}
+    facets["environment"] = sorted({str(env).strip().lower() for env in environment if env})
+    return facets
+
+
+class MonsterFacetIndex:
+    """Monsters by challenge rating and facet, with bitmask filtering and random sampling."""
+
+    def __init__(self, monsters: Iterable[Dict[str, Any]] = (), stamp: Any = None):
+        """Build the index.
+
+        Args:
+            monsters: Monster details with "index", "name" and "challenge_rating"
+            stamp: Marker of the data the index was built from
+        """
+        self.stamp = stamp
+        rows = []
+        for monster in monsters:
+            if not isinstance(monster, dict) or not monster.get("index") or "error" in monster:
+                continue
+            row = {"index": monster["index"], "name": monster.get("name", monster["index"]),
+                   "challenge_rating": monster.get("challenge_rating") or 0,
+                   "type": monster.get("type", "unknown"), "size": monster.get("size"),
+                   "alignment": monster.get("alignment"), "xp": monster.get("xp")}
+            facets = monster_facets(monster)
+            row["environment"] = facets["environment"]
+            rows.append((row, facets))
+        rows.sort(key=lambda entry: (entry[0]["challenge_rating"], entry[0]["name"]))
+
+        self.rows = [row for row, _ in rows]
+        self.challenge_ratings = [row["challenge_rating"] for row in self.rows]
+        self._all = (1 << len(self.rows)) - 1
+        self._masks: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._untagged: Dict[str, int] = {facet: 0 for facet in FACETS}
+        for position, (_, facets) in enumerate(rows):
+            bit = 1 << position
+            for facet in FACETS:
+                if not facets[facet]:
+                    self._untagged[facet] |= bit
+                for value in facets[facet]:
+                    masks = self._masks[facet]
+                    masks[value] = masks.get(value, 0) | bit
+
+    def facet_values(self, facet: str) -> Dict[str, int]:
+        """Return a facet's values with the number of monsters having each."""
+        return {value: bin(mask).count("1") for value, mask in sorted(self._masks[facet].items())}
+
+    def _facet_mask(self, facet: str, wanted: FacetFilter) -> int:
+        """Return the monsters matching any of the wanted values of a facet.
+
+        A wanted value matches the facet values that contain it or are
+        contained in it, so "evil" matches "chaotic evil" and "dark forest"
+        matches "forest".
+        """
+        if wanted is None:
+            return self._all
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        mask = self._untagged[facet] if facet == "environment" else 0
+        for query in (str(value).strip().lower() for value in wanted):
+            if not query:
+                continue
+            for value, value_mask in self._masks[facet].items():
+                if query in value or value in query:
+                    mask |= value_mask
+        return mask
+
+    def _positions(self, min_cr: Optional[float], max_cr: Optional[float], **filters: FacetFilter) -> List[int]:
+        start = bisect_left(self.challenge_ratings, min_cr) if min_cr is not None else 0
+        end = bisect_right(self.challenge_ratings, max_cr) if max_cr is not None else len(self.rows)
+        if start >= end:
+            return []
+        mask = ((1 << end) - 1) ^ ((1 << start) - 1)
+        for facet, wanted in filters.items():
+            if facet not in self._masks:
+                raise ValueError(f"Unknown monster facet: {facet}")
+            mask &= self._facet_mask(facet, wanted)
+            if not mask:
+                return []
+        mask >>= start
+        positions = []
+        position = start
+        while mask:
+            if mask & 1:
+                positions.append(position)
+            mask >>= 1
+            position += 1
+        return positions
+
+    def filter(self, min_cr: Optional[float] = None, max_cr: Optional[float] = None,
+               **filters: FacetFilter) -> List[Dict[str, Any]]:
+        """Return the monsters matching every filter, ordered by challenge rating and name.
+
+        Args:
+            min_cr: Minimum challenge rating (None for no bound)
+            max_cr: Maximum challenge rating (None for no bound)
+            **filters: Facet filters, e.g. type="undead" or size=["large", "huge"];
+                a list matches monsters with any of its values
+
+        Returns:
+            Copies of the matching monster rows
+        """
+        return [dict(self.rows[position]) for position in self._positions(min_cr, max_cr, **filters)]
+
+    def count(self, min_cr: Optional[float] = None, max_cr: Optional[float] = None,
+              **filters: FacetFilter) -> int:
+        """Return the number of monsters matching every filter."""
+        return len(self._positions(min_cr, max_cr, **filters))
+
+    def sample(self, k: int, min_cr: Optional[float] = None, max_cr: Optional[float] = None,
+               rng: Optional[random.Random] = None, **filters: FacetFilter) -> List[Dict[str, Any]]:
+        """Return up to k random monsters matching every filter.
+
+        Picks are spread evenly across the matching challenge ratings, so a
+        CR 1-3 sample is not dominated by the most common rating.
+
+        Args:
+            k: Number of monsters to return
+            min_cr: Minimum challenge rating (None for no bound)
+            max_cr: Maximum challenge rating (None for no bound)
+            rng: Random number generator (defaults to the ``random`` module)
+            **filters: Facet filters, as for ``filter``
+
+        Returns:
+            Copies of the sampled monster rows, ordered by challenge rating and name
+        """
+        rng = rng or random
+        buckets: Dict[float, List[int]] = {}
+        for position in self._positions(min_cr, max_cr, **filters):
+            buckets.setdefault(self.challenge_ratings[position], []).append(position)
+        pools = list(buckets.values())
+        for pool in pools:
+            rng.shuffle(pool)
+        rng.shuffle(pools)
+
+        picked = []
+        while pools and len(picked) < k:
+            for pool in list(pools):
+                picked.append(pool.pop())
+                if not pool:
+                    pools.remove(pool)
+                if len(picked) >= k:
+                    break
+        return [dict(self.rows[position]) for position in sorted(picked)]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class MonsterFacets:
+    """The current monster facet index, kept in step with the SRD store or the cache."""
+
+    def __init__(self, store=None, cache=None, graphql_url: Optional[str] = graphql_loader.GRAPHQL_URL):
+        """Initialize the index holder.
+
+        Args:
+            store: SRD store holding the ingested monsters
+            cache: API cache whose monsters are indexed while the store has none
+            graphql_url: GraphQL endpoint ``loaded`` bulk loads the monsters from
+                (None to never load them)
+        """
+        self.store = store
+        self.cache = cache
+        self.graphql_url = graphql_url
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._index = MonsterFacetIndex()
+
+    def current(self) -> MonsterFacetIndex:
+        """Return the index, rebuilding it if the monsters changed since it was built.
+
+        Until the store holds every monster, the index covers the monsters the
+        cache already holds (bulk-load summaries or cached details) and may be
+        partial; it never fetches monsters itself, which is left to ingestion.
+        """
+        if self.store is not None and self.store.is_loaded("monsters"):
+            stamp = ("store", self.store.loaded_at("monsters"))
+            if self._index.stamp != stamp:
+                self._replace(MonsterFacetIndex(self.store.all("monsters"), stamp))
+            return self._index
+
+        monsters = graphql_loader.cached_records(self.cache, "monsters")
+        stamp = ("cache", len(monsters))
+        if self._index.stamp != stamp:
+            self._replace(MonsterFacetIndex(monsters, stamp))
+        return self._index
+
+    def loaded(self) -> MonsterFacetIndex:
+        """Return the index, bulk loading the monsters first if it is empty.
+
+        On a cold start, before ingestion has stored or cached any monster, one
+        GraphQL query caches every monster's summary. If that fails the index
+        stays empty.
+        """
+        index = self.current()
+        if len(index) or self.cache is None or not self.graphql_url:
+            return index
+        with self._load_lock:
+            index = self.current()
+            if not len(index):
+                try:
+                    graphql_loader.load_category(self.cache, "monsters", url=self.graphql_url)
+                except Exception as e:
+                    logger.warning(f"Bulk load of monsters for the facet index failed: {e}")
+                index = self.current()
+        return index
+
+    def _replace(self, index: MonsterFacetIndex) -> None:
+        with self._lock:
+            self._index = index
+        logger.debug(f"Monster facet index rebuilt: {len(index)} monsters")
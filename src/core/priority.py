@@ -0,0 +1,32 @@
+"""
+Request priority for outbound requests.
+
+Work started from a tool call is foreground; cache warm-up, prefetching and
+background refreshes run inside ``background_priority()``. The rate limiters
+read the current priority so background requests only get a slot while no
+foreground request is waiting for the same host.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+FOREGROUND = 0
+BACKGROUND = 1
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=FOREGROUND)
+
+
+def current_priority() -> int:
+    """Return the priority of requests made in the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Run the enclosed requests at background priority."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
@@ -2,17 +2,34 @@
 import sys
 from mcp.types import PromptMessage as UserMessage, PromptMessage as AssistantMessage
 from mcp.types import TextContent
-from src.core.api_helpers import validate_dnd_entity, fetch_dnd_entity, API_BASE_URL
+from src.core.api_helpers import validate_dnd_entity, fetch_dnd_entity, fetch_dnd_category, API_BASE_URL
+from src.core.class_spells import ClassSpellLists
+from src.core.monster_index import MonsterFacets
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
 
-def register_prompts(app):
-    """Register simple prompts using FastMCP's syntax."""
+def register_prompts(app, cache=None, class_spells: ClassSpellLists = None,
+                     monster_facets: MonsterFacets = None):
+    """Register simple prompts using FastMCP's syntax.
+
+    Args:
+        app: The FastMCP app instance
+        cache: Optional shared API cache, used to skip lookups of names known not to exist
+        class_spells: Class spell lists shared with the campaign tools (built
+            from the cache if not given)
+        monster_facets: Monster facet index for encounter suggestions (built
+            from the cache if not given)
+    """
     print("Registering simple FastMCP prompts...", file=sys.stderr)
 
+    if class_spells is None:
+        class_spells = ClassSpellLists(cache=cache)
+    if monster_facets is None:
+        monster_facets = MonsterFacets(cache=cache)
+
     @app.prompt()
     def enforce_api_usage() -> str:
         """Enforce the use of D&D 5e API for all D&D-related information.
@@ -117,7 +134,8 @@ All responses about D&D content must include a reference to the D&D 5e API as th
 
         # Validate setting against locations in the API
         setting_valid = validate_dnd_entity(
-            "magic-items", setting.lower()) or validate_dnd_entity("equipment", setting.lower())
+            "magic-items", setting.lower(), cache=cache) or validate_dnd_entity(
+            "equipment", setting.lower(), cache=cache)
 
         # Find appropriate monsters based on challenge rating
         suggested_monsters = []
@@ -126,8 +144,7 @@ All responses about D&D content must include a reference to the D&D 5e API as th
             monster_search_term = theme.lower() if theme else ""
 
             # Check if any monsters match our criteria
-            from resources import get_items
-            monster_results = get_items("monsters", cache=None)
+            monster_results = fetch_dnd_category("monsters", cache=cache)
             if isinstance(monster_results, dict) and "items" in monster_results:
                 for monster in monster_results["items"]:
                     monster_name = monster.get("name", "").lower()
@@ -138,7 +155,7 @@ All responses about D&D content must include a reference to the D&D 5e API as th
                     monster_index = monster.get("index")
                     if monster_index:
                         monster_data = fetch_dnd_entity(
-                            "monsters", monster_index)
+                            "monsters", monster_index, cache=cache)
                         if monster_data:
                             cr = monster_data.get("challenge_rating", 0)
                             if min_cr <= cr <= max_cr:
@@ -173,7 +190,7 @@ All responses about D&D content must include a reference to the D&D 5e API as th
     def spell_selection(class_name: str, level: str, focus: str = None) -> str:
         """Get spell recommendations for your character"""
         # Validate class against API
-        class_valid = validate_dnd_entity("classes", class_name.lower())
+        class_valid = validate_dnd_entity("classes", class_name.lower(), cache=cache)
 
         # Parse character level
         try:
@@ -187,43 +204,20 @@ All responses about D&D content must include a reference to the D&D 5e API as th
         max_spell_level = min(9, (char_level + 1) // 2)
 
         # Get spells for this class if valid
-        class_spells = []
+        class_spells_found = []
         if class_valid:
             try:
-                # Fetch spells for this class
-                class_data = fetch_dnd_entity("classes", class_name.lower())
-
-                # Try to get spells from the API
-                from resources import get_items
-                spell_results = get_items("spells", cache=None)
-
-                if isinstance(spell_results, dict) and "items" in spell_results:
-                    # Filter spells by class and level
-                    for spell in spell_results["items"]:
-                        spell_index = spell.get("index")
-                        if spell_index:
-                            spell_data = fetch_dnd_entity(
-                                "spells", spell_index)
-                            if spell_data:
-                                # Check if this spell is for the requested class
-                                spell_classes = [c.get("name", "").lower(
-                                ) for c in spell_data.get("classes", [])]
-
-                                if class_name.lower() in spell_classes:
-                                    # Check spell level
-                                    spell_level = spell_data.get("level", 0)
-                                    if spell_level <= max_spell_level:
-                                        # Check focus if provided
-                                        if focus:
-                                            spell_school = spell_data.get(
-                                                "school", {}).get("name", "").lower()
-                                            if focus.lower() not in spell_school and focus.lower() not in spell_data.get("name", "").lower():
-                                                continue
-
-                                        class_spells.append(
-                                            spell_data.get("name"))
-                                        if len(class_spells) >= 10:  # Limit to 10 suggestions
-                                            break
+                # Spells on this class's list up to the castable level, from the class spell index
+                for spell in sorted(class_spells.current().spells(class_name, 0, max_spell_level),
+                                    key=lambda s: s["name"]):
+                    # Check focus if provided
+                    if focus and focus.lower() not in (spell["school"] or "").lower() \
+                            and focus.lower() not in spell["name"].lower():
+                        continue
+
+                    class_spells_found.append(spell["name"])
+                    if len(class_spells_found) >= 10:  # Limit to 10 suggestions
+                        break
             except Exception as e:
                 logger.error(f"Error fetching spells: {e}")
 
@@ -238,8 +232,8 @@ All responses about D&D content must include a reference to the D&D 5e API as th
             prompt_text += f"\n\nNote: '{class_name}' is not a standard D&D 5e class. I'll provide recommendations based on similar classes or homebrew options."
 
         # Add spell suggestions from API
-        if class_spells:
-            prompt_text += f"\n\nConsider these spells which are available to {class_name}s up to level {max_spell_level}: {', '.join(class_spells)}."
+        if class_spells_found:
+            prompt_text += f"\n\nConsider these spells which are available to {class_name}s up to level {max_spell_level}: {', '.join(class_spells_found)}."
 
         prompt_text += "\n\nPlease provide:\n1. Recommended cantrips\n2. Recommended spells by level\n3. Spell combinations that work well together\n4. Situational spells that could be useful"
 
@@ -281,8 +275,8 @@ All responses about D&D content must include a reference to the D&D 5e API as th
         environment_valid = True
         if environment:
             environment_valid = any([
-                validate_dnd_entity("magic-items", environment.lower()),
-                validate_dnd_entity("equipment", environment.lower()),
+                validate_dnd_entity("magic-items", environment.lower(), cache=cache),
+                validate_dnd_entity("equipment", environment.lower(), cache=cache),
                 # Common D&D environments that might not be in the API
                 environment.lower() in ["forest", "mountain", "desert", "swamp",
                                         "underdark", "dungeon", "city", "ocean",
@@ -291,40 +285,19 @@ All responses about D&D content must include a reference to the D&D 5e API as th
 
         # Find appropriate monsters based on challenge rating and environment
         suggested_monsters = []
+        monsters_known = False
         try:
-            # Get monsters from the API
-            from resources import get_items
-            monster_results = get_items("monsters", cache=None)
-
-            if isinstance(monster_results, dict) and "items" in monster_results:
-                # Filter monsters by CR and environment if provided
-                for monster in monster_results["items"]:
-                    monster_index = monster.get("index")
-                    if monster_index:
-                        monster_data = fetch_dnd_entity(
-                            "monsters", monster_index)
-                        if monster_data:
-                            cr = monster_data.get("challenge_rating", 0)
-
-                            # Check if CR is appropriate (within 50% of target)
-                            if 0.5 * target_cr <= cr <= 1.5 * target_cr:
-                                # If environment is specified, try to match it
-                                if environment:
-                                    # Check if monster environment matches
-                                    monster_env = monster_data.get(
-                                        "environment", [])
-                                    if isinstance(monster_env, list) and monster_env:
-                                        if not any(env.lower() in environment.lower() for env in monster_env):
-                                            continue
-
-                                suggested_monsters.append({
-                                    "name": monster_data.get("name"),
-                                    "cr": cr,
-                                    "type": monster_data.get("type", "unknown")
-                                })
-
-                                if len(suggested_monsters) >= 5:  # Limit to 5 suggestions
-                                    break
+            # A random sample within 50% of the target CR, spread across challenge ratings;
+            # on a cold start the monsters are bulk loaded first
+            facets = monster_facets.loaded()
+            monsters_known = len(facets) > 0
+            for monster in facets.sample(
+                    5, min_cr=0.5 * target_cr, max_cr=1.5 * target_cr, environment=environment or None):
+                suggested_monsters.append({
+                    "name": monster["name"],
+                    "cr": monster["challenge_rating"],
+                    "type": monster["type"]
+                })
         except Exception as e:
             logger.error(f"Error finding monsters: {e}")
 
@@ -342,6 +315,9 @@ All responses about D&D content must include a reference to the D&D 5e API as th
             prompt_text += "\n\nConsider using these monsters which are appropriate for this encounter's challenge rating:"
             for monster in suggested_monsters:
                 prompt_text += f"\n- {monster['name']} (CR {monster['cr']}, {monster['type']})"
+        elif not monsters_known:
+            prompt_text += ("\n\nNote: Monster data is still loading, so no monsters are suggested yet. "
+                            "Look up monsters of a suitable challenge rating with the D&D 5e API tools.")
 
         prompt_text += "\n\nPlease design an encounter that includes:"
         prompt_text += "\n1. A balanced mix of monsters"
@@ -365,7 +341,7 @@ All responses about D&D content must include a reference to the D&D 5e API as th
     def magic_item_finder(character_level: str, character_class: str, rarity: str = None) -> str:
         """Find appropriate magic items for your character"""
         # Validate class against API
-        class_valid = validate_dnd_entity("classes", character_class.lower())
+        class_valid = validate_dnd_entity("classes", character_class.lower(), cache=cache)
 
         # Parse character level
         try:
@@ -397,15 +373,14 @@ All responses about D&D content must include a reference to the D&D 5e API as th
         suggested_items = []
         try:
             # Get magic items from the API
-            from resources import get_items
-            item_results = get_items("magic-items", cache=None)
+            item_results = fetch_dnd_category("magic-items", cache=cache)
 
             if isinstance(item_results, dict) and "items" in item_results:
                 # Filter items by rarity and class appropriateness
                 for item in item_results["items"]:
                     item_index = item.get("index")
                     if item_index:
-                        item_data = fetch_dnd_entity("magic-items", item_index)
+                        item_data = fetch_dnd_entity("magic-items", item_index, cache=cache)
                         if item_data:
                             item_rarity = item_data.get(
                                 "rarity", {}).get("name", "").lower()
@@ -0,0 +1,202 @@
+"""
+Client-side rate limiting for outbound requests.
+
+Each upstream host (the D&D 5e API, the Supabase PostgREST endpoint) can get
+a ``HostLimiter``: a token bucket bounding the request rate and burst, plus a
+cap on requests in flight at once. Prefetch threads and parallel tool calls
+then queue on our side instead of bursting hundreds of requests upstream.
+
+Requests have a priority. Work started from a tool call is foreground; cache
+warm-up, prefetching and background refreshes run inside
+``background_priority()``. Background requests only get a slot while no
+foreground request is waiting for the same host. The priority itself is kept
+in ``priority``.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, Iterator, Optional
+import asyncio
+import threading
+import time
+
+from src.core.priority import FOREGROUND, BACKGROUND, current_priority
+
+# How often async waiters re-check a limiter that has no tokens or free slots
+_ASYNC_POLL_SECONDS = 0.01
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Limits for the requests to one host.
+
+    Attributes:
+        rate: Sustained requests per second (None for no rate limit)
+        burst: Requests that may be sent at once after an idle period
+        max_in_flight: Maximum concurrent requests (None for no cap)
+    """
+    rate: Optional[float] = None
+    burst: int = 1
+    max_in_flight: Optional[int] = None
+
+
+class HostLimiter:
+    """A token bucket and in-flight cap for one host, with foreground priority."""
+
+    def __init__(self, limit: RateLimit):
+        """Initialize the limiter.
+
+        Args:
+            limit: The host's limits
+        """
+        self.limit = limit
+        self._cond = threading.Condition()
+        self._tokens = float(max(limit.burst, 1))
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._waiting = {FOREGROUND: 0, BACKGROUND: 0}
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.limit.rate is None:
+            return
+        capacity = float(max(self.limit.burst, 1))
+        self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * self.limit.rate)
+        self._refilled_at = now
+
+    def _try_acquire(self, priority: int) -> Optional[float]:
+        """Take a slot if one is available; the caller holds the lock and is counted as waiting.
+
+        Returns:
+            None if a slot was taken, otherwise how long to wait before trying
+            again (0 when the wait depends on another request finishing)
+        """
+        if priority == BACKGROUND and self._waiting[FOREGROUND]:
+            return 0.0
+        if self.limit.max_in_flight is not None and self._in_flight >= self.limit.max_in_flight:
+            return 0.0
+        if self.limit.rate is not None:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.limit.rate
+            self._tokens -= 1
+        self._in_flight += 1
+        self.requests += 1
+        return None
+
+    def acquire(self, priority: Optional[int] = None) -> None:
+        """Block until a request may be sent.
+
+        Args:
+            priority: FOREGROUND or BACKGROUND (defaults to the current context's)
+        """
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    delay = self._try_acquire(priority)
+                    if delay is None:
+                        break
+                    self._cond.wait(delay or None)
+            finally:
+                self._waiting[priority] -= 1
+                self._record_wait(time.monotonic() - started)
+                self._cond.notify_all()
+
+    async def acquire_async(self, priority: Optional[int] = None) -> None:
+        """Wait without blocking the event loop until a request may be sent.
+
+        Args:
+            priority: FOREGROUND or BACKGROUND (defaults to the current context's)
+        """
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_acquire(priority)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay or _ASYNC_POLL_SECONDS)
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+                self._record_wait(time.monotonic() - started)
+                self._cond.notify_all()
+
+    def release(self) -> None:
+        """Mark a request as finished."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None) -> Iterator[None]:
+        """Hold a request slot for the enclosed request."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _record_wait(self, seconds: float) -> None:
+        # Waits shorter than a millisecond are lock contention, not throttling
+        if seconds >= 0.001:
+            self.throttled += 1
+            self.wait_seconds += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the limiter state to a dictionary for reporting."""
+        with self._cond:
+            return {
+                "rate_per_second": self.limit.rate,
+                "burst": self.limit.burst,
+                "max_in_flight": self.limit.max_in_flight,
+                "in_flight": self._in_flight,
+                "waiting_foreground": self._waiting[FOREGROUND],
+                "waiting_background": self._waiting[BACKGROUND],
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+class RateLimiters:
+    """The limiters of every configured upstream host."""
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None,
+                 default: Optional[RateLimit] = None):
+        """Initialize the registry.
+
+        Args:
+            limits: Limits keyed by host (``netloc``, e.g. "www.dnd5eapi.co")
+            default: Limits for hosts not listed (None leaves them unlimited)
+        """
+        self.default = default
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, HostLimiter] = {
+            host: HostLimiter(limit) for host, limit in (limits or {}).items()
+        }
+
+    def for_host(self, host: str) -> Optional[HostLimiter]:
+        """Return the limiter for a host, or None if the host is unlimited."""
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None and self.default is not None:
+                limiter = HostLimiter(self.default)
+                self._limiters[host] = limiter
+            return limiter
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state of every limiter, keyed by host."""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {host: limiter.to_dict() for host, limiter in sorted(limiters.items())}
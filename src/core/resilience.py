@@ -0,0 +1,200 @@
+"""
+Retries and circuit breaking for upstream HTTP calls.
+
+Transient failures (connection errors, timeouts, 429 and 5xx responses) of
+idempotent requests are retried with exponential backoff and full jitter, so
+one dropped connection does not turn into a missing search result.
+
+Each upstream host has a ``CircuitBreaker``. After ``failure_threshold``
+consecutive failed requests the circuit opens and further requests to the
+host fail immediately with ``CircuitOpenError`` instead of waiting out their
+timeouts; callers then answer from the cache. After ``reset_seconds`` one
+trial request is let through (half-open): success closes the circuit, failure
+opens it again.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+import random
+import threading
+import time
+
+import requests
+
+# Statuses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that may be retried without side effects
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}; retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How failed idempotent requests are retried.
+
+    Attributes:
+        attempts: Total attempts per request, including the first
+        base_delay: Backoff before the first retry, in seconds
+        max_delay: Upper bound on any single backoff, in seconds
+        retry_statuses: Response statuses that are retried
+    """
+    attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+
+    def delay(self, retry: int) -> float:
+        """Return the jittered backoff before a retry.
+
+        Args:
+            retry: Zero-based retry number
+
+        Returns:
+            A delay drawn uniformly from zero to the exponential backoff
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def to_dict(self) -> dict:
+        """Convert the policy to a dictionary for reporting."""
+        return {
+            "attempts": self.attempts,
+            "base_delay_seconds": self.base_delay,
+            "max_delay_seconds": self.max_delay,
+            "retry_statuses": list(self.retry_statuses),
+        }
+
+
+class CircuitBreaker:
+    """Track consecutive failures for one host and fail fast while it is down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: How long the circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """The current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now.
+
+        In the half-open state only one trial request is allowed at a time.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a trial request through."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        """Record a request the host answered; closes the circuit."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request; opens the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the breaker state to a dictionary for reporting."""
+        state = self.state
+        retry_in = self.retry_in() if state == OPEN else 0.0
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected_requests": self.rejected,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+
+
+class CircuitBreakers:
+    """The circuit breakers of every upstream host, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """Initialize the registry.
+
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit
+            reset_seconds: How long an open circuit waits before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_host(self, host: str) -> CircuitBreaker:
+        """Return the breaker for a host."""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+                self._breakers[host] = breaker
+            return breaker
+
+    def get(self, host: str) -> Optional[CircuitBreaker]:
+        """Return the breaker for a host if one exists."""
+        with self._lock:
+            return self._breakers.get(host)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state of every breaker, keyed by host."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.to_dict() for host, breaker in sorted(breakers.items())}
@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 import sys
-import requests
 import json
 import logging
 from typing import List, Dict, Any, Optional
-from src.core.cache import APICache
+from src.core.cache import APICache, Uncached
+from src.core.api_helpers import categories_from_api, category_items_from_api
+from src.core.http_client import fetch_json, get_client
+import src.core.graphql_loader as graphql_loader
+from src.core.cache_keys import (normalize_category, normalize_index, categories_key,
+                                  category_items_key, item_key)
+from src.core.priority import background_priority
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -12,115 +17,93 @@ logger = logging.getLogger(__name__)
 # Base URL for the D&D 5e API
 BASE_URL = "https://www.dnd5eapi.co/api"
 
-# Request timeout in seconds
-REQUEST_TIMEOUT = 10
-
-# Category descriptions for better resource discovery
-CATEGORY_DESCRIPTIONS = {
-    "ability-scores": "The six abilities that describe a character's physical and mental characteristics",
-    "alignments": "The moral and ethical attitudes and behaviors of creatures",
-    "backgrounds": "Character backgrounds and their features",
-    "classes": "Character classes with features, proficiencies, and subclasses",
-    "conditions": "Status conditions that affect creatures",
-    "damage-types": "Types of damage that can be dealt",
-    "equipment": "Items, weapons, armor, and gear for adventuring",
-    "equipment-categories": "Categories of equipment",
-    "feats": "Special abilities and features",
-    "features": "Class and racial features",
-    "languages": "Languages spoken throughout the multiverse",
-    "magic-items": "Magical equipment with special properties",
-    "magic-schools": "Schools of magic specialization",
-    "monsters": "Creatures and foes",
-    "proficiencies": "Skills and tools characters can be proficient with",
-    "races": "Character races and their traits",
-    "rule-sections": "Sections of the game rules",
-    "rules": "Game rules",
-    "skills": "Character skills tied to ability scores",
-    "spells": "Magic spells with effects, components, and descriptions",
-    "subclasses": "Specializations within character classes",
-    "subraces": "Variants of character races",
-    "traits": "Racial traits",
-    "weapon-properties": "Special properties of weapons"
-}
 
+def prefetch_category_items(cache: APICache, category: str, base_url: str = BASE_URL,
+                            graphql_url: Optional[str] = graphql_loader.GRAPHQL_URL) -> None:
+    """Prefetch and cache all items in a category.
 
-def register_resources(app, cache: APICache):
-    """Register D&D API resources with the FastMCP app.
+    Categories the GraphQL endpoint supports are loaded with one query, which
+    caches the list and every item's summary; their details are fetched over
+    REST only when a tool asks for them. Other categories (or a failed bulk
+    load) fall back to the list and one REST request per item.
 
     Args:
-        app: The FastMCP app instance
         cache: The shared API cache
+        category: The D&D API category to prefetch
+        base_url: REST API base URL
+        graphql_url: GraphQL endpoint for bulk loads (None to use REST only)
     """
-    print("Registering D&D API resources...", file=sys.stderr)
+    category = normalize_category(category)
+    logger.info(f"Prefetching items for category: {category}")
 
-    def prefetch_category_items(category: str) -> None:
-        """Prefetch and cache all items in a category.
+    if graphql_url and graphql_loader.supports(category):
+        try:
+            graphql_loader.load_category(cache, category, url=graphql_url)
+            return
+        except Exception as e:
+            logger.warning(f"Bulk load of {category} summaries failed, prefetching over REST: {e}")
+
+    def load_category() -> Optional[Dict[str, Any]]:
+        logger.debug(f"Fetching item list for category: {category}")
+        result = fetch_json(f"{base_url}/{category}", cache=cache,
+                            cache_key=category_items_key(category))
+        if result.from_cache:
+            return Uncached(result.data) if result.stale else result.data
+        if result.status_code != 200:
+            logger.error(
+                f"Failed to fetch items for {category}: {result.status_code}")
+            return None
+
+        return category_items_from_api(category, result.data)
+
+    # First get the list of items; concurrent misses share one request
+    try:
+        category_data = cache.get_or_fetch(category_items_key(category), load_category)
+    except Exception as e:
+        logger.exception(
+            f"Error prefetching items for {category}: {e}")
+        return
+    if not category_data:
+        return
+
+    # Now prefetch each individual item
+    for item in category_data["items"]:
+        item_cache_key = item_key(category, item["index"])
+
+        def load_item(index: str = item["index"],
+                      key: str = item_cache_key) -> Optional[Dict[str, Any]]:
+            logger.debug(f"Prefetching item details: {category}/{index}")
+            result = fetch_json(f"{base_url}/{category}/{index}", cache=cache,
+                                cache_key=key)
+            if result.stale:
+                return Uncached(result.data)
+            return result.data if result.ok else None
 
-        Args:
-            category: The D&D API category to prefetch
-        """
-        logger.info(f"Prefetching items for category: {category}")
-
-        # First get the list of items
-        cache_key = f"dnd_items_{category}"
-        category_data = cache.get(cache_key)
-
-        if not category_data:
-            try:
-                logger.debug(f"Fetching item list for category: {category}")
-                response = requests.get(
-                    f"{BASE_URL}/{category}", timeout=REQUEST_TIMEOUT)
-                if response.status_code != 200:
-                    logger.error(
-                        f"Failed to fetch items for {category}: {response.status_code}")
-                    return
+        try:
+            cache.get_or_fetch(item_cache_key, load_item)
+        except Exception as e:
+            logger.exception(
+                f"Error prefetching item {category}/{item['index']}: {e}")
 
-                data = response.json()
 
-                # Transform to resource format
-                items = []
-                for item in data.get("results", []):
-                    items.append({
-                        "name": item["name"],
-                        "index": item["index"],
-                        "description": f"Details about {item['name']}",
-                        "uri": f"resource://dnd/item/{category}/{item['index']}"
-                    })
-
-                category_data = {
-                    "category": category,
-                    "items": items,
-                    "count": len(items)
-                }
+def register_resources(app, cache: APICache):
+    """Register D&D API resources with the FastMCP app.
 
-                # Cache the result
-                cache.set(cache_key, category_data)
-
-            except Exception as e:
-                logger.exception(
-                    f"Error prefetching items for {category}: {e}")
-                return
-
-        # Now prefetch each individual item
-        for item in category_data["items"]:
-            item_cache_key = f"dnd_item_{category}_{item['index']}"
-            if not cache.get(item_cache_key):
-                try:
-                    logger.debug(
-                        f"Prefetching item details: {category}/{item['index']}")
-                    response = requests.get(
-                        f"{BASE_URL}/{category}/{item['index']}", timeout=REQUEST_TIMEOUT)
-                    if response.status_code == 200:
-                        data = response.json()
-                        cache.set(item_cache_key, data)
-                except Exception as e:
-                    logger.exception(
-                        f"Error prefetching item {category}/{item['index']}: {e}")
+    Args:
+        app: The FastMCP app instance
+        cache: The shared API cache
+    """
+    print("Registering D&D API resources...", file=sys.stderr)
+
+    def prefetch_in_background(category: str) -> None:
+        # Prefetch requests yield to requests made for tool calls
+        with background_priority():
+            prefetch_category_items(cache, category)
 
     # Start prefetching common categories in the background
     import threading
     for category in ["spells", "equipment", "monsters", "classes", "races"]:
-        threading.Thread(target=prefetch_category_items,
+        threading.Thread(target=prefetch_in_background,
                          args=(category,), daemon=True).start()
 
     @app.resource("resource://dnd/categories")
@@ -143,38 +126,23 @@ def register_resources(app, cache: APICache):
         logger.debug("Fetching D&D API categories")
 
         # Check cache first
-        cached_data = cache.get("dnd_categories")
+        cached_data = cache.get(categories_key())
         if cached_data:
             return cached_data
 
         # Fetch from API if not in cache
         try:
-            response = requests.get(f"{BASE_URL}/", timeout=REQUEST_TIMEOUT)
+            response = get_client().get(f"{BASE_URL}/")
             if response.status_code != 200:
                 logger.error(
                     f"Failed to fetch categories: {response.status_code}")
                 return {"error": f"API request failed with status {response.status_code}"}
 
-            data = response.json()
-
             # Transform to resource format with descriptions
-            categories = []
-            for key in data.keys():
-                description = CATEGORY_DESCRIPTIONS.get(
-                    key, f"Collection of D&D 5e {key}")
-                categories.append({
-                    "name": key,
-                    "description": description,
-                    "uri": f"resource://dnd/items/{key}"
-                })
-
-            result = {
-                "categories": categories,
-                "count": len(categories)
-            }
+            result = categories_from_api(response.json())
 
             # Cache the result
-            cache.set("dnd_categories", result)
+            cache.set(categories_key(), result)
             return result
 
         except Exception as e:
@@ -209,40 +177,31 @@ def register_resources(app, cache: APICache):
         logger.debug(f"Fetching items for category: {category}")
 
         # Check cache first
-        cache_key = f"dnd_items_{category}"
+        category = normalize_category(category)
+        cache_key = category_items_key(category)
         cached_data = cache.get(cache_key)
         if cached_data:
             return cached_data
+        if cache.get_negative(cache_key):
+            return {"error": f"Category '{category}' not found or API request failed"}
 
-        # Fetch from API if not in cache
+        # Fetch from API if not in cache, revalidating an expired copy
         try:
-            response = requests.get(
-                f"{BASE_URL}/{category}", timeout=REQUEST_TIMEOUT)
-            if response.status_code != 200:
+            fetched = fetch_json(f"{BASE_URL}/{category}", cache=cache,
+                                 cache_key=cache_key)
+            if fetched.from_cache:
+                if not fetched.stale:
+                    cache.set(cache_key, fetched.data)
+                return fetched.data
+            if fetched.status_code != 200:
                 logger.error(
-                    f"Failed to fetch items for {category}: {response.status_code}")
+                    f"Failed to fetch items for {category}: {fetched.status_code}")
+                if fetched.status_code == 404:
+                    cache.set_negative(cache_key)
                 return {"error": f"Category '{category}' not found or API request failed"}
 
-            data = response.json()
-
-            # Transform to resource format
-            items = []
-            for item in data.get("results", []):
-                item_uri = f"resource://dnd/item/{category}/{item['index']}"
-                items.append({
-                    "name": item["name"],
-                    "index": item["index"],
-                    "uri": item_uri,
-                })
-
-            result = {
-                "category": category,
-                "count": len(items),
-                "items": items,
-                "source": "D&D 5e API (www.dnd5eapi.co)",
-            }
-
-            # Cache the result
+            # Same listing shape as the tools and the prefetch cache under this key
+            result = category_items_from_api(category, fetched.data)
             cache.set(cache_key, result)
             return result
 
@@ -276,36 +235,36 @@ def register_resources(app, cache: APICache):
         """
         logger.debug(f"Fetching item details: {category}/{index}")
 
-        # Check cache first
-        cache_key = f"dnd_item_{category}_{index}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
-        # Fetch from API if not in cache
-        try:
-            response = requests.get(
-                f"{BASE_URL}/{category}/{index}", timeout=REQUEST_TIMEOUT)
-
-            # Handle redirects (common in the D&D API)
-            if response.status_code == 301 and 'Location' in response.headers:
-                redirect_url = response.headers['Location']
-                logger.debug(f"Following redirect to: {redirect_url}")
-                response = requests.get(redirect_url, timeout=REQUEST_TIMEOUT)
-
-            if response.status_code != 200:
+        # Names recently found not to exist are answered without a request
+        category = normalize_category(category)
+        index = normalize_index(index)
+        cache_key = item_key(category, index)
+        if cache.get_negative(cache_key):
+            return {"error": f"Item '{index}' not found in category '{category}' or API request failed"}
+
+        def load_item() -> Dict[str, Any]:
+            # Redirects (common in the D&D API) are followed by requests
+            fetched = fetch_json(f"{BASE_URL}/{category}/{index}", cache=cache,
+                                 cache_key=cache_key)
+            if fetched.from_cache:
+                return Uncached(fetched.data) if fetched.stale else fetched.data
+
+            if fetched.status_code != 200:
                 logger.error(
-                    f"Failed to fetch item {category}/{index}: {response.status_code}")
+                    f"Failed to fetch item {category}/{index}: {fetched.status_code}")
+                if fetched.status_code == 404:
+                    cache.set_negative(cache_key)
                 return {"error": f"Item '{index}' not found in category '{category}' or API request failed"}
 
             # Add source attribution to the API response
-            data = response.json()
+            data = fetched.data
             data["source"] = "D&D 5e API (www.dnd5eapi.co)"
-
-            # Cache the result
-            cache.set(cache_key, data)
             return data
 
+        # Fetch from API if not in cache; concurrent misses share one request
+        try:
+            return cache.get_or_fetch(cache_key, load_item,
+                                      cacheable=lambda data: "error" not in data)
         except Exception as e:
             logger.exception(f"Error fetching item {category}/{index}: {e}")
             return {"error": f"Failed to fetch item {category}/{index}: {str(e)}"}
@@ -385,7 +344,7 @@ def register_resources(app, cache: APICache):
 
         try:
             start_time = datetime.now()
-            response = requests.get(BASE_URL, timeout=REQUEST_TIMEOUT)
+            response = get_client().get(BASE_URL)
             response_time = (datetime.now() - start_time).total_seconds()
 
             if response.status_code == 200:
@@ -414,4 +373,19 @@ def register_resources(app, cache: APICache):
                 "source": "D&D 5e API Status Check"
             }
 
+    @app.resource("resource://dnd/cache/stats")
+    def get_cache_stats() -> Dict[str, Any]:
+        """Report how the D&D API cache is performing.
+
+        Includes hit, miss, expiration and eviction counters, load latencies,
+        memory usage, and the same figures broken down by key prefix
+        (categories, item lists, item details and campaign data).
+
+        Returns:
+            A dictionary of cache statistics and configuration
+        """
+        stats = cache.get_stats()
+        stats["source"] = "D&D MCP Server Cache"
+        return stats
+
     print("D&D API resources registered successfully", file=sys.stderr)
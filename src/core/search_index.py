@@ -0,0 +1,310 @@
+"""
+In-process full-text index over SRD names, indexes and descriptions.
+
+``search_all_categories`` used to score items with substring checks, and only
+read an item's description once its name had already matched. ``SearchIndex``
+keeps an inverted index of every indexed item instead, with two fields:
+
+    name  the item's name and API index
+    desc  its description text ("desc" or "description")
+
+and ranks matches with BM25, summed over the fields with ``FIELD_WEIGHTS``.
+A query term also matches the indexed terms it is a prefix of ("fire" finds
+"fireball") at ``PREFIX_WEIGHT`` of the exact term's score, so searching for
+the start of a word keeps working. When that finds nothing, query terms match
+the indexed terms containing them ("ball" finds "fireball") at
+``SUBSTRING_WEIGHT``, as the old substring scoring did. Items can be indexed
+from their listing alone and gain their description once the details are known.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import math
+import re
+import threading
+
+# Relative weight of a match in each field
+FIELD_WEIGHTS = {"name": 3.0, "desc": 1.0}
+
+# Score of a prefix match relative to an exact term match
+PREFIX_WEIGHT = 0.5
+
+# Score of a substring match, tried only when nothing else matches
+SUBSTRING_WEIGHT = 0.25
+
+_APOSTROPHES = re.compile(r"['‘’`]")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms ("Tasha's Hideous-Laughter" -> tashas, hideous, laughter)."""
+    return _TOKEN.findall(_APOSTROPHES.sub("", (text or "").lower()))
+
+
+def description_text(details: Optional[Dict[str, Any]]) -> str:
+    """Return the description text of an item's details, or "" if it has none."""
+    if not isinstance(details, dict) or "error" in details:
+        return ""
+    if "desc" in details:
+        desc = details["desc"]
+        return " ".join(str(part) for part in desc) if isinstance(desc, list) else str(desc)
+    if "description" in details:
+        return str(details["description"])
+    return ""
+
+
+@dataclass
+class SearchHit:
+    """
+    One ranked search result.
+
+    Attributes:
+        category: The item's category
+        index: The item's API index
+        name: The item's name
+        score: BM25 relevance, summed over query terms and fields
+        fields: The fields that matched a query term
+    """
+    category: str
+    index: str
+    name: str
+    score: float
+    fields: Tuple[str, ...]
+
+
+class _Document:
+    """The indexed terms of one item."""
+
+    __slots__ = ("category", "index", "name", "terms", "lengths", "has_details")
+
+    def __init__(self, category: str, index: str, name: str,
+                 terms: Dict[str, Counter], has_details: bool):
+        self.category = category
+        self.index = index
+        self.name = name
+        self.terms = terms
+        self.lengths = {field: sum(counts.values()) for field, counts in terms.items()}
+        self.has_details = has_details
+
+
+class SearchIndex:
+    """An inverted index over SRD items, ranked with BM25."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75,
+                 field_weights: Optional[Dict[str, float]] = None,
+                 prefix_weight: float = PREFIX_WEIGHT, substring_weight: float = SUBSTRING_WEIGHT):
+        """Initialize an empty index.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            field_weights: Weight of each field (defaults to ``FIELD_WEIGHTS``)
+            prefix_weight: Score of a prefix match relative to an exact match
+            substring_weight: Score of a substring match relative to an exact match
+        """
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(field_weights or FIELD_WEIGHTS)
+        self.prefix_weight = prefix_weight
+        self.substring_weight = substring_weight
+        self._lock = threading.RLock()
+        self._docs: Dict[Tuple[str, str], _Document] = {}
+        # field -> term -> item key -> (term frequency, length of the item's field)
+        self._postings: Dict[str, Dict[str, Dict[Tuple[str, str], Tuple[int, int]]]] = {
+            field: {} for field in self.field_weights}
+        self._lengths: Dict[str, int] = {field: 0 for field in self.field_weights}
+        self._field_docs: Dict[str, int] = {field: 0 for field in self.field_weights}
+        self._stamps: Dict[str, Any] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_stale = False
+
+    def add(self, category: str, index: str, name: str,
+            details: Optional[Dict[str, Any]] = None) -> None:
+        """Index an item, replacing any earlier version of it.
+
+        Args:
+            category: The item's category
+            index: The item's API index
+            name: The item's name
+            details: The item's details, if known; their description is indexed
+        """
+        name_terms = tokenize(name)
+        name_terms += [term for term in tokenize(index) if term not in name_terms]
+        terms = {"name": Counter(name_terms)}
+        desc_terms = tokenize(description_text(details))
+        if desc_terms:
+            terms["desc"] = Counter(desc_terms)
+        has_details = isinstance(details, dict) and "error" not in details
+
+        with self._lock:
+            self._remove((category, index))
+            doc = _Document(category, index, name, terms, has_details)
+            self._docs[(category, index)] = doc
+            for field, counts in terms.items():
+                postings = self._postings[field]
+                for term, tf in counts.items():
+                    postings.setdefault(term, {})[(category, index)] = (tf, doc.lengths[field])
+                self._lengths[field] += doc.lengths[field]
+                self._field_docs[field] += 1
+            self._vocabulary_stale = True
+
+    def remove(self, category: str, index: str) -> bool:
+        """Remove an item; returns whether it was indexed."""
+        with self._lock:
+            return self._remove((category, index))
+
+    def _remove(self, key: Tuple[str, str]) -> bool:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return False
+        for field, counts in doc.terms.items():
+            postings = self._postings[field]
+            for term in counts:
+                docs = postings.get(term)
+                if docs is not None:
+                    docs.pop(key, None)
+                    if not docs:
+                        del postings[term]
+            self._lengths[field] -= doc.lengths[field]
+            self._field_docs[field] -= 1
+        self._vocabulary_stale = True
+        return True
+
+    def replace_category(self, category: str,
+                         items: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+                         stamp: Any = None) -> int:
+        """Re-index a whole category.
+
+        Args:
+            category: The category
+            items: (index, name, details or None) for every item in the category
+            stamp: Marker of the data indexed, returned by ``stamp``, so callers
+                can tell when the category needs re-indexing
+
+        Returns:
+            The number of items indexed
+        """
+        with self._lock:
+            for key in [key for key in self._docs if key[0] == category]:
+                self._remove(key)
+            count = 0
+            for index, name, details in items:
+                self.add(category, index, name, details)
+                count += 1
+            self._stamps[category] = stamp
+            return count
+
+    def stamp(self, category: str) -> Any:
+        """Return the stamp the category was last indexed with (None if never)."""
+        with self._lock:
+            return self._stamps.get(category)
+
+    def has_details(self, category: str, index: str) -> bool:
+        """Return whether an item is indexed together with its details."""
+        with self._lock:
+            doc = self._docs.get((category, index))
+            return doc is not None and doc.has_details
+
+    def _expand(self, term: str, substring: bool = False) -> List[Tuple[str, float]]:
+        """Return the indexed terms a query term matches, with their weights.
+
+        Matches are the term itself and the terms it is a prefix of, or with
+        ``substring`` every other term containing it.
+        """
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(set().union(*(postings.keys() for postings in self._postings.values())))
+            self._vocabulary_stale = False
+        if substring:
+            return [(candidate, self.substring_weight) for candidate in self._vocabulary
+                    if term in candidate and not candidate.startswith(term)]
+        matches = []
+        for position in range(bisect_left(self._vocabulary, term), len(self._vocabulary)):
+            candidate = self._vocabulary[position]
+            if not candidate.startswith(term):
+                break
+            matches.append((candidate, 1.0 if candidate == term else self.prefix_weight))
+        return matches
+
+    def search(self, terms: Iterable[str], categories: Optional[Iterable[str]] = None,
+               fields: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[SearchHit]:
+        """Rank the items matching any of the query terms.
+
+        Args:
+            terms: Lowercase query terms
+            categories: Only return items from these categories (None for all)
+            fields: Only match these fields (None for all)
+            limit: Maximum hits to return (None for all)
+
+        Returns:
+            Hits ordered by descending score, then name. If no query term
+            matches exactly or as a prefix, terms containing a query term match.
+        """
+        categories = set(categories) if categories is not None else None
+        fields = set(fields or self.field_weights)
+        terms = list(dict.fromkeys(terms))
+
+        with self._lock:
+            scores, matched = self._score(terms, categories, fields, substring=False)
+            if not scores:
+                scores, matched = self._score(terms, categories, fields, substring=True)
+
+            ranked = sorted(scores.items(), key=lambda entry: (-entry[1], self._docs[entry[0]].name))
+            if limit is not None:
+                ranked = ranked[:limit]
+            field_names = list(self.field_weights)
+            return [SearchHit(key[0], key[1], self._docs[key].name, score,
+                              tuple(field for bit, field in enumerate(field_names) if matched[key] & (1 << bit)))
+                    for key, score in ranked]
+
+    def _score(self, terms: List[str], categories: Optional[set], fields: set,
+               substring: bool) -> Tuple[Dict[Tuple[str, str], float], Dict[Tuple[str, str], int]]:
+        """Score the items matching the query terms (called with the lock held).
+
+        Returns:
+            (item key -> score, item key -> bitmask of the matched fields)
+        """
+        k1, b = self.k1, self.b
+        total_docs = len(self._docs)
+        scores: Dict[Tuple[str, str], float] = {}
+        matched: Dict[Tuple[str, str], int] = {}
+        for query_term in terms:
+            # Each query term counts once per item, through its best matching indexed term
+            best: Dict[Tuple[str, str], float] = {}
+            for term, weight in self._expand(query_term, substring):
+                term_scores: Dict[Tuple[str, str], float] = {}
+                for bit, field in enumerate(self.field_weights):
+                    docs = self._postings[field].get(term) if field in fields else None
+                    if not docs:
+                        continue
+                    idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                    scale = weight * self.field_weights[field] * idf * (k1 + 1)
+                    length_scale = k1 * b / (self._lengths[field] / max(self._field_docs[field], 1))
+                    base = k1 * (1 - b)
+                    flag = 1 << bit
+                    for key, (tf, length) in docs.items():
+                        if categories is not None and key[0] not in categories:
+                            continue
+                        term_scores[key] = term_scores.get(key, 0.0) + (
+                            scale * tf / (tf + base + length_scale * length))
+                        matched[key] = matched.get(key, 0) | flag
+                for key, score in term_scores.items():
+                    if score > best.get(key, 0.0):
+                        best[key] = score
+            for key, score in best.items():
+                scores[key] = scores.get(key, 0.0) + score
+        return scores, matched
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the index for reporting."""
+        with self._lock:
+            return {
+                "items": len(self._docs),
+                "categories": len(self._stamps),
+                "terms": {field: len(postings) for field, postings in self._postings.items()},
+            }
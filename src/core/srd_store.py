@@ -0,0 +1,629 @@
+"""
+Local SQLite store of the SRD corpus.
+
+Tools used to rebuild their view of the SRD from scattered per-item cache
+entries, walking a category list and fetching every item to compare one
+field. ``SRDStore`` keeps every ingested item in one SQLite database: the raw
+JSON in ``items``, plus typed, indexed columns for the fields tools filter
+on::
+
+    spells       level, school, ritual, concentration
+    monsters     challenge_rating, type, size, alignment, xp
+    equipment    cost_cp (cost in copper pieces), weight, equipment_category
+    magic_items  rarity, equipment_category
+
+Each spell is also listed under every class that can learn it, in
+``class_spells`` (class, spell, name, level, school), kept in step with the
+spells as they are ingested.
+
+``ingest`` fills the store from the API cache, first filling the cache itself
+where entries are missing (one concurrent wave of REST requests). Where the
+GraphQL endpoint supports a category, its summaries are bulk loaded first, so
+index builders have every item's key fields while the details are fetched.
+Only complete REST detail records are stored. A category is only marked
+loaded once every item in its listing has been stored, so tools fall back to
+the cache and the network for categories still being ingested. Ingestion
+skips categories loaded within ``max_age`` and refreshes older ones, and a
+store written by an older schema version is rebuilt from scratch::
+
+    python -m src.core.srd_store ingest --db cache/srd.sqlite3 --cache-dir cache
+    python -m src.core.srd_store info --db cache/srd.sqlite3
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import sys
+import threading
+
+import requests
+
+from src.core.api_helpers import API_BASE_URL, categories_from_api, category_items_from_api
+from src.core.async_fetch import AsyncFetcher
+from src.core.cache import APICache, open_server_cache
+from src.core.class_spells import class_spell_entries
+from src.core.cache_keys import normalize_category, normalize_index, categories_key, category_items_key, item_key
+from src.core.http_client import fetch_json
+import src.core.graphql_loader as graphql_loader
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever stored rows change meaning; older stores are rebuilt.
+# Version 2: items hold complete REST records only (no GraphQL summaries).
+STORE_VERSION = 2
+
+# How long a loaded category counts as fresh before ingestion refreshes it
+DEFAULT_MAX_AGE = timedelta(hours=24)
+
+_TABLES = ("items", "categories", "spells", "monsters", "equipment", "magic_items", "class_spells")
+
+# Copper pieces per coin; costs are stored in copper so every unit compares directly
+COPPER_PER_UNIT = {"cp": 1, "sp": 10, "ep": 50, "gp": 100, "pp": 1000}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    category TEXT NOT NULL,
+    idx TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (category, idx)
+);
+CREATE TABLE IF NOT EXISTS categories (
+    category TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    loaded TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS spells (
+    idx TEXT PRIMARY KEY,
+    level INTEGER,
+    school TEXT,
+    ritual INTEGER,
+    concentration INTEGER
+);
+CREATE INDEX IF NOT EXISTS spells_level ON spells (level, school);
+CREATE TABLE IF NOT EXISTS monsters (
+    idx TEXT PRIMARY KEY,
+    challenge_rating REAL,
+    type TEXT,
+    size TEXT,
+    alignment TEXT,
+    xp INTEGER
+);
+CREATE INDEX IF NOT EXISTS monsters_cr ON monsters (challenge_rating);
+CREATE INDEX IF NOT EXISTS monsters_type ON monsters (type, size);
+CREATE TABLE IF NOT EXISTS equipment (
+    idx TEXT PRIMARY KEY,
+    cost_cp INTEGER,
+    weight REAL,
+    equipment_category TEXT
+);
+CREATE INDEX IF NOT EXISTS equipment_cost ON equipment (cost_cp);
+CREATE TABLE IF NOT EXISTS magic_items (
+    idx TEXT PRIMARY KEY,
+    rarity TEXT,
+    equipment_category TEXT
+);
+CREATE INDEX IF NOT EXISTS magic_items_rarity ON magic_items (rarity);
+CREATE TABLE IF NOT EXISTS class_spells (
+    class TEXT NOT NULL,
+    spell TEXT NOT NULL,
+    name TEXT NOT NULL,
+    level INTEGER,
+    school TEXT,
+    PRIMARY KEY (class, spell)
+);
+CREATE INDEX IF NOT EXISTS class_spells_level ON class_spells (class, level);
+"""
+
+
+def cost_in_copper(cost: Any) -> Optional[int]:
+    """Convert an API cost ({"quantity": 5, "unit": "gp"}) to copper pieces.
+
+    Unknown units are treated as gold, like the cost filters always have.
+    """
+    if not isinstance(cost, dict) or cost.get("quantity") is None:
+        return None
+    unit = str(cost.get("unit", "gp")).lower()
+    return int(round(float(cost["quantity"]) * COPPER_PER_UNIT.get(unit, COPPER_PER_UNIT["gp"])))
+
+
+def _ref_name(value: Any) -> Optional[str]:
+    """Return the lowercase name of an API reference such as {"index": ..., "name": ...}."""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("index")
+    return str(value).lower() if value else None
+
+
+def _spell_row(item: Dict[str, Any]) -> Tuple:
+    return (item.get("level"), _ref_name(item.get("school")),
+            int(bool(item.get("ritual"))), int(bool(item.get("concentration"))))
+
+
+def _monster_row(item: Dict[str, Any]) -> Tuple:
+    cr = item.get("challenge_rating")
+    return (float(cr) if cr is not None else None, _ref_name(item.get("type")),
+            _ref_name(item.get("size")), _ref_name(item.get("alignment")), item.get("xp"))
+
+
+def _equipment_row(item: Dict[str, Any]) -> Tuple:
+    weight = item.get("weight")
+    return (cost_in_copper(item.get("cost")), float(weight) if weight is not None else None,
+            _ref_name(item.get("equipment_category")))
+
+
+def _magic_item_row(item: Dict[str, Any]) -> Tuple:
+    return _ref_name(item.get("rarity")), _ref_name(item.get("equipment_category"))
+
+
+# Category -> (typed table, its columns, function extracting them from an item)
+TYPED_TABLES = {
+    "spells": ("spells", ("level", "school", "ritual", "concentration"), _spell_row),
+    "monsters": ("monsters", ("challenge_rating", "type", "size", "alignment", "xp"), _monster_row),
+    "equipment": ("equipment", ("cost_cp", "weight", "equipment_category"), _equipment_row),
+    "magic-items": ("magic_items", ("rarity", "equipment_category"), _magic_item_row),
+}
+
+
+class SRDStore:
+    """SQLite-backed SRD items with typed columns for the fields tools filter on."""
+
+    def __init__(self, path: str = ":memory:", max_age: timedelta = DEFAULT_MAX_AGE):
+        """Open (and if needed create) the store.
+
+        Args:
+            path: Database file, or ":memory:" for a store that is not persisted
+            max_age: How long a loaded category counts as fresh
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            # Readers are not blocked while an ingestion commits
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != STORE_VERSION:
+            if version:
+                logger.info(f"Rebuilding SRD store {path} (schema version {version} -> {STORE_VERSION})")
+            for table in _TABLES:
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self._conn.commit()
+
+    def upsert_many(self, category: str, items: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace items of one category in a single transaction.
+
+        Args:
+            category: Category name or endpoint
+            items: Item details as returned by the API; items without an index are skipped
+
+        Returns:
+            The number of items written
+        """
+        category = normalize_category(category)
+        typed = TYPED_TABLES.get(category)
+        now = datetime.now().isoformat()
+        rows = []
+        typed_rows = []
+        class_rows = []
+        for item in items:
+            if not isinstance(item, dict) or not item.get("index"):
+                continue
+            index = normalize_index(item["index"])
+            rows.append((category, index, item.get("name", index),
+                         json.dumps(item, separators=(",", ":")), now))
+            if typed:
+                typed_rows.append((index,) + typed[2](item))
+            if category == "spells":
+                class_rows.extend((entry["class"], entry["spell"], entry["name"], entry["level"], entry["school"])
+                                  for entry in class_spell_entries(item))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO items (category, idx, name, data, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (category, idx) DO UPDATE SET "
+                "name = excluded.name, data = excluded.data, updated = excluded.updated", rows)
+            if typed:
+                table, columns, _ = typed
+                placeholders = ", ".join("?" * (len(columns) + 1))
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} (idx, {', '.join(columns)}) VALUES ({placeholders})",
+                    typed_rows)
+            if category == "spells":
+                # A spell's class lists may have changed, so its rows are replaced
+                self._conn.executemany("DELETE FROM class_spells WHERE spell = ?",
+                                       [(row[1],) for row in rows])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO class_spells (class, spell, name, level, school) VALUES (?, ?, ?, ?, ?)",
+                    class_rows)
+        return len(rows)
+
+    def upsert(self, category: str, item: Dict[str, Any]) -> bool:
+        """Insert or replace one item; returns whether it was written."""
+        return self.upsert_many(category, [item]) == 1
+
+    def remove_missing(self, category: str, indexes: Iterable[str]) -> int:
+        """Delete a category's items whose index is not among ``indexes``.
+
+        Args:
+            category: Category name or endpoint
+            indexes: The indexes of every item the category still lists
+
+        Returns:
+            The number of items deleted
+        """
+        category = normalize_category(category)
+        keep = {normalize_index(index) for index in indexes}
+        typed = TYPED_TABLES.get(category)
+        with self._lock, self._conn:
+            gone = [(row[0],) for row in self._conn.execute(
+                "SELECT idx FROM items WHERE category = ?", (category,)) if row[0] not in keep]
+            self._conn.executemany("DELETE FROM items WHERE category = ? AND idx = ?",
+                                   [(category, idx) for idx, in gone])
+            if typed:
+                self._conn.executemany(f"DELETE FROM {typed[0]} WHERE idx = ?", gone)
+            if category == "spells":
+                self._conn.executemany("DELETE FROM class_spells WHERE spell = ?", gone)
+        return len(gone)
+
+    def mark_loaded(self, category: str, count: int) -> None:
+        """Record that every item of a category has been ingested.
+
+        Args:
+            category: Category name or endpoint
+            count: Number of items in the category's listing
+        """
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO categories (category, count, loaded) VALUES (?, ?, ?)",
+                               (normalize_category(category), count, datetime.now().isoformat()))
+
+    def is_loaded(self, category: str) -> bool:
+        """Return whether a category has been fully ingested."""
+        return self.loaded_at(category) is not None
+
+    def is_fresh(self, category: str) -> bool:
+        """Return whether a category was fully ingested within ``max_age``."""
+        loaded = self.loaded_at(category)
+        return loaded is not None and datetime.now() - datetime.fromisoformat(loaded) < self.max_age
+
+    def loaded_at(self, category: str) -> Optional[str]:
+        """Return when a category was last fully ingested (ISO timestamp), or None."""
+        return self._scalar("SELECT loaded FROM categories WHERE category = ?",
+                            (normalize_category(category),))
+
+    def loaded_categories(self) -> Dict[str, Dict[str, Any]]:
+        """Return the fully ingested categories with their item counts and load times."""
+        rows = self._query("SELECT category, count, loaded FROM categories ORDER BY category")
+        return {row["category"]: {"count": row["count"], "loaded": row["loaded"]} for row in rows}
+
+    def get(self, category: str, index: str) -> Optional[Dict[str, Any]]:
+        """Return one item's details, or None if it is not stored."""
+        data = self._scalar("SELECT data FROM items WHERE category = ? AND idx = ?",
+                            (normalize_category(category), normalize_index(index)))
+        return json.loads(data) if data is not None else None
+
+    def count(self, category: Optional[str] = None) -> int:
+        """Return the number of stored items, in one category or overall."""
+        if category is None:
+            return self._scalar("SELECT COUNT(*) FROM items")
+        return self._scalar("SELECT COUNT(*) FROM items WHERE category = ?", (normalize_category(category),))
+
+    def listing(self, category: str) -> Dict[str, Any]:
+        """Return a category's items in the cached ``dnd_items_{category}`` shape, in ingestion order."""
+        category = normalize_category(category)
+        rows = self._query("SELECT idx, name FROM items WHERE category = ? ORDER BY rowid", (category,))
+        return category_items_from_api(category, {"results": [{"index": row["idx"], "name": row["name"]}
+                                                              for row in rows]})
+
+    def all(self, category: str) -> List[Dict[str, Any]]:
+        """Return the details of every stored item in a category, in ingestion order."""
+        rows = self._query("SELECT data FROM items WHERE category = ? ORDER BY rowid",
+                           (normalize_category(category),))
+        return [json.loads(row["data"]) for row in rows]
+
+    def spells(self, min_level: int = 0, max_level: int = 9,
+               school: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return spells within a level range, ordered by level and name.
+
+        Args:
+            min_level: Minimum spell level (0 for cantrips)
+            max_level: Maximum spell level
+            school: Only spells whose school name contains this text
+        """
+        sql = "SELECT i.data FROM spells s JOIN items i ON i.category = 'spells' AND i.idx = s.idx " \
+              "WHERE s.level BETWEEN ? AND ?"
+        params: List[Any] = [min_level, max_level]
+        if school:
+            sql += " AND s.school LIKE ?"
+            params.append(f"%{school.lower()}%")
+        return self._data(sql + " ORDER BY s.level, i.name", params)
+
+    def monsters(self, min_cr: float = 0, max_cr: float = 30, type: Optional[str] = None,
+                 size: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return monsters within a challenge rating range, ordered by CR and name.
+
+        Args:
+            min_cr: Minimum challenge rating
+            max_cr: Maximum challenge rating
+            type: Only monsters of this type, e.g. "undead"
+            size: Only monsters of this size, e.g. "large"
+        """
+        sql = "SELECT i.data FROM monsters m JOIN items i ON i.category = 'monsters' AND i.idx = m.idx " \
+              "WHERE m.challenge_rating BETWEEN ? AND ?"
+        params: List[Any] = [min_cr, max_cr]
+        if type:
+            sql += " AND m.type = ?"
+            params.append(type.lower())
+        if size:
+            sql += " AND m.size = ?"
+            params.append(size.lower())
+        return self._data(sql + " ORDER BY m.challenge_rating, i.name", params)
+
+    def equipment(self, min_cost_cp: Optional[float] = None,
+                  max_cost_cp: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return equipment with a cost in the given range of copper pieces, cheapest first."""
+        sql = "SELECT i.data FROM equipment e JOIN items i ON i.category = 'equipment' AND i.idx = e.idx " \
+              "WHERE e.cost_cp IS NOT NULL"
+        params: List[Any] = []
+        if min_cost_cp is not None:
+            sql += " AND e.cost_cp >= ?"
+            params.append(min_cost_cp)
+        if max_cost_cp is not None:
+            sql += " AND e.cost_cp <= ?"
+            params.append(max_cost_cp)
+        return self._data(sql + " ORDER BY e.cost_cp, i.name", params)
+
+    def magic_items(self, rarity: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return magic items, optionally only those of one rarity, ordered by name."""
+        sql = "SELECT i.data FROM magic_items m JOIN items i ON i.category = 'magic-items' AND i.idx = m.idx"
+        params: List[Any] = []
+        if rarity:
+            sql += " WHERE m.rarity = ?"
+            params.append(rarity.lower())
+        return self._data(sql + " ORDER BY i.name", params)
+
+    def class_spells(self, class_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return class spell list entries, ordered by class, level and name.
+
+        Args:
+            class_name: Only this class's spells (None for every class)
+
+        Returns:
+            Dicts with "class", "spell" (the spell's index), "name", "level" and "school"
+        """
+        sql = "SELECT class, spell, name, level, school FROM class_spells"
+        params: List[Any] = []
+        if class_name:
+            sql += " WHERE class = ?"
+            params.append(normalize_index(class_name))
+        return [dict(row) for row in self._query(sql + " ORDER BY class, level, name", params)]
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _scalar(self, sql: str, params: Iterable[Any] = ()) -> Any:
+        rows = self._query(sql, params)
+        return rows[0][0] if rows else None
+
+    def _data(self, sql: str, params: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [json.loads(row["data"]) for row in self._query(sql, params)]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+def ingest_from_cache(store: SRDStore, cache: APICache, category: str) -> Optional[int]:
+    """Copy a category's cached item entries into the store.
+
+    Args:
+        store: The store to fill
+        cache: The cache holding the category listing and item entries
+        category: Category name or endpoint
+
+    Returns:
+        The number of items stored, or None if the listing is not cached. The
+        category is marked loaded only if every listed item was cached, after
+        deleting the stored items the listing no longer has.
+    """
+    category = normalize_category(category)
+    listing = cache.get(category_items_key(category))
+    if not isinstance(listing, dict):
+        return None
+    indexes = [item["index"] for item in listing.get("items", []) if item.get("index")]
+    items = [value for value in (cache.get(item_key(category, index)) for index in indexes)
+             if isinstance(value, dict) and "error" not in value]
+    stored = store.upsert_many(category, items)
+    if stored == len(indexes):
+        removed = store.remove_missing(category, indexes)
+        if removed:
+            logger.info(f"Removed {removed} {category} items no longer listed")
+        store.mark_loaded(category, stored)
+    else:
+        logger.debug(f"{category}: {stored} of {len(indexes)} items cached, not marked loaded")
+    return stored
+
+
+def _run(coroutine) -> Any:
+    """Run a coroutine to completion from synchronous code.
+
+    Called from a running event loop (such as an async tool), the coroutine
+    runs on its own loop in a worker thread, since ``asyncio.run`` cannot
+    start a loop inside another.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+async def _fetch_missing(cache: APICache, category: str, base_url: str) -> None:
+    """Fetch a category's listing and every item not yet cached, in concurrent waves."""
+    async with AsyncFetcher(cache) as fetcher:
+        listing_key = category_items_key(category)
+        listing = cache.get(listing_key)
+        if listing is None:
+            result = await fetcher.fetch(f"{base_url}/{category}", listing_key)
+            if result.from_cache:
+                listing = result.data
+            elif result.status_code == 200:
+                listing = category_items_from_api(category, result.data)
+            else:
+                logger.warning(f"Could not fetch the {category} listing (status {result.status_code})")
+                return
+            if not result.stale:
+                cache.set(listing_key, listing)
+
+        urls = {item_key(category, item["index"]): f"{base_url}/{category}/{item['index']}"
+                for item in listing.get("items", [])
+                if item.get("index") and cache.get(item_key(category, item["index"])) is None}
+        for key, result in (await fetcher.fetch_all(urls)).items():
+            if result.not_modified:
+                # Re-cache revalidated values too, so expired items count as current again.
+                # Stale fallbacks keep their timestamp and are retried on the next run.
+                cache.set(key, result.data)
+            elif result.status_code == 200:
+                result.data["source"] = "D&D 5e API"
+                cache.set(key, result.data)
+
+
+def ingest_category(store: SRDStore, cache: APICache, category: str, base_url: str = API_BASE_URL,
+                    graphql_url: Optional[str] = graphql_loader.GRAPHQL_URL, force: bool = False) -> int:
+    """Load one category into the store, fetching whatever the cache is missing.
+
+    Categories loaded within the store's ``max_age`` are skipped. Older ones
+    are refreshed: expired cache entries are revalidated and re-stored, and
+    the category is marked loaded again once every item is current. Safe to
+    call from a running event loop.
+
+    Args:
+        store: The store to fill
+        cache: The API cache, filled as a side effect
+        category: Category name or endpoint
+        base_url: REST API base URL
+        graphql_url: GraphQL endpoint for bulk loads (None to use REST only)
+        force: Refresh the category even if it is fresh
+
+    Returns:
+        The number of items stored
+    """
+    category = normalize_category(category)
+    if not force and store.is_fresh(category):
+        return store.count(category)
+    if graphql_url and graphql_loader.supports(category):
+        # Summaries (and the listing) in one request; the details still come from REST
+        try:
+            graphql_loader.load_category(cache, category, url=graphql_url)
+        except Exception as e:
+            logger.warning(f"Bulk load of {category} summaries failed: {e}")
+
+    stored = ingest_from_cache(store, cache, category)
+    if stored is None or not store.is_fresh(category):
+        _run(_fetch_missing(cache, category, base_url))
+        stored = ingest_from_cache(store, cache, category) or 0
+    logger.info(f"Ingested {stored} {category} items into the SRD store")
+    return stored
+
+
+def ingest(store: SRDStore, cache: APICache, categories: Optional[Iterable[str]] = None,
+           base_url: str = API_BASE_URL,
+           graphql_url: Optional[str] = graphql_loader.GRAPHQL_URL, force: bool = False) -> Dict[str, int]:
+    """Load SRD categories into the store, refreshing those older than its ``max_age``.
+
+    Args:
+        store: The store to fill
+        cache: The API cache, filled as a side effect
+        categories: Categories to load (default: every category the API lists)
+        base_url: REST API base URL
+        graphql_url: GraphQL endpoint for bulk loads (None to use REST only)
+        force: Refresh every category, fresh or not
+
+    Returns:
+        Items stored per category. Categories that fail are logged and skipped;
+        if the categories cannot be listed (e.g. offline with a cold cache),
+        nothing is loaded and the result is empty.
+    """
+    if categories is None:
+        root = cache.get(categories_key())
+        if root is None:
+            try:
+                result = fetch_json(base_url, cache=cache, cache_key=categories_key())
+            except requests.RequestException as e:
+                logger.error(f"Could not list SRD categories: {e}")
+                return {}
+            if not result.ok:
+                logger.error(f"Could not list SRD categories (status {result.status_code})")
+                return {}
+            root = result.data if result.from_cache else categories_from_api(result.data)
+            if not result.stale:
+                cache.set(categories_key(), root)
+        categories = [category["name"] for category in root.get("categories", [])]
+
+    counts = {}
+    for category in categories:
+        try:
+            counts[normalize_category(category)] = ingest_category(store, cache, category,
+                                                                   base_url, graphql_url, force)
+        except Exception as e:
+            logger.exception(f"Error ingesting {category}: {e}")
+    return counts
+
+
+def main(argv=None) -> int:
+    """Command-line entry point for filling and inspecting an SRD store."""
+    parser = argparse.ArgumentParser(description="Build or inspect the local SRD store")
+    parser.add_argument("--db", default="cache/srd.sqlite3", help="SRD store database file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Load SRD categories into the store")
+    ingest_parser.add_argument("--cache-dir", default="cache", help="Persistent cache directory")
+    ingest_parser.add_argument("--backend", default="journal", help="Persistent cache backend")
+    ingest_parser.add_argument("--category", action="append", dest="categories",
+                               help="Category to load (repeatable, default: all)")
+    ingest_parser.add_argument("--rest-only", action="store_true",
+                               help="Do not bulk load through the GraphQL endpoint")
+    ingest_parser.add_argument("--force", action="store_true",
+                               help="Refresh categories that are still fresh")
+
+    subparsers.add_parser("info", help="Show the loaded categories")
+
+    args = parser.parse_args(argv)
+
+    try:
+        store = SRDStore(args.db)
+    except sqlite3.Error as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.command == "info":
+            print(json.dumps({"items": store.count(), "categories": store.loaded_categories()}, indent=2))
+            return 0
+
+        cache = open_server_cache(args.cache_dir, backend=args.backend, lazy=True)
+        try:
+            counts = ingest(store, cache, args.categories,
+                            graphql_url=None if args.rest_only else graphql_loader.GRAPHQL_URL,
+                            force=args.force)
+        finally:
+            cache.close()
+        print(f"Ingested {sum(counts.values())} items from {len(counts)} categories into {args.db}",
+              file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,13 @@ Provides full CRUD operations with caching support.
 Follows patterns from api_helpers.py and cache.py.
 """
 
-import requests
 import hashlib
 import os
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 
+from src.core.http_client import HTTPClient, get_client
+
 # Import cache - will be injected at initialization
 # from src.core.cache import APICache
 
@@ -31,7 +32,8 @@ class SupabaseClient:
                  api_key: str,
                  cache: Any,  # APICache instance
                  cache_prefix: str = "campaign",
-                 timeout: int = 10):
+                 timeout: int = 10,
+                 http: Optional[HTTPClient] = None):
         """
         Initialize the Supabase client.
 
@@ -41,12 +43,14 @@ class SupabaseClient:
             cache: APICache instance for caching responses
             cache_prefix: Prefix for cache keys
             timeout: Request timeout in seconds
+            http: HTTP client to send requests with (defaults to the shared pooled client)
         """
         self.api_url = api_url.rstrip('/')
         self.api_key = api_key
         self.cache = cache
         self.cache_prefix = cache_prefix
         self.timeout = timeout
+        self.http = http or get_client()
         self.headers = {
             "apikey": api_key,
             "Authorization": f"Bearer {api_key}",
@@ -102,8 +106,9 @@ class SupabaseClient:
         }
 
         tables_to_invalidate = [table] + related.get(table, [])
-        for t in tables_to_invalidate:
-            self.invalidate_table_cache(t)
+        # One batched clear, so the persistent index is rewritten once per write
+        self.cache.clear_prefixes(
+            [f"{self.cache_prefix}_{t}_" for t in tables_to_invalidate])
 
     # =========================================================================
     # CORE HTTP METHODS
@@ -156,7 +161,7 @@ class SupabaseClient:
         url = f"{self.api_url}/{table}?{'&'.join(query_parts)}"
 
         # Make request
-        response = requests.get(url, headers=self.headers, timeout=self.timeout)
+        response = self.http.get(url, headers=self.headers, timeout=self.timeout)
         response.raise_for_status()
         data = response.json()
 
@@ -198,7 +203,7 @@ class SupabaseClient:
         if isinstance(data, dict):
             data = [data]
 
-        response = requests.post(url, headers=self.headers, json=data, timeout=self.timeout)
+        response = self.http.post(url, headers=self.headers, json=data, timeout=self.timeout)
         response.raise_for_status()
 
         # Invalidate related caches
@@ -225,7 +230,7 @@ class SupabaseClient:
         filter_parts = [f"{k}={v}" for k, v in filters.items()]
         url = f"{self.api_url}/{table}?{'&'.join(filter_parts)}"
 
-        response = requests.patch(url, headers=self.headers, json=data, timeout=self.timeout)
+        response = self.http.patch(url, headers=self.headers, json=data, timeout=self.timeout)
         response.raise_for_status()
 
         # Invalidate related caches
@@ -263,7 +268,7 @@ class SupabaseClient:
         filter_parts = [f"{k}={v}" for k, v in filters.items()]
         url = f"{self.api_url}/{table}?{'&'.join(filter_parts)}"
 
-        response = requests.delete(url, headers=self.headers, timeout=self.timeout)
+        response = self.http.delete(url, headers=self.headers, timeout=self.timeout)
         response.raise_for_status()
 
         # Invalidate related caches
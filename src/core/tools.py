@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 import sys
 import json
+import asyncio
 import traceback
 import urllib.request
 import urllib.error
 import urllib.parse
 import mcp.types as types
-from src.core.api_helpers import API_BASE_URL
+from src.core.api_helpers import API_BASE_URL, categories_from_api, category_items_from_api
 from src.core.formatters import format_monster_data, format_spell_data, format_class_data
-import requests
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
-from src.core.cache import APICache
+from src.core.cache import APICache, Uncached
+from src.core.http_client import fetch_json, get_client
+from src.core.cache_keys import (normalize_category, normalize_index, categories_key,
+                                  category_items_key, item_key)
+from src.core.async_fetch import AsyncFetcher
+from src.core.srd_store import SRDStore, COPPER_PER_UNIT, cost_in_copper
+from src.core.search_index import SearchIndex, tokenize
+from src.core.attribute_index import AttributeIndexes
+from src.core.class_spells import ClassSpellLists
 import src.core.formatters as formatters
 import src.core.resources as resources
 import time
@@ -65,19 +73,34 @@ logger = logging.getLogger(__name__)
 
 # Base URL for the D&D 5e API
 BASE_URL = "https://www.dnd5eapi.co/api"
-# Request timeout in seconds
-REQUEST_TIMEOUT = 10
 
+# Requests in flight at once while a search fans out across categories
+SEARCH_CONCURRENCY = 16
 
-def register_tools(app, cache: APICache):
+# Scales BM25 relevance to the 0-100 range used for confidence and exact-match bonuses
+BM25_SCORE_SCALE = 10
+
+
+def register_tools(app, cache: APICache, store: Optional[SRDStore] = None):
     """Register D&D API tools with the FastMCP app.
 
     Args:
         app: The FastMCP app instance
         cache: The shared API cache
+        store: Local SRD store; tools query it for every fully ingested
+            category and fall back to the cache and the API otherwise
     """
     print("Registering D&D API tools...", file=sys.stderr)
 
+    # Full-text index searched by search_all_categories, filled from the store and the cache
+    search_index = SearchIndex()
+
+    # Sorted spell level, monster CR and equipment cost indexes for the range filters
+    attribute_indexes = AttributeIndexes()
+
+    # Fetcher reused by every search, so its pooled connections stay open between calls
+    search_fetcher = AsyncFetcher(cache, concurrency=SEARCH_CONCURRENCY)
+
     @app.tool()
     def search_equipment_by_cost(max_cost: float, cost_unit: str = "gp") -> Dict[str, Any]:
         """Search for D&D equipment items that cost less than or equal to a specified maximum price.
@@ -95,34 +118,14 @@ def register_tools(app, cache: APICache):
         """
         logger.debug(f"Searching equipment by cost: {max_cost} {cost_unit}")
 
-        # Get equipment list (from cache if available)
-        equipment_list = _get_category_items("equipment", cache)
-        if "error" in equipment_list:
-            return equipment_list
-
-        # Filter equipment by cost
-        results = []
-        for item in equipment_list.get("items", []):
-            # Get detailed item info (from cache if available)
-            item_index = item["index"]
-            item_details = _get_item_details("equipment", item_index, cache)
-            if "error" in item_details:
-                continue
-
-            # Check if item has cost and is within budget
-            if "cost" in item_details:
-                cost = item_details["cost"]
-                # Convert cost to requested unit for comparison
-                converted_cost = _convert_currency(
-                    cost["quantity"], cost["unit"], cost_unit)
-                if converted_cost <= max_cost:
-                    results.append({
-                        "name": item_details["name"],
-                        "cost": f"{cost['quantity']} {cost['unit']}",
-                        "description": _get_description(item_details),
-                        "category": item_details.get("equipment_category", {}).get("name", "Unknown"),
-                        "uri": f"resource://dnd/item/equipment/{item_index}"
-                    })
+        # Bisect the equipment sorted by cost in copper pieces
+        cost_index = _attribute_index("equipment", _equipment_entry)
+        if isinstance(cost_index, dict):
+            return cost_index
+        max_cost_cp = max_cost * COPPER_PER_UNIT.get(cost_unit.lower(), COPPER_PER_UNIT["gp"])
+        results = cost_index.range(high=max_cost_cp)
+        for row in results:
+            del row["cost_cp"]
 
         return {
             "query": f"Equipment costing {max_cost} {cost_unit} or less",
@@ -155,41 +158,12 @@ def register_tools(app, cache: APICache):
         if min_level < 0 or max_level > 9 or min_level > max_level:
             return {"error": "Invalid level range. Must be between 0 and 9."}
 
-        # Get spells list (from cache if available)
-        spells_list = _get_category_items("spells", cache)
-        if "error" in spells_list:
-            return spells_list
-
-        # Filter spells by level and school
-        results = []
-        for item in spells_list.get("items", []):
-            # Get detailed spell info (from cache if available)
-            item_index = item["index"]
-            spell_details = _get_item_details("spells", item_index, cache)
-            if "error" in spell_details:
-                continue
-
-            # Check if spell level is within range
-            spell_level = spell_details.get("level", 0)
-            if min_level <= spell_level <= max_level:
-                # Check school if specified
-                if school:
-                    spell_school = spell_details.get(
-                        "school", {}).get("name", "").lower()
-                    if school.lower() not in spell_school:
-                        continue
-
-                results.append({
-                    "name": spell_details["name"],
-                    "level": spell_level,
-                    "school": spell_details.get("school", {}).get("name", "Unknown"),
-                    "casting_time": spell_details.get("casting_time", "Unknown"),
-                    "description": _get_description(spell_details),
-                    "uri": f"resource://dnd/item/spells/{item_index}"
-                })
-
-        # Sort results by level and name
-        results.sort(key=lambda x: (x["level"], x["name"]))
+        # Bisect the spells sorted by level, within the matching schools
+        level_index = _attribute_index("spells", _spell_entry, group_by="school")
+        if isinstance(level_index, dict):
+            return level_index
+        schools = [name for name in level_index.groups if school.lower() in name] if school else None
+        results = level_index.range(min_level, max_level, groups=schools)
 
         return {
             "query": f"Spells of level {min_level}-{max_level}" + (f" in school {school}" if school else ""),
@@ -220,36 +194,11 @@ def register_tools(app, cache: APICache):
         """
         logger.debug(f"Finding monsters by CR: {min_cr}-{max_cr}")
 
-        # Get monsters list (from cache if available)
-        monsters_list = _get_category_items("monsters", cache)
-        if "error" in monsters_list:
-            return monsters_list
-
-        # Filter monsters by CR
-        results = []
-        for item in monsters_list.get("items", []):
-            # Get detailed monster info (from cache if available)
-            item_index = item["index"]
-            monster_details = _get_item_details("monsters", item_index, cache)
-            if "error" in monster_details:
-                continue
-
-            # Check if monster CR is within range
-            monster_cr = float(monster_details.get("challenge_rating", 0))
-            if min_cr <= monster_cr <= max_cr:
-                results.append({
-                    "name": monster_details["name"],
-                    "challenge_rating": monster_cr,
-                    "type": monster_details.get("type", "Unknown"),
-                    "size": monster_details.get("size", "Unknown"),
-                    "alignment": monster_details.get("alignment", "Unknown"),
-                    "hit_points": monster_details.get("hit_points", 0),
-                    "armor_class": monster_details.get("armor_class", [{"value": 0}])[0].get("value", 0),
-                    "uri": f"resource://dnd/item/monsters/{item_index}"
-                })
-
-        # Sort results by CR and name
-        results.sort(key=lambda x: (x["challenge_rating"], x["name"]))
+        # Bisect the monsters sorted by challenge rating
+        cr_index = _attribute_index("monsters", _monster_entry)
+        if isinstance(cr_index, dict):
+            return cr_index
+        results = cr_index.range(min_cr, max_cr)
 
         return {
             "query": f"Monsters with CR {min_cr}-{max_cr}",
@@ -314,7 +263,7 @@ def register_tools(app, cache: APICache):
 
     @app.tool()
     @track_tool_usage(ToolCategory.SEARCH)
-    def search_all_categories(query: str) -> Dict[str, Any]:
+    async def search_all_categories(query: str) -> Dict[str, Any]:
         """Search across all D&D 5e API categories for any D&D content matching the query.
 
         This is the primary search tool for finding D&D content. It searches across all available
@@ -334,6 +283,11 @@ def register_tools(app, cache: APICache):
         For more specific searches, consider using category-specific tools like filter_spells_by_level
         or find_monsters_by_challenge_rating.
 
+        Matches are ranked with BM25 over item names, indexes and descriptions held in a
+        local full-text index. Category lists and item details that are not yet indexed
+        are fetched concurrently, so an uncached search costs about one API round trip per
+        step and a warm search makes no requests.
+
         Args:
             query: Search term (minimum 3 characters) to find across all D&D content
 
@@ -370,10 +324,15 @@ def register_tools(app, cache: APICache):
                 {"error": error_attr_id, "message": error_attr_id}
             )
 
-        # Get available categories
-        categories_response = requests.get(
-            f"{BASE_URL}", timeout=REQUEST_TIMEOUT)
-        if categories_response.status_code != 200:
+        # Enhance the query using our query enhancement module
+        enhanced_query, enhancements = enhance_query(query)
+
+        # Use the enhanced query for tokenization
+        query_tokens = [token for token in tokenize(enhanced_query) if len(token) > 2]
+
+        # Index available categories, their items and candidate item details
+        categories = await _fetch_search_data(query_tokens)
+        if categories is None:
             error_response = {
                 "error": "Failed to fetch categories",
                 "message": "API request failed, please try again",
@@ -396,11 +355,6 @@ def register_tools(app, cache: APICache):
                 {"error": error_attr_id, "message": error_attr_id}
             )
 
-        categories = list(categories_response.json().keys())
-
-        # Enhance the query using our query enhancement module
-        enhanced_query, enhancements = enhance_query(query)
-
         # Add attribution for the query enhancement
         enhancement_attr_id = attribution_manager.add_attribution(
             attribution=SourceAttribution(
@@ -419,10 +373,6 @@ def register_tools(app, cache: APICache):
             )
         )
 
-        # Use the enhanced query for tokenization
-        query_tokens = [token.lower()
-                        for token in enhanced_query.split() if len(token) > 2]
-
         # Use category prioritization from our module
         category_priorities = enhancements["category_priorities"]
 
@@ -440,32 +390,20 @@ def register_tools(app, cache: APICache):
         all_matches = []
         attribution_map = {}
 
-        for category in categories:
-            # Skip rule-related categories for efficiency
-            if category in ["rule-sections", "rules"]:
-                continue
-
-            # Get category items (from cache if available)
-            category_data = _get_category_items(category, cache)
-            if "error" in category_data:
-                continue
+        # Rank matches in names, indexes and descriptions
+        hits_by_category = {}
+        for hit in search_index.search(query_tokens, categories):
+            hits_by_category.setdefault(hit.category, []).append(hit)
 
-            # Search for matching items with relevance scoring
+        for category in categories:
             matching_items = []
 
-            for item in category_data.get("items", []):
-                item_name = item["name"].lower()
-                item_index = item.get("index", "").lower()
-
-                # Get item details for more comprehensive search
-                item_details = None
-                if any(token in item_name or token in item_index for token in query_tokens):
-                    # Only fetch details if there's a potential match to avoid unnecessary API calls
-                    item_details = _get_item_details(
-                        category, item["index"], cache)
+            for hit in hits_by_category.get(category, []):
+                item_name = hit.name.lower()
+                item_index = hit.index.lower()
 
                 # Calculate relevance score
-                score = 0
+                score = hit.score * BM25_SCORE_SCALE
 
                 # Exact match in name or index
                 if query.lower() == item_name or query.lower() == item_index:
@@ -476,81 +414,45 @@ def register_tools(app, cache: APICache):
                         enhanced_query.lower() == item_name or enhanced_query.lower() == item_index):
                     score += 90
 
-                # Partial matches in name or index
-                for token in query_tokens:
-                    if token in item_name:
-                        score += 20
-                    if token in item_index:
-                        score += 15
-
-                # Check if name contains all tokens
-                if all(token in item_name for token in query_tokens):
-                    score += 50
-
-                # Check if name starts with any token
-                if any(item_name.startswith(token) for token in query_tokens):
-                    score += 25
-
-                # Search in description if available
-                if item_details and isinstance(item_details, dict):
-                    description = ""
-
-                    # Extract description based on item type
-                    if "desc" in item_details:
-                        if isinstance(item_details["desc"], list):
-                            description = " ".join(item_details["desc"])
-                        else:
-                            description = str(item_details["desc"])
-                    elif "description" in item_details:
-                        description = str(item_details["description"])
-
-                    description = description.lower()
-
-                    # Score based on description matches
-                    for token in query_tokens:
-                        if token in description:
-                            score += 10
-
-                    # Bonus for multiple token matches in description
-                    matching_tokens = sum(
-                        1 for token in query_tokens if token in description)
-                    if matching_tokens > 1:
-                        score += matching_tokens * 5
-
                 # Apply category priority multiplier
                 score *= category_priorities.get(category, 1)
 
-                # Add to results if score is above threshold
-                if score > 0:
-                    # Create attribution for this item
-                    confidence_level = ConfidenceLevel.HIGH if score > 70 else (
-                        ConfidenceLevel.MEDIUM if score > 40 else ConfidenceLevel.LOW
-                    )
+                # Create attribution for this item
+                confidence_level = ConfidenceLevel.HIGH if score > 70 else (
+                    ConfidenceLevel.MEDIUM if score > 40 else ConfidenceLevel.LOW
+                )
 
-                    item_attr_id = attribution_manager.add_attribution(
-                        attribution=SourceAttribution(
-                            source="D&D 5e API",
-                            api_endpoint=f"{BASE_URL}/{category}/{item['index']}",
-                            confidence=confidence_level,
-                            relevance_score=min(score, 100),
-                            tool_used="search_all_categories",
-                            metadata={
-                                "category": category,
-                                "score": score
-                            }
-                        )
+                item_attr_id = attribution_manager.add_attribution(
+                    attribution=SourceAttribution(
+                        source="D&D 5e API",
+                        api_endpoint=f"{BASE_URL}/{category}/{hit.index}",
+                        confidence=confidence_level,
+                        relevance_score=min(score, 100),
+                        tool_used="search_all_categories",
+                        metadata={
+                            "category": category,
+                            "score": score,
+                            "matched_fields": list(hit.fields)
+                        }
                     )
+                )
 
-                    item_with_score = item.copy()
-                    item_with_score["score"] = score
-                    item_with_score["attribution_id"] = item_attr_id
-                    matching_items.append(item_with_score)
+                item_with_score = {
+                    "name": hit.name,
+                    "index": hit.index,
+                    "description": f"Details about {hit.name}",
+                    "uri": f"resource://dnd/item/{category}/{hit.index}",
+                    "source": "D&D 5e API",
+                    "score": score,
+                    "attribution_id": item_attr_id
+                }
+                matching_items.append(item_with_score)
 
-                    # Add to all matches for cross-category top results
-                    all_matches.append({
-                        "category": category,
-                        "item": item_with_score
-                    })
+                # Add to all matches for cross-category top results
+                all_matches.append({
+                    "category": category,
+                    "item": item_with_score
+                })
 
             # Sort matching items by score
             matching_items.sort(key=lambda x: x["score"], reverse=True)
@@ -642,7 +544,7 @@ def register_tools(app, cache: APICache):
 
     @app.tool()
     @track_tool_usage(ToolCategory.SEARCH)
-    def verify_with_api(statement: str, category: str = None) -> Dict[str, Any]:
+    async def verify_with_api(statement: str, category: str = None) -> Dict[str, Any]:
         """Verify the accuracy of a D&D statement by checking it against the official D&D 5e API data.
 
         This tool analyzes a statement about D&D 5e rules, creatures, spells, or other game elements
@@ -744,14 +646,14 @@ def register_tools(app, cache: APICache):
 
         if category:
             # Search in specific category
-            category_data = _get_category_items(category, cache)
+            category_data = await asyncio.to_thread(_get_category_items, category, cache)
             if "error" not in category_data:
                 matching_items = []
                 for item in category_data.get("items", []):
                     item_name = item["name"].lower()
                     if any(term in item_name for term in search_terms):
-                        item_details = _get_item_details(
-                            category, item["index"], cache)
+                        item_details = await asyncio.to_thread(
+                            _get_item_details, category, item["index"], cache)
                         if "error" not in item_details:
                             # Create attribution for this item
                             item_attr_id = attribution_manager.add_attribution(
@@ -788,14 +690,14 @@ def register_tools(app, cache: APICache):
 
             # First, try the top categories
             for category_name in top_categories:
-                category_data = _get_category_items(category_name, cache)
+                category_data = await asyncio.to_thread(_get_category_items, category_name, cache)
                 if "error" not in category_data:
                     matching_items = []
                     for item in category_data.get("items", []):
                         item_name = item["name"].lower()
                         if any(term in item_name for term in search_terms):
-                            item_details = _get_item_details(
-                                category_name, item["index"], cache)
+                            item_details = await asyncio.to_thread(
+                                _get_item_details, category_name, item["index"], cache)
                             if "error" not in item_details:
                                 # Create attribution for this item
                                 item_attr_id = attribution_manager.add_attribution(
@@ -826,14 +728,14 @@ def register_tools(app, cache: APICache):
 
             # If no matches found in top categories, fall back to search_all_categories
             if not found_matches:
-                all_results = search_all_categories(search_query)
+                all_results = await search_all_categories(search_query)
 
                 if all_results.get("total_count", 0) > 0:
                     for category_name, category_data in all_results.get("results", {}).items():
                         matching_items = []
                         for item in category_data.get("items", []):
-                            item_details = _get_item_details(
-                                category_name, item["index"], cache)
+                            item_details = await asyncio.to_thread(
+                                _get_item_details, category_name, item["index"], cache)
                             if "error" not in item_details:
                                 # Create attribution for this item
                                 item_attr_id = attribution_manager.add_attribution(
@@ -953,10 +855,11 @@ def register_tools(app, cache: APICache):
         2. Checking key endpoints (spells, monsters, classes)
         3. Reporting on available categories and their status
         4. Providing counts of available resources
+        5. Reporting the retry policy and the circuit breaker state of each upstream host
 
         Returns:
             A dictionary containing API status information, available endpoints,
-            resource counts, and source attribution to the D&D 5e API.
+            resource counts, circuit breaker state, and source attribution to the D&D 5e API.
         """
         logger.debug("Checking API health")
 
@@ -965,8 +868,7 @@ def register_tools(app, cache: APICache):
 
         # Check base API endpoint
         try:
-            base_response = requests.get(
-                f"{BASE_URL}", timeout=REQUEST_TIMEOUT)
+            base_response = get_client().get(f"{BASE_URL}")
             base_status = base_response.status_code == 200
             base_data = base_response.json() if base_status else {}
         except Exception as e:
@@ -992,7 +894,8 @@ def register_tools(app, cache: APICache):
             error_response = {
                 "status": "error",
                 "message": "D&D 5e API is not responding",
-                "details": "The base API endpoint could not be reached. Please try again later."
+                "details": "The base API endpoint could not be reached. Please try again later.",
+                "resilience": _resilience_status()
             }
 
             # Prepare response with attribution for MCP
@@ -1009,8 +912,7 @@ def register_tools(app, cache: APICache):
         key_endpoints = ["spells", "monsters", "classes"]
         for endpoint in key_endpoints:
             try:
-                endpoint_response = requests.get(
-                    f"{BASE_URL}/{endpoint}", timeout=REQUEST_TIMEOUT)
+                endpoint_response = get_client().get(f"{BASE_URL}/{endpoint}")
                 endpoint_status = endpoint_response.status_code == 200
                 endpoint_data = endpoint_response.json() if endpoint_status else {}
                 count = endpoint_data.get("count", 0) if endpoint_status else 0
@@ -1066,6 +968,7 @@ def register_tools(app, cache: APICache):
                 "available_categories": list(base_data.keys()) if base_status else []
             },
             "key_endpoints": endpoints_status,
+            "resilience": _resilience_status(),
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
         }
 
@@ -1126,11 +1029,42 @@ def register_tools(app, cache: APICache):
 
                 formatted_content += "\n"
 
+            formatted_content += "## Circuit Breakers\n\n"
+            for host, circuit in health_check["resilience"]["circuits"].items():
+                formatted_content += f"- **{host}:** {circuit['state']} "
+                formatted_content += f"({circuit['consecutive_failures']} consecutive failures, "
+                formatted_content += f"opened {circuit['times_opened']} times)\n"
+
             health_check["content"] = formatted_content
 
         # Prepare the final response with all attributions
         return source_tracker.prepare_mcp_response(health_check, attribution_map)
 
+    @app.tool()
+    @track_tool_usage(ToolCategory.CONTEXT)
+    def get_cache_stats(namespace: str = None) -> Dict[str, Any]:
+        """Get statistics for the D&D API cache.
+
+        Reports hits, misses, expirations, evictions, memory usage and load
+        latencies, overall and per key prefix, to help diagnose slow lookups
+        or tune cache settings.
+
+        Args:
+            namespace: Optional key prefix (e.g. "dnd_items_", "campaign_") to
+                limit the breakdown to
+
+        Returns:
+            A dictionary of cache statistics
+        """
+        stats = cache.get_stats()
+        if namespace:
+            stats["namespaces"] = {
+                name: values for name, values in stats["namespaces"].items()
+                if name == namespace
+            }
+        stats["source"] = "D&D MCP Server Cache"
+        return stats
+
     @app.tool()
     def generate_treasure_hoard(challenge_rating: float, is_final_treasure: bool = False, treasure_type: str = "hoard") -> Dict[str, Any]:
         """Generate D&D 5e treasure based on challenge rating and context.
@@ -1305,10 +1239,23 @@ def register_tools(app, cache: APICache):
         """Get equipment items from the D&D 5e API based on CR tier."""
         import random
 
-        # Get all equipment from API
-        equipment_list = _get_category_items("equipment", cache)
-        if "error" in equipment_list:
-            return []
+        # Value ranges by CR tier (in gp)
+        value_ranges = {
+            "0-4": (1, 50),
+            "5-10": (10, 250),
+            "11-16": (50, 750),
+            "17+": (100, 2500)
+        }
+
+        min_value, max_value = value_ranges[cr_tier]
+        if _store_has("equipment"):
+            candidates = store.equipment(min_value * COPPER_PER_UNIT["gp"], max_value * COPPER_PER_UNIT["gp"])
+        else:
+            # Get all equipment from API
+            equipment_list = _get_category_items("equipment", cache)
+            if "error" in equipment_list:
+                return []
+            candidates = _walk_category_details("equipment", equipment_list)
 
         # Number of items to include
         num_items = 0
@@ -1324,24 +1271,10 @@ def register_tools(app, cache: APICache):
             else:  # 17+
                 num_items = random.randint(1, 3)
 
-        # Value ranges by CR tier (in gp)
-        value_ranges = {
-            "0-4": (1, 50),
-            "5-10": (10, 250),
-            "11-16": (50, 750),
-            "17+": (100, 2500)
-        }
-
-        min_value, max_value = value_ranges[cr_tier]
-
         # Filter equipment by value
         valuable_items = []
-        for item in equipment_list.get("items", []):
-            item_index = item["index"]
-            item_details = _get_item_details("equipment", item_index, cache)
-
-            if "error" in item_details or not isinstance(item_details, dict):
-                continue
+        for item_details in candidates:
+            item_index = item_details["index"]
 
             # Check if item has cost
             if "cost" in item_details:
@@ -1372,10 +1305,14 @@ def register_tools(app, cache: APICache):
         """Get magic items from the D&D 5e API based on CR tier."""
         import random
 
-        # Get all magic items from API
-        magic_items_list = _get_category_items("magic-items", cache)
-        if "error" in magic_items_list:
-            return []
+        if _store_has("magic-items"):
+            candidates = store.all("magic-items")
+        else:
+            # Get all magic items from API
+            magic_items_list = _get_category_items("magic-items", cache)
+            if "error" in magic_items_list:
+                return []
+            candidates = _walk_category_details("magic-items", magic_items_list)
 
         # Number of magic items by CR tier
         num_items_range = {
@@ -1410,13 +1347,7 @@ def register_tools(app, cache: APICache):
         }
 
         # Categorize all magic items by rarity
-        for item in magic_items_list.get("items", []):
-            item_index = item["index"]
-            item_details = _get_item_details("magic-items", item_index, cache)
-
-            if "error" in item_details or not isinstance(item_details, dict):
-                continue
-
+        for item_details in candidates:
             rarity = item_details.get("rarity", {}).get("name", "Unknown")
             if rarity in items_by_rarity:
                 items_by_rarity[rarity].append(item_details)
@@ -1506,50 +1437,40 @@ def register_tools(app, cache: APICache):
         return description
 
     # Helper functions
-    def _get_category_items(category: str, cache: APICache) -> Dict[str, Any]:
-        """Get all items in a category, using cache if available."""
-        cache_key = f"dnd_items_{category}"
-        cached_data = cache.get(cache_key)
+    def _category_error(category: str, status_code: int) -> Dict[str, Any]:
+        """Build the error returned when a category cannot be fetched."""
+        return {
+            "error": f"Category '{category}' not found or API request failed",
+            "status_code": status_code,
+            "message": "Please use only valid D&D 5e API categories",
+            "source": "D&D 5e API"
+        }
+
+    def _item_error(category: str, index: str, status_code: int) -> Dict[str, Any]:
+        """Build the error returned when an item cannot be fetched."""
+        return {
+            "error": f"Item '{index}' not found in category '{category}' or API request failed",
+            "status_code": status_code,
+            "message": "Please use only valid D&D 5e API endpoints and parameters",
+            "source": "D&D 5e API"
+        }
 
-        if cached_data:
-            # Add source attribution if not already present
-            if isinstance(cached_data, dict) and "source" not in cached_data:
-                cached_data["source"] = "D&D 5e API"
-            return cached_data
+    def _fetch_category_items(category: str) -> Dict[str, Any]:
+        """Fetch all items in a category from the API, returning an error dict on failure.
 
+        An unchanged list (304 Not Modified), or an upstream failure with a cached
+        copy, returns the cached value.
+        """
         try:
-            response = requests.get(f"{BASE_URL}/{category}")
-            if response.status_code != 200:
-                return {
-                    "error": f"Category '{category}' not found or API request failed",
-                    "status_code": response.status_code,
-                    "message": "Please use only valid D&D 5e API categories",
-                    "source": "D&D 5e API"
-                }
-
-            data = response.json()
+            result = fetch_json(f"{BASE_URL}/{category}", cache=cache,
+                                cache_key=category_items_key(category))
+            if result.from_cache:
+                return Uncached(result.data) if result.stale else result.data
+            if result.status_code != 200:
+                return _category_error(category, result.status_code)
 
             # Transform to resource format
-            items = []
-            for item in data.get("results", []):
-                items.append({
-                    "name": item["name"],
-                    "index": item["index"],
-                    "description": f"Details about {item['name']}",
-                    "uri": f"resource://dnd/item/{category}/{item['index']}",
-                    "source": "D&D 5e API"
-                })
-
-            result = {
-                "category": category,
-                "items": items,
-                "count": len(items),
-                "source": "D&D 5e API"
-            }
-
-            # Cache the result
-            cache.set(cache_key, result)
-            return result
+            return category_items_from_api(category, result.data)
 
         except Exception as e:
             logger.exception(f"Error fetching category {category}: {e}")
@@ -1559,34 +1480,24 @@ def register_tools(app, cache: APICache):
                 "source": "D&D 5e API"
             }
 
-    def _get_item_details(category: str, index: str, cache: APICache) -> Dict[str, Any]:
-        """Get detailed information about a specific item, using cache if available."""
-        cache_key = f"dnd_item_{category}_{index}"
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            # Add source attribution if not already present
-            if isinstance(cached_data, dict) and "source" not in cached_data:
-                cached_data["source"] = "D&D 5e API"
-            return cached_data
+    def _fetch_item_details(category: str, index: str) -> Dict[str, Any]:
+        """Fetch a specific item from the API, returning an error dict on failure.
 
+        An unchanged item (304 Not Modified), or an upstream failure with a cached
+        copy, returns the cached value.
+        """
         try:
-            response = requests.get(f"{BASE_URL}/{category}/{index}")
-            if response.status_code != 200:
-                return {
-                    "error": f"Item '{index}' not found in category '{category}' or API request failed",
-                    "status_code": response.status_code,
-                    "message": "Please use only valid D&D 5e API endpoints and parameters",
-                    "source": "D&D 5e API"
-                }
+            result = fetch_json(f"{BASE_URL}/{category}/{index}", cache=cache,
+                                cache_key=item_key(category, index))
+            if result.from_cache:
+                return Uncached(result.data) if result.stale else result.data
+            if result.status_code != 200:
+                return _item_error(category, index, result.status_code)
 
-            data = response.json()
+            data = result.data
 
             # Add source attribution
             data["source"] = "D&D 5e API"
-
-            # Cache the result
-            cache.set(cache_key, data)
             return data
 
         except Exception as e:
@@ -1597,6 +1508,281 @@ def register_tools(app, cache: APICache):
                 "source": "D&D 5e API"
             }
 
+    def _is_success(fetch_result: Dict[str, Any]) -> bool:
+        """Only successful fetch results are cached."""
+        return "error" not in fetch_result
+
+    def _with_source(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add source attribution if not already present."""
+        if isinstance(data, dict) and "error" not in data and "source" not in data:
+            data["source"] = "D&D 5e API"
+        return data
+
+    def _store_has(category: str) -> bool:
+        """Whether the local SRD store holds every item of a category."""
+        return store is not None and store.is_loaded(category)
+
+    def _walk_category_details(category: str, category_list: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Get the details of every listed item, skipping items that cannot be fetched."""
+        details = []
+        for item in category_list.get("items", []):
+            item_details = _get_item_details(category, item["index"], cache)
+            if isinstance(item_details, dict) and "error" not in item_details:
+                details.append({"index": item["index"], **item_details})
+        return details
+
+    def _listing_stamp(category_data: Dict[str, Any]) -> Tuple:
+        """Cheap marker of a cached category list, to tell when indexes built from it are out of date."""
+        items = category_data.get("items", [])
+        return ("cache", len(items), items[0]["index"] if items else None,
+                items[-1]["index"] if items else None)
+
+    def _attribute_index(category: str, entry: Callable[[Dict[str, Any]], Optional[Tuple[float, Dict[str, Any]]]],
+                         group_by: Optional[str] = None) -> Any:
+        """Get a category's sorted attribute index, building it if its data changed.
+
+        Args:
+            category: The category
+            entry: Converts an item's details to its (value, result row), or None to leave it out
+            group_by: Result row field to partition the index by
+
+        Returns:
+            The index, or an error dict if the category list cannot be fetched
+        """
+        if _store_has(category):
+            return attribute_indexes.get(
+                category, ("store", store.loaded_at(category)),
+                lambda: [e for e in map(entry, store.all(category)) if e is not None], group_by)
+
+        category_list = _get_category_items(category, cache)
+        if "error" in category_list:
+            return category_list
+        complete = []
+
+        def build() -> List[Tuple[float, Dict[str, Any]]]:
+            details = _walk_category_details(category, category_list)
+            complete.append(len(details) == len(category_list.get("items", [])))
+            return [e for e in map(entry, details) if e is not None]
+
+        index = attribute_indexes.get(category, _listing_stamp(category_list), build, group_by)
+        if complete and not complete[0]:
+            # Items that could not be fetched are retried on the next call
+            attribute_indexes.invalidate(category)
+        return index
+
+    def _spell_entry(spell_details: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        """Index a spell by level."""
+        spell_level = spell_details.get("level", 0)
+        return spell_level, {
+            "name": spell_details["name"],
+            "level": spell_level,
+            "school": spell_details.get("school", {}).get("name", "Unknown"),
+            "casting_time": spell_details.get("casting_time", "Unknown"),
+            "description": _get_description(spell_details),
+            "uri": f"resource://dnd/item/spells/{spell_details['index']}"
+        }
+
+    def _monster_entry(monster_details: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        """Index a monster by challenge rating."""
+        monster_cr = float(monster_details.get("challenge_rating", 0))
+        return monster_cr, {
+            "name": monster_details["name"],
+            "challenge_rating": monster_cr,
+            "type": monster_details.get("type", "Unknown"),
+            "size": monster_details.get("size", "Unknown"),
+            "alignment": monster_details.get("alignment", "Unknown"),
+            "hit_points": monster_details.get("hit_points", 0),
+            "armor_class": monster_details.get("armor_class", [{"value": 0}])[0].get("value", 0),
+            "uri": f"resource://dnd/item/monsters/{monster_details['index']}"
+        }
+
+    def _equipment_entry(item_details: Dict[str, Any]) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Index an item by its cost in copper pieces; items without a cost are left out."""
+        cost = item_details.get("cost")
+        cost_cp = cost_in_copper(cost)
+        if cost_cp is None:
+            return None
+        return cost_cp, {
+            "name": item_details["name"],
+            "cost": f"{cost['quantity']} {cost['unit']}",
+            "cost_cp": cost_cp,
+            "description": _get_description(item_details),
+            "category": item_details.get("equipment_category", {}).get("name", "Unknown"),
+            "uri": f"resource://dnd/item/equipment/{item_details['index']}"
+        }
+
+    def _get_category_items(category: str, cache: APICache) -> Dict[str, Any]:
+        """Get all items in a category, from the SRD store or the cache if available.
+
+        Expired entries are served immediately while a background refresh runs,
+        and concurrent misses share a single request.
+        """
+        category = normalize_category(category)
+        if _store_has(category):
+            return store.listing(category)
+        cache_key = category_items_key(category)
+        if cache.get_negative(cache_key):
+            return _category_error(category, 404)
+
+        def load() -> Dict[str, Any]:
+            result = _fetch_category_items(category)
+            if isinstance(result, dict) and result.get("status_code") == 404:
+                cache.set_negative(cache_key)
+            return result
+
+        return _with_source(cache.get_or_fetch(cache_key, load, cacheable=_is_success))
+
+    def _get_item_details(category: str, index: str, cache: APICache) -> Dict[str, Any]:
+        """Get detailed information about a specific item, from the SRD store or the cache if available.
+
+        Expired entries are served immediately while a background refresh runs,
+        and concurrent misses share a single request.
+        """
+        category = normalize_category(category)
+        index = normalize_index(index)
+        if store is not None:
+            # The store only holds complete REST records (never bulk-load summaries)
+            stored = store.get(category, index)
+            if stored is not None:
+                return stored
+        cache_key = item_key(category, index)
+        if cache.get_negative(cache_key):
+            return _item_error(category, index, 404)
+
+        def load() -> Dict[str, Any]:
+            result = _fetch_item_details(category, index)
+            if isinstance(result, dict) and result.get("status_code") == 404:
+                cache.set_negative(cache_key)
+            return result
+
+        return _with_source(cache.get_or_fetch(cache_key, load, cacheable=_is_success))
+
+    def _refresh_loader(key: str, url: str, convert: Callable[[Any], Any]) -> Callable[[], Any]:
+        """Build a loader refreshing one ``_fetch_cached`` key in the background."""
+        def load() -> Any:
+            result = fetch_json(url, cache=cache, cache_key=key)
+            if result.from_cache:
+                return Uncached(result.data) if result.stale else result.data
+            return convert(result.data) if result.status_code == 200 else None
+        return load
+
+    async def _fetch_cached(fetcher: AsyncFetcher,
+                            wanted: Dict[str, Tuple[str, Callable[[Any], Any]]]) -> Dict[str, Any]:
+        """Get many cached values, fetching all the misses in one concurrent wave.
+
+        Expired entries are served immediately while a background refresh runs.
+
+        Args:
+            fetcher: Fetcher to send the requests with
+            wanted: Mapping of cache key to (URL, function converting the API
+                response to the cached value)
+
+        Returns:
+            Mapping of cache key to value for every key that could be loaded
+        """
+        values = {}
+        urls = {}
+        for key, (url, convert) in wanted.items():
+            if cache.get_negative(key):
+                continue
+            cached = cache.get_or_refresh(key, _refresh_loader(key, url, convert))
+            if cached is not None:
+                values[key] = cached
+            else:
+                urls[key] = url
+
+        for key, result in (await fetcher.fetch_all(urls)).items():
+            if result.from_cache:
+                value = result.data
+            elif result.status_code == 200:
+                value = wanted[key][1](result.data)
+            else:
+                if result.status_code == 404:
+                    cache.set_negative(key)
+                continue
+            if not result.stale:
+                cache.set(key, value)
+            values[key] = value
+        return values
+
+    def _refresh_search_index(categories: List[str], category_lists: Dict[str, Any]) -> None:
+        """Re-index the categories whose data changed since they were last indexed.
+
+        Categories fully ingested into the SRD store are indexed with every item's
+        description. Other categories are indexed from their cached list, with the
+        descriptions of the items whose details are cached.
+        """
+        loaded = store.loaded_categories() if store is not None else {}
+        for category in categories:
+            if category in loaded:
+                stamp = ("store", loaded[category]["loaded"])
+                if search_index.stamp(category) != stamp:
+                    search_index.replace_category(
+                        category, ((item["index"], item.get("name", item["index"]), item)
+                                   for item in store.all(category)), stamp)
+                continue
+
+            category_data = category_lists.get(category_items_key(category))
+            if category_data is None:
+                continue
+            stamp = _listing_stamp(category_data)
+            if search_index.stamp(category) != stamp:
+                search_index.replace_category(
+                    category, ((item["index"], item["name"], cache.peek(item_key(category, item["index"])))
+                               for item in category_data.get("items", [])), stamp)
+
+    async def _fetch_search_data(query_tokens: List[str]) -> Optional[List[str]]:
+        """Bring the search index up to date for a query.
+
+        The category lists not covered by the SRD store are fetched in one
+        concurrent wave, then the details of every item whose name or index
+        matches a query token, and which is not yet indexed with its
+        description, in a second.
+
+        Args:
+            query_tokens: Lowercase query tokens
+
+        Returns:
+            The categories to search, or None if the list of categories could not be fetched
+        """
+        root = await _fetch_cached(search_fetcher, {categories_key(): (BASE_URL, categories_from_api)})
+        if categories_key() not in root:
+            return None
+
+        # Skip rule-related categories for efficiency
+        categories = [category["name"] for category in root[categories_key()]["categories"]
+                      if category["name"] not in ["rule-sections", "rules"]]
+        category_lists = await _fetch_cached(search_fetcher, {
+            category_items_key(category): (f"{BASE_URL}/{category}",
+                                           lambda data, c=category: category_items_from_api(c, data))
+            for category in categories if not _store_has(category)
+        })
+        _refresh_search_index(categories, category_lists)
+
+        # Only fetch details if there's a potential match to avoid unnecessary API calls
+        candidates = {}
+        for hit in search_index.search(query_tokens, categories, fields=("name",)):
+            if not search_index.has_details(hit.category, hit.index):
+                candidates[item_key(hit.category, hit.index)] = (
+                    f"{BASE_URL}/{hit.category}/{hit.index}", _with_source, hit)
+        item_details = await _fetch_cached(
+            search_fetcher, {key: (url, transform) for key, (url, transform, _) in candidates.items()})
+
+        for key, details in item_details.items():
+            hit = candidates[key][2]
+            search_index.add(hit.category, hit.index, hit.name, details)
+        return categories
+
+    def _resilience_status() -> Dict[str, Any]:
+        """Report the retry policy and the circuit breaker and rate limiter of every upstream host."""
+        stats = get_client().get_stats()
+        return {
+            "retry": stats["retry"],
+            "circuits": stats["circuits"],
+            "rate_limits": stats["rate_limits"],
+            "cache_fallbacks": cache.stats.total("fallbacks")
+        }
+
     def _convert_currency(amount: float, from_unit: str, to_unit: str) -> float:
         """Convert currency between different units (gp, sp, cp)."""
         # Conversion rates
@@ -1683,15 +1869,27 @@ def register_tools(app, cache: APICache):
     print("D&D API tools registered successfully", file=sys.stderr)
 
 
-def register_campaign_tools(app, supabase_client):
+def register_campaign_tools(app, supabase_client, class_spells: Optional[ClassSpellLists] = None):
     """Register campaign database tools with the FastMCP app.
 
     Args:
         app: The FastMCP app instance
         supabase_client: The SupabaseClient instance for database access
+        class_spells: Optional SRD class spell lists, used to check the spells
+            characters learn from their class
     """
     print("Registering Campaign tools...", file=sys.stderr)
 
+    def _class_spell_index():
+        """Return the SRD class spell index, or None if it is unavailable."""
+        if class_spells is None:
+            return None
+        try:
+            return class_spells.current()
+        except Exception as e:
+            logger.warning(f"Class spell lists unavailable: {e}")
+            return None
+
     # =========================================================================
     # CHARACTER TOOLS
     # =========================================================================
@@ -1784,6 +1982,14 @@ def register_campaign_tools(app, supabase_client):
 
             spells = supabase_client.get_character_spells(char["id"], source_type)
 
+            # Mark whether class spells are on that class's SRD spell list
+            index = _class_spell_index()
+            if index is not None:
+                spells = [dict(spell) for spell in spells]
+                for spell in spells:
+                    if spell.get("source_type") == "class" and index.has_class(spell.get("source_name") or ""):
+                        spell["on_class_spell_list"] = index.has_spell(spell["source_name"], spell.get("spell_name") or "")
+
             return {
                 "spells": spells,
                 "count": len(spells),
@@ -2698,11 +2904,26 @@ def register_campaign_tools(app, supabase_client):
                 notes=notes
             )
 
-            return {
+            response = {
                 "spell": result,
                 "message": f"Added {spell_name} to {character_name}'s spell list",
                 "source": "Campaign Database"
             }
+
+            # Flag (but allow) spells that disagree with the SRD class spell lists
+            index = _class_spell_index()
+            if index is not None:
+                warnings = []
+                srd_level = index.spell_level(spell_name)
+                if srd_level is not None and srd_level != spell_level:
+                    warnings.append(f"{spell_name} is a level {srd_level} spell in the SRD, not level {spell_level}")
+                if source_type == "class" and index.has_class(source_name) \
+                        and not index.has_spell(source_name, spell_name):
+                    warnings.append(f"{spell_name} is not on the SRD {source_name} spell list")
+                if warnings:
+                    response["warnings"] = warnings
+
+            return response
         except Exception as e:
             logger.error(f"Error adding spell: {e}")
             return {"error": str(e), "source": "Campaign Database"}
@@ -2762,18 +2983,10 @@ def register_campaign_tools(app, supabase_client):
         logger.debug(f"Looking up spell: {spell_name}, character: {character_name}")
 
         try:
-            # Get spell from D&D API (using existing function)
-            from src.core.api_helpers import API_BASE_URL
-            import requests
-
-            spell_index = spell_name.lower().replace(" ", "-").replace("'", "")
-            url = f"{API_BASE_URL}/spells/{spell_index}"
-
-            response = requests.get(url, timeout=REQUEST_TIMEOUT)
+            # Get spell from D&D API, sharing the SRD cache entry
+            from src.core.api_helpers import fetch_dnd_entity
 
-            spell_data = None
-            if response.status_code == 200:
-                spell_data = response.json()
+            spell_data = fetch_dnd_entity("spells", spell_name, cache=supabase_client.cache)
 
             # Check character spell access if character specified
             character_access = None
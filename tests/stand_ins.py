@@ -0,0 +1,126 @@
+"""
+Stand-ins shared by the tests: a local D&D 5e API server and minimal FastMCP apps.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInAPI:
+    """A local stand-in for the D&D 5e API that honours conditional requests."""
+
+    def __init__(self):
+        self.resources = {}
+        self.requests = []
+        self.connections = set()
+        self.delay = 0
+        self.failures = {}
+        self.graphql = lambda query: {"errors": [{"message": "no GraphQL stand-in"}]}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections alive so clients can reuse them
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with api._lock:
+                    api.requests.append((self.path, dict(self.headers)))
+                    api.connections.add(self.client_address)
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                try:
+                    time.sleep(api.delay)
+                    self._respond()
+                finally:
+                    with api._lock:
+                        api.in_flight -= 1
+
+            def _respond(self):
+                with api._lock:
+                    failing = api.failures.get(self.path, 0)
+                    if failing:
+                        api.failures[self.path] = failing - 1
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                resource = api.resources.get(self.path)
+                if resource is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body, etag, last_modified = resource
+                if (etag and self.headers.get("If-None-Match") == etag) or (
+                        last_modified and self.headers.get("If-Modified-Since") == last_modified):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                # Bytes bodies are sent as they are, e.g. a proxy's HTML error page
+                raw = isinstance(body, bytes)
+                payload = body if raw else json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html" if raw else "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if etag:
+                    self.send_header("ETag", etag)
+                if last_modified:
+                    self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with api._lock:
+                    api.requests.append((self.path, dict(self.headers)))
+                payload = json.dumps(api.graphql(json.loads(body)["query"])).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+
+class ToolRecorder:
+    """Minimal stand-in for the FastMCP app that keeps registered tools by name."""
+
+    def __init__(self):
+        self.tools = {}
+
+    def tool(self):
+        def decorator(func):
+            self.tools[func.__name__] = func
+            return func
+        return decorator
+
+
+
+class PromptRecorder:
+    """Minimal stand-in for the FastMCP app that keeps registered prompts by name."""
+
+    def __init__(self):
+        self.prompts = {}
+
+    def prompt(self):
+        def decorator(func):
+            self.prompts[func.__name__] = func
+            return func
+        return decorator
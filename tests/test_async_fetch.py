@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous fetcher.
+
+This script tests that search_all_categories fetches its data concurrently.
+"""
+
+import os
+import sys
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+# Allow running this file directly (python tests/test_async_fetch.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core.cache_keys import categories_key
+from src.core.async_fetch import AsyncFetcher
+import src.core.tools as tools
+from src.core.http_client import configure_client
+from src.core.resilience import CircuitBreakers, RetryPolicy
+from tests.stand_ins import StandInAPI, ToolRecorder
+
+
+def test_async_search_fan_out():
+    """Test that search_all_categories fetches each wave of requests concurrently."""
+    print("Testing async search fan-out...")
+
+    api = StandInAPI()
+    api.delay = 0.2
+    base_url = f"{api.base_url}/api"
+    api.resources["/api"] = ({"spells": "/api/spells", "monsters": "/api/monsters",
+                              "rules": "/api/rules"}, None, None)
+    api.resources["/api/spells"] = ({"count": 3, "results": [
+        {"index": "fireball", "name": "Fireball"},
+        {"index": "fire-bolt", "name": "Fire Bolt"},
+        {"index": "shield", "name": "Shield"}]}, None, None)
+    api.resources["/api/monsters"] = ({"count": 1, "results": [
+        {"index": "fire-giant", "name": "Fire Giant"}]}, None, None)
+    for path, desc in [("spells/fireball", "A bright streak of fire"),
+                       ("spells/fire-bolt", "You hurl a mote of fire"),
+                       ("monsters/fire-giant", "Giants of the volcanic forges")]:
+        api.resources[f"/api/{path}"] = ({"index": path.split("/")[1], "desc": [desc]}, '"v1"', None)
+
+    original_base_url = tools.BASE_URL
+    tools.BASE_URL = base_url
+    try:
+        # The fetcher runs a wave concurrently and revalidates cached entries
+        cache = APICache(ttl_hours=1, persistent=False)
+
+        async def wave():
+            async with AsyncFetcher(cache, concurrency=2) as fetcher:
+                return await fetcher.fetch_all({
+                    "dnd_item_spells_fireball": f"{base_url}/spells/fireball",
+                    "dnd_item_spells_fire-bolt": f"{base_url}/spells/fire-bolt",
+                    "dnd_item_spells_missing": f"{base_url}/spells/missing",
+                })
+
+        results = asyncio.run(wave())
+        assert results["dnd_item_spells_fireball"].data["index"] == "fireball"
+        assert results["dnd_item_spells_missing"].status_code == 404
+        assert api.max_in_flight == 2, "Concurrency must be bounded by the semaphore"
+        cache.set("dnd_item_spells_fireball", results["dnd_item_spells_fireball"].data)
+        assert asyncio.run(wave())["dnd_item_spells_fireball"].not_modified
+
+        # A cold search costs one round trip per wave: root, category lists, details
+        cache = APICache(ttl_hours=1, persistent=False)
+        app = ToolRecorder()
+        tools.register_tools(app, cache)
+        search = app.tools["search_all_categories"]
+
+        api.requests.clear()
+        api.max_in_flight = 0
+        start = time.time()
+        result = asyncio.run(search("fire"))
+        elapsed = time.time() - start
+
+        assert result["total_count"] >= 3, result.get("results")
+        assert {match["index"] for match in result["top_results"]} >= {"fireball", "fire-bolt", "fire-giant"}
+        assert "/api/rules" not in [path for path, _ in api.requests]
+        assert len(api.requests) == 6
+        assert api.max_in_flight >= 2
+        assert elapsed < 6 * api.delay, f"Waves should run concurrently, took {elapsed:.2f}s"
+
+        # A warm search is answered from the cache without any request
+        api.requests.clear()
+        asyncio.run(search("fire"))
+        assert api.requests == []
+
+        # Expired entries are served at once and refreshed in the background
+        cache = APICache(ttl_hours=1, persistent=False, max_stale_hours=1)
+        app = ToolRecorder()
+        tools.register_tools(app, cache)
+        search = app.tools["search_all_categories"]
+        asyncio.run(search("fire"))
+        aged = datetime.now() - timedelta(minutes=90)
+        for key, (value, _) in list(cache.cache.items()):
+            cache.set(key, value, timestamp=aged)
+        api.requests.clear()
+        start = time.time()
+        result = asyncio.run(search("fire"))
+        assert time.time() - start < api.delay, "Stale entries must not block the search"
+        assert {match["index"] for match in result["top_results"]} >= {"fireball", "fire-bolt", "fire-giant"}
+        deadline = time.time() + 5
+        while cache.get(categories_key()) is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get(categories_key()) is not None
+
+        # verify_with_api waits for the network without blocking the event loop
+        cache = APICache(ttl_hours=1, persistent=False)
+        app = ToolRecorder()
+        tools.register_tools(app, cache)
+        ticks = []
+
+        async def verify_while_ticking():
+            async def tick():
+                while True:
+                    ticks.append(time.time())
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.ensure_future(tick())
+            try:
+                return await app.tools["verify_with_api"]("Fireball is a spell", category="spells")
+            finally:
+                ticker.cancel()
+
+        result = asyncio.run(verify_while_ticking())
+        assert "fireball" in str(result).lower()
+        assert len(ticks) > 10, "The event loop must keep running during the requests"
+    finally:
+        tools.BASE_URL = original_base_url
+        api.close()
+
+    print("✓ Async search fan-out passed")
+
+
+def test_async_fetcher_lifecycle():
+    """Test client reuse, the configured timeout and circuit trials that are cancelled."""
+    print("Testing async fetcher lifecycle...")
+
+    api = StandInAPI()
+    url = f"{api.base_url}/api/spells/sleep"
+    api.resources["/api/spells/sleep"] = ({"index": "sleep"}, None, None)
+    configure_client(timeout=3, retry=RetryPolicy(attempts=1),
+                     breakers=CircuitBreakers(failure_threshold=1, reset_seconds=0.1))
+    try:
+        # One fetcher keeps one client (and its connections) across waves
+        fetcher = AsyncFetcher()
+
+        async def two_waves():
+            first = await fetcher.fetch(url)
+            client = fetcher._client
+            second = await fetcher.fetch(url)
+            assert fetcher._client is client
+            assert client.timeout.read == 3, "The shared client's timeout applies"
+            await fetcher.aclose()
+            return first, second
+
+        assert all(result.status_code == 200 for result in asyncio.run(two_waves()))
+        assert len(api.connections) == 1
+
+        # A fetcher used from a new event loop closes the client of the old one
+        async def fetch_once():
+            await fetcher.fetch(url)
+            return fetcher._client
+
+        first_client = asyncio.run(fetch_once())
+        second_client = asyncio.run(fetch_once())
+        assert first_client.is_closed and second_client is not first_client
+        asyncio.run(fetcher.aclose())
+
+        # A half-open trial that is cancelled still settles the circuit
+        api.failures["/api/spells/sleep"] = 1
+        assert asyncio.run(AsyncFetcher().fetch(url)).status_code == 503
+        time.sleep(0.15)
+        api.delay = 1
+
+        async def cancelled_trial():
+            task = asyncio.ensure_future(fetcher.fetch(url))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await fetcher.aclose()
+
+        asyncio.run(cancelled_trial())
+        api.delay = 0
+        time.sleep(0.15)
+        assert asyncio.run(AsyncFetcher().fetch(url)).status_code == 200
+    finally:
+        configure_client()
+        api.close()
+
+    print("✓ Async fetcher lifecycle passed")
+
+
+def run_all_tests():
+    """Run all async fetch tests."""
+    print("=" * 60)
+    print("Running Async Fetch Tests")
+    print("=" * 60)
+
+    test_async_search_fan_out()
+    test_async_fetcher_lifecycle()
+
+    print("=" * 60)
+    print("All async fetch tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
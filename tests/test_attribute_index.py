@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the sorted attribute indexes used by the filter tools.
+"""
+
+import os
+import sys
+
+# Allow running this file directly (python tests/test_attribute_index.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core.attribute_index import SortedAttributeIndex
+import src.core.tools as tools
+from src.core.http_client import configure_client
+from src.core.resilience import RetryPolicy
+from tests.stand_ins import StandInAPI, ToolRecorder
+
+
+def test_sorted_attribute_indexes():
+    """Test bisection range queries and the filter tools reusing their sorted indexes."""
+    print("Testing sorted attribute indexes...")
+
+    index = SortedAttributeIndex([(3, {"name": "Fireball", "school": "Evocation"}),
+                                  (0, {"name": "Fire Bolt", "school": "Evocation"}),
+                                  (1, {"name": "Sleep", "school": "Enchantment"}),
+                                  (1, {"name": "Magic Missile", "school": "Evocation"})], group_by="school")
+    assert [row["name"] for row in index.range(1, 3)] == ["Magic Missile", "Sleep", "Fireball"]
+    assert [row["name"] for row in index.range(high=0)] == ["Fire Bolt"]
+    assert [row["name"] for row in index.range(1, 9, groups=["evocation"])] == ["Magic Missile", "Fireball"]
+    assert index.range(4, 9) == [] and index.groups == ["enchantment", "evocation"]
+    index.range(0, 9)[0]["name"] = "changed"
+    assert index.range(0, 0)[0]["name"] == "Fire Bolt", "Rows must be copied"
+
+    api = StandInAPI()
+    api.resources["/api/monsters"] = ({"results": [{"index": "goblin", "name": "Goblin"},
+                                                   {"index": "ogre", "name": "Ogre"},
+                                                   {"index": "rat", "name": "Rat"}]}, None, None)
+    for index_name, name, cr in [("goblin", "Goblin", 0.25), ("ogre", "Ogre", 2), ("rat", "Rat", 0)]:
+        api.resources[f"/api/monsters/{index_name}"] = (
+            {"index": index_name, "name": name, "challenge_rating": cr, "armor_class": [{"value": 12}]}, None, None)
+    api.failures["/api/monsters/ogre"] = 1
+    original_base_url = tools.BASE_URL
+    tools.BASE_URL = f"{api.base_url}/api"
+    configure_client(retry=RetryPolicy(attempts=1))
+    try:
+        app = ToolRecorder()
+        cache = APICache(ttl_hours=1, persistent=False)
+        tools.register_tools(app, cache)
+        find_monsters = app.tools["find_monsters_by_challenge_rating"]
+
+        # An item that failed to load leaves the index incomplete, so it is rebuilt next time
+        assert [m["name"] for m in find_monsters(0, 30)["items"]] == ["Rat", "Goblin"]
+        assert [m["name"] for m in find_monsters(0, 30)["items"]] == ["Rat", "Goblin", "Ogre"]
+
+        # A complete index answers range queries without reading item details
+        lookups = cache.stats.total("hits") + cache.stats.total("misses")
+        api.requests.clear()
+        result = find_monsters(0.25, 2)
+        assert [m["name"] for m in result["items"]] == ["Goblin", "Ogre"]
+        assert result["items"][1]["armor_class"] == 12
+        assert api.requests == []
+        assert cache.stats.total("hits") + cache.stats.total("misses") - lookups == 1, \
+            "Only the category list may be read"
+    finally:
+        configure_client()
+        tools.BASE_URL = original_base_url
+        api.close()
+
+    print("✓ Sorted attribute indexes passed")
+
+
+def run_all_tests():
+    """Run all attribute index tests."""
+    print("=" * 60)
+    print("Running Attribute Index Tests")
+    print("=" * 60)
+
+    test_sorted_attribute_indexes()
+
+    print("=" * 60)
+    print("All attribute index tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
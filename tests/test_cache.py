@@ -10,8 +10,21 @@ import sys
 import json
 import tempfile
 import shutil
+import subprocess
+import textwrap
+import threading
+import time
+from datetime import datetime, timedelta
 
+# Allow running this file directly (python tests/test_cache.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.api_helpers import validate_dnd_entity, fetch_dnd_entity, fetch_dnd_category
 from src.core.cache import APICache
+from src.core.cache_keys import normalize_index, category_items_key, item_key
+from src.core.cache_policy import CachePolicy
+from src.core.cache_storage import JournalStore
+from src.core.supabase_client import SupabaseClient
 
 
 def test_basic_cache_operations():
@@ -35,6 +48,7 @@ def test_basic_cache_operations():
     print("Basic cache operations test passed!")
 
 
+
 def test_clear_prefix_memory():
     """Test clear_prefix with in-memory cache only."""
     print("Testing clear_prefix (memory only)...")
@@ -64,6 +78,7 @@ def test_clear_prefix_memory():
     print("clear_prefix (memory only) test passed!")
 
 
+
 def test_clear_prefix_no_matches():
     """Test clear_prefix when no keys match."""
     print("Testing clear_prefix with no matches...")
@@ -80,6 +95,7 @@ def test_clear_prefix_no_matches():
     print("clear_prefix (no matches) test passed!")
 
 
+
 def test_clear_prefix_persistent():
     """Test clear_prefix with persistent cache."""
     print("Testing clear_prefix (persistent)...")
@@ -130,6 +146,7 @@ def test_clear_prefix_persistent():
         shutil.rmtree(temp_dir)
 
 
+
 def test_cache_persistence_reload():
     """Test that cache survives reload after clear_prefix."""
     print("Testing cache persistence after clear_prefix...")
@@ -159,6 +176,679 @@ def test_cache_persistence_reload():
         shutil.rmtree(temp_dir)
 
 
+
+def test_journal_backend_reload():
+    """Test that the journal backend persists, overwrites and clears entries."""
+    print("Testing journal backend reload...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        cache1 = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        cache1.set("dnd_item_spells_fireball", {"name": "Fireball", "level": 3})
+        cache1.set("dnd_item_spells_fireball", {"name": "Fireball", "level": 3, "school": "Evocation"})
+        cache1.set("campaign_v_characters_abc123", {"name": "Nico"})
+        cache1.set("campaign_v_inventory_abc123", {"item": "Sword"})
+
+        assert cache1.clear_prefix("campaign_v_characters_") == 1
+        cache1.close()
+
+        # Only the journal and its index are written, never per-key files
+        assert not os.path.exists(os.path.join(temp_dir, "index.json"))
+        assert os.path.exists(os.path.join(temp_dir, JournalStore.JOURNAL_FILE))
+
+        cache2 = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        assert cache2.get("dnd_item_spells_fireball")["school"] == "Evocation"
+        assert cache2.get("campaign_v_characters_abc123") is None, "Cleared item should not reload"
+        assert cache2.get("campaign_v_inventory_abc123")["item"] == "Sword"
+        assert len(cache2) == 2
+
+        print("Journal backend reload test passed!")
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+
+def test_legacy_files_imported_into_journal():
+    """Test that a cache directory from the file-per-key backends is imported into the journal."""
+    print("Testing legacy cache import...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        legacy = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="pickle")
+        legacy.set("dnd_item_spells_fireball", {"name": "Fireball", "level": 3})
+        legacy.set("dnd_items_spells", {"count": 1})
+        legacy.close()
+        # A key the journal already holds keeps its journal value
+        journal = JournalStore(temp_dir)
+        journal.write("dnd_items_spells", {"count": 2}, datetime.now())
+        journal.close()
+
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        assert cache.get("dnd_item_spells_fireball") == {"name": "Fireball", "level": 3}
+        assert cache.get("dnd_items_spells") == {"count": 2}
+        cache.close()
+        assert sorted(os.listdir(temp_dir)) == sorted([JournalStore.INDEX_FILE, JournalStore.JOURNAL_FILE])
+
+        # The import runs once; later starts read the journal only
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        assert cache.get("dnd_item_spells_fireball")["level"] == 3
+        cache.close()
+
+        print("Legacy cache import test passed!")
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+
+def test_journal_compaction_and_torn_write():
+    """Test journal compaction and recovery from a partially written record."""
+    print("Testing journal compaction and torn write recovery...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        store = JournalStore(temp_dir, compact_min_bytes=1, compact_ratio=0.5)
+        for i in range(20):
+            store.write("dnd_items_spells", {"version": i}, datetime.now())
+
+        journal_path = os.path.join(temp_dir, JournalStore.JOURNAL_FILE)
+        assert os.path.getsize(journal_path) < 20 * 40, "Overwritten records should be compacted away"
+        assert store.read("dnd_items_spells") == {"version": 19}
+        store.close()
+
+        # Simulate a crash halfway through appending a record
+        with open(journal_path, "ab") as f:
+            f.write(b"\x01\x00\x05garbage")
+
+        reopened = JournalStore(temp_dir)
+        assert reopened.read("dnd_items_spells") == {"version": 19}
+        reopened.write("dnd_items_monsters", {"count": 334}, datetime.now())
+        reopened.close()
+
+        again = JournalStore(temp_dir)
+        assert set(again.load_index()) == {"dnd_items_spells", "dnd_items_monsters"}
+        again.close()
+
+        print("Journal compaction and torn write test passed!")
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+
+def test_lru_eviction_by_entries():
+    """Test that the least recently used entry is evicted at the entry limit."""
+    print("Testing LRU eviction by entry count...")
+
+    cache = APICache(ttl_hours=1, persistent=False, max_entries=2)
+    cache.set("dnd_item_spells_fireball", {"name": "Fireball"})
+    cache.set("dnd_item_spells_shield", {"name": "Shield"})
+
+    # Touch fireball so shield becomes least recently used
+    assert cache.get("dnd_item_spells_fireball") is not None
+    cache.set("dnd_item_spells_bless", {"name": "Bless"})
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get("dnd_item_spells_shield") is None, "LRU entry should be evicted"
+    assert cache.get("dnd_item_spells_fireball") is not None
+    assert cache.get("dnd_item_spells_bless") is not None
+
+    print("LRU eviction by entry count test passed!")
+
+
+
+def test_lru_eviction_by_bytes():
+    """Test that the byte bound evicts entries and tracks memory use."""
+    print("Testing LRU eviction by byte size...")
+
+    cache = APICache(ttl_hours=1, persistent=False, max_bytes=20_000)
+    for i in range(20):
+        cache.set(f"campaign_v_inventory_{i}", {"desc": ["x" * 1000]})
+
+    assert cache.current_bytes <= 20_000, "Cache should stay within its byte bound"
+    assert cache.evictions > 0
+    assert cache.get("campaign_v_inventory_19") is not None, "Newest entry should remain"
+    assert cache.get("campaign_v_inventory_0") is None, "Oldest entry should be evicted"
+
+    cache.clear()
+    assert cache.current_bytes == 0
+
+    print("LRU eviction by byte size test passed!")
+
+
+
+def test_purge_expired():
+    """Test that expired entries are removed from memory."""
+    print("Testing purge of expired entries...")
+
+    cache = APICache(ttl_hours=0, persistent=False)
+    cache.set("campaign_v_characters_abc123", {"name": "Nico"})
+
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0
+
+    print("Purge expired test passed!")
+
+
+
+def test_lazy_loading():
+    """Test that lazy mode reads values from disk on first access."""
+    print("Testing lazy loading...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        cache1 = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        cache1.set("dnd_items_spells", {"count": 319})
+        cache1.set("dnd_item_spells_fireball", {"name": "Fireball"})
+        cache1.close()
+
+        cache2 = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir,
+                          backend="journal", lazy=True)
+        assert len(cache2) == 0, "Lazy cache should not load values at startup"
+
+        assert cache2.get("dnd_item_spells_fireball")["name"] == "Fireball"
+        assert len(cache2) == 1, "Value should be loaded on first get"
+
+        cache2.warm_up(prefixes=("dnd_items_",), background=False)
+        assert len(cache2) == 2
+        assert cache2.get("dnd_items_spells")["count"] == 319
+
+        # Evicted entries are read back from disk
+        cache3 = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir,
+                          backend="journal", max_entries=1)
+        assert len(cache3) == 1
+        assert cache3.get("dnd_items_spells")["count"] == 319
+        assert cache3.get("dnd_item_spells_fireball")["name"] == "Fireball"
+
+        print("Lazy loading test passed!")
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+
+def test_stale_while_revalidate():
+    """Test that stale entries are served while a background refresh runs."""
+    print("Testing stale-while-revalidate...")
+
+    # A zero TTL makes every entry stale immediately
+    cache = APICache(ttl_hours=0, persistent=False, max_stale_hours=1)
+    cache.set("dnd_items_spells", {"count": 318})
+    assert cache.get("dnd_items_spells") is None, "Plain get should not return stale data"
+
+    refreshed = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        refreshed.set()
+        return {"count": 319}
+
+    assert cache.get_or_refresh("dnd_items_spells", loader) == {"count": 318}
+    # A second stale read must not start another refresh
+    assert cache.get_or_refresh("dnd_items_spells", loader) == {"count": 318}
+    release.set()
+    assert refreshed.wait(5)
+
+    deadline = time.time() + 5
+    while cache.cache["dnd_items_spells"][0] != {"count": 319} and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.cache["dnd_items_spells"][0] == {"count": 319}
+    assert len(calls) == 1, "Only one refresh should run per key"
+
+    # Past the staleness bound nothing is served
+    strict = APICache(ttl_hours=0, persistent=False, max_stale_hours=0)
+    strict.set("dnd_items_spells", {"count": 318})
+    assert strict.get_or_refresh("dnd_items_spells", loader) is None
+
+    print("Stale-while-revalidate test passed!")
+
+
+
+def test_bounded_background_refresh():
+    """Test that many stale keys are refreshed by a bounded set of worker threads."""
+    print("Testing bounded background refresh...")
+
+    cache = APICache(ttl_hours=0, persistent=False, max_stale_hours=1)
+    keys = [f"dnd_item_spells_{i}" for i in range(500)]
+    for key in keys:
+        cache.set(key, {"version": 1})
+
+    release = threading.Event()
+    running = []
+    lock = threading.Lock()
+    peak = [0]
+
+    def loader():
+        with lock:
+            running.append(1)
+            peak[0] = max(peak[0], len(running))
+        release.wait(5)
+        with lock:
+            running.pop()
+        return {"version": 2}
+
+    threads_before = threading.active_count()
+    for key in keys:
+        assert cache.get_or_refresh(key, loader) == {"version": 1}
+    assert threading.active_count() - threads_before <= APICache.REFRESH_WORKERS
+    # Queued keys are still in flight, so they are not queued twice
+    assert not cache.refresh_in_background(keys[-1], loader)
+    release.set()
+
+    deadline = time.time() + 10
+    while any(cache.cache[key][0] != {"version": 2} for key in keys) and time.time() < deadline:
+        time.sleep(0.01)
+    assert all(cache.cache[key][0] == {"version": 2} for key in keys)
+    assert peak[0] <= APICache.REFRESH_WORKERS
+
+    # Closing the cache drops queued refreshes and refuses new ones
+    cache.close()
+    assert not cache.refresh_in_background(keys[0], loader)
+
+    print("Bounded background refresh test passed!")
+
+
+
+def test_negative_cache():
+    """Test that not-found results are remembered for the negative TTL."""
+    print("Testing negative cache...")
+
+    cache = APICache(ttl_hours=1, persistent=False, negative_ttl_seconds=60)
+    assert cache.get_negative("dnd_item_spells_fierball") is None
+
+    cache.set_negative("dnd_item_spells_fierball")
+    assert cache.get_negative("dnd_item_spells_fierball") == "not found"
+    assert cache.get("dnd_item_spells_fierball") is None, "Negative entries are not values"
+
+    # Helpers answer from the negative cache without touching the network
+    assert validate_dnd_entity("spells", "Fierball", cache=cache) is False
+    assert fetch_dnd_entity("spells", "fierball", cache=cache) == {}
+
+    stats = cache.negative_stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 3
+    assert stats["stores"] == 1
+
+    # A later positive result replaces the negative entry
+    cache.set("dnd_item_spells_fierball", {"name": "Fierball"})
+    assert cache.get_negative("dnd_item_spells_fierball") is None
+
+    expired = APICache(ttl_hours=1, persistent=False, negative_ttl_seconds=0)
+    expired.set_negative("dnd_item_monsters_dragn")
+    assert expired.get_negative("dnd_item_monsters_dragn") is None
+
+    print("Negative cache test passed!")
+
+
+
+def test_single_flight_get_or_fetch():
+    """Test that concurrent misses on one key share a single loader call."""
+    print("Testing single-flight get_or_fetch...")
+
+    cache = APICache(ttl_hours=1, persistent=False)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"name": "Adult Red Dragon"}
+
+    results = []
+    threads = [threading.Thread(
+        target=lambda: results.append(cache.get_or_fetch("dnd_item_monsters_adult-red-dragon", loader)))
+        for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1, "Only one loader should run per key"
+    assert results == [{"name": "Adult Red Dragon"}] * 10
+    assert cache.get("dnd_item_monsters_adult-red-dragon") is not None
+
+    # Rejected values are returned but not cached
+    error = {"error": "Item not found"}
+    assert cache.get_or_fetch("dnd_item_monsters_dragn", lambda: error,
+                              cacheable=lambda data: "error" not in data) == error
+    assert cache.get("dnd_item_monsters_dragn") is None
+
+    # Loader errors reach the caller
+    def failing_loader():
+        raise ConnectionError("API unavailable")
+
+    try:
+        cache.get_or_fetch("dnd_items_spells", failing_loader)
+        assert False, "Loader error should propagate"
+    except ConnectionError:
+        pass
+
+    print("Single-flight get_or_fetch test passed!")
+
+
+
+def test_concurrent_stress():
+    """Hammer persistent caches from many threads and check they stay consistent."""
+    print("Testing concurrent access...")
+
+    for backend in ("pickle", "journal"):
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend=backend,
+                             max_entries=50, max_bytes=200_000)
+            errors = []
+
+            def worker(worker_id):
+                try:
+                    for i in range(150):
+                        key = f"dnd_item_spells_{(worker_id * 7 + i) % 80}"
+                        op = i % 5
+                        if op == 0:
+                            cache.set(key, {"key": key, "desc": ["x" * 200]})
+                        elif op == 1:
+                            value = cache.get(key)
+                            assert value is None or value["key"] == key
+                        elif op == 2:
+                            value = cache.get_or_fetch(key, lambda: {"key": key, "desc": []})
+                            assert value["key"] == key
+                        elif op == 3:
+                            cache.set_negative(f"dnd_item_monsters_{i}")
+                            cache.get_negative(f"dnd_item_monsters_{i}")
+                        elif i % 50 == 4:
+                            cache.clear_prefix(f"dnd_item_spells_{worker_id}")
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+
+            assert not errors, f"{backend}: worker errors: {errors[:3]}"
+            assert len(cache) <= 50
+            assert cache.current_bytes == sum(cache._sizes.values())
+            assert set(cache._sizes) == set(cache.cache)
+            cache.close()
+
+            # The persisted state must reload cleanly and hold well-formed values
+            reloaded = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend=backend)
+            for key, (value, _) in reloaded.cache.items():
+                assert value["key"] == key
+            if backend == "pickle":
+                with open(os.path.join(temp_dir, "index.json"), "r") as f:
+                    json.load(f)
+            reloaded.close()
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+    print("Concurrent access test passed!")
+
+
+
+def test_cache_stats():
+    """Test hit/miss counters, latencies and per-namespace breakdowns."""
+    print("Testing cache statistics...")
+
+    cache = APICache(ttl_hours=1, persistent=False)
+    cache.set("dnd_items_spells", {"count": 1})
+    cache.set("campaign_campaigns_abc123", [{"id": 1}])
+
+    assert cache.get("dnd_items_spells") == {"count": 1}
+    assert cache.get("dnd_items_monsters") is None
+    assert cache.get("campaign_campaigns_abc123") == [{"id": 1}]
+    assert cache.get_or_fetch("dnd_item_spells_fireball", lambda: {"name": "Fireball"}) == {"name": "Fireball"}
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] > 0
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["sets"] == 3
+    assert stats["loads"] == 1
+    assert stats["latency"]["load"]["count"] == 1
+    assert stats["hit_rate"] == 0.5
+
+    items = stats["namespaces"]["dnd_items_"]
+    assert items["hits"] == 1 and items["misses"] == 1
+    assert items["entries"] == 1
+    assert stats["namespaces"]["dnd_item_"]["loads"] == 1
+    assert stats["namespaces"]["campaign_"]["hit_rate"] == 1.0
+
+    # Expired entries are counted separately from plain misses
+    expired = APICache(ttl_hours=0, persistent=False)
+    expired.set("dnd_items_rules", {"count": 0})
+    assert expired.get("dnd_items_rules") is None
+    expired_stats = expired.get_stats()
+    assert expired_stats["expirations"] == 1
+    assert expired_stats["misses"] == 1
+
+    # A stale fallback read after the entry has aged out is not a second expiration
+    aging = APICache(ttl_hours=1, max_stale_hours=1, persistent=False)
+    aging.set("dnd_items_rules", {"count": 0})
+    aging.cache["dnd_items_rules"] = ({"count": 0}, datetime.now() - timedelta(minutes=90))
+    assert aging.get("dnd_items_rules") is None
+    aging.cache["dnd_items_rules"] = ({"count": 0}, datetime.now() - timedelta(hours=3))
+    assert aging.get_retained("dnd_items_rules") is None
+    assert aging.get_stats()["expirations"] == 1
+
+    print("Cache statistics test passed!")
+
+
+
+def test_clear_prefixes_batched():
+    """Test batched prefix invalidation through the key index."""
+    print("Testing batched clear_prefixes...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, lazy=True)
+        cache.set("campaign_characters_abc123", [{"name": "Nico"}])
+        cache.set("campaign_character_spells_abc123", [{"spell": "Shield"}])
+        cache.set("campaign_v_characters_abc123", [{"name": "Nico"}])
+        cache.set("campaign_v_inventory_abc123", [{"item": "Sword"}])
+        cache.set("dnd_items_spells", {"count": 1})
+        cache.set_negative("campaign_character_feats_def456")
+
+        # Entries only on disk are found through the index as well
+        reloaded = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, lazy=True)
+        assert len(reloaded) == 0
+
+        client = SupabaseClient("https://example.supabase.co/rest/v1", "key", reloaded)
+        deletes = []
+        original_delete = reloaded.store.delete
+        reloaded.store.delete = lambda keys: (deletes.append(list(keys)), original_delete(keys))
+
+        # A characters write invalidates the table and five related views in one batch
+        client.invalidate_related_caches("characters")
+        assert len(deletes) == 1, "Invalidation should update persistence once"
+        assert sorted(deletes[0]) == [
+            "campaign_character_spells_abc123",
+            "campaign_characters_abc123",
+            "campaign_v_characters_abc123",
+        ]
+        assert reloaded.get("campaign_v_inventory_abc123") == [{"item": "Sword"}]
+        assert reloaded.get("dnd_items_spells") == {"count": 1}
+
+        # Negative entries are cleared by prefix too
+        assert cache.clear_prefixes(["campaign_character_feats_", "campaign_missing_"]) == 0
+        assert cache.get_negative("campaign_character_feats_def456") is None
+
+        with open(os.path.join(temp_dir, "index.json"), "r") as f:
+            index = json.load(f)
+        assert sorted(index) == ["campaign_v_inventory_abc123", "dnd_items_spells"]
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("Batched clear_prefixes test passed!")
+
+
+
+def test_namespace_policies():
+    """Test per-prefix TTL, negative TTL and persistence policies."""
+    print("Testing namespace policies...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        # Simulate campaign rows persisted before campaign data opted out
+        old = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir)
+        old.set("campaign_characters_old", [{"name": "Nico"}])
+
+        policies = {
+            "dnd_": CachePolicy(ttl=timedelta(hours=24), max_stale=timedelta(days=365)),
+            "campaign_": CachePolicy(ttl=timedelta(seconds=0), negative_ttl=timedelta(seconds=0),
+                                     persistent=False),
+            "campaign_characters_": CachePolicy(ttl=timedelta(minutes=1), persistent=False),
+        }
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, policies=policies)
+
+        # Opted-out namespaces are removed from disk at startup
+        with open(os.path.join(temp_dir, "index.json"), "r") as f:
+            assert "campaign_characters_old" not in json.load(f)
+        assert cache.get("campaign_characters_old") is None
+
+        cache.set("dnd_item_spells_fireball", {"name": "Fireball"})
+        cache.set("campaign_characters_abc123", [{"name": "Nico"}])
+        cache.set("campaign_v_inventory_abc123", [{"item": "Sword"}])
+
+        # The longest matching prefix wins
+        assert cache.policy_for("campaign_characters_abc123") is policies["campaign_characters_"]
+        assert cache.policy_for("campaign_v_inventory_abc123") is policies["campaign_"]
+        assert cache.policy_for("other_key") is cache.default_policy
+
+        assert cache.get("dnd_item_spells_fireball") == {"name": "Fireball"}
+        assert cache.get("campaign_characters_abc123") == [{"name": "Nico"}]
+        assert cache.get("campaign_v_inventory_abc123") is None, "Zero TTL should expire at once"
+
+        cache.set_negative("campaign_v_inventory_missing")
+        assert cache.get_negative("campaign_v_inventory_missing") is None
+        cache.set_negative("dnd_item_spells_fierball")
+        assert cache.get_negative("dnd_item_spells_fierball") == "not found"
+
+        # Only the SRD entry reaches disk
+        with open(os.path.join(temp_dir, "index.json"), "r") as f:
+            assert sorted(json.load(f)) == ["dnd_item_spells_fireball"]
+
+        stats = cache.get_stats()
+        assert stats["policies"]["campaign_"]["persistent"] is False
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("Namespace policies test passed!")
+
+
+
+def _run_cache_process(cache_dir: str, script: str) -> subprocess.Popen:
+    """Start a separate Python process using a shared cache in ``cache_dir``."""
+    code = textwrap.dedent("""
+        import sys
+        from src.core.cache import APICache
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=sys.argv[1], backend="journal",
+                         shared=True, sync_interval_seconds=0)
+    """) + textwrap.dedent(script) + "\ncache.close()\n"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen([sys.executable, "-c", code, cache_dir], cwd=root)
+
+
+
+def test_shared_cache_across_processes():
+    """Test that processes sharing a journal see each other's writes and invalidations."""
+    print("Testing shared cache across processes...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal",
+                         shared=True, sync_interval_seconds=0)
+        cache.set("dnd_item_spells_fireball", {"name": "Fireball"})
+        cache.set("dnd_item_spells_shield", {"name": "Shield"})
+        assert cache.get("dnd_item_spells_shield") == {"name": "Shield"}
+
+        # Another process overwrites one key, deletes another and compacts the journal
+        other = _run_cache_process(temp_dir, """
+            assert cache.get("dnd_item_spells_fireball") == {"name": "Fireball"}
+            cache.set("dnd_item_spells_fireball", {"name": "Fireball", "level": 3})
+            cache.clear_prefix("dnd_item_spells_shield")
+            cache.set("dnd_items_monsters", {"count": 334})
+            cache.store.compact()
+        """)
+        assert other.wait(timeout=60) == 0
+
+        assert cache.get("dnd_item_spells_fireball") == {"name": "Fireball", "level": 3}
+        assert cache.get("dnd_item_spells_shield") is None
+        assert cache.get("dnd_items_monsters") == {"count": 334}
+        assert cache.get_stats()["remote_changes"] >= 3
+
+        # Concurrent writers do not lose or corrupt each other's records
+        writers = [_run_cache_process(temp_dir, f"""
+            for i in range(50):
+                cache.set(f"dnd_item_monsters_w{n}_{{i}}", {{"writer": {n}, "i": i}})
+        """) for n in range(4)]
+        for writer in writers:
+            assert writer.wait(timeout=60) == 0
+
+        assert len(cache.keys(["dnd_item_monsters_w"])) == 200
+        assert cache.get("dnd_item_monsters_w3_49") == {"writer": 3, "i": 49}
+        cache.close()
+
+        reloaded = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal")
+        assert len(reloaded.keys(["dnd_item_monsters_w"])) == 200
+        assert reloaded.get("dnd_item_monsters_w0_0") == {"writer": 0, "i": 0}
+        reloaded.close()
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("Shared cache test passed!")
+
+
+
+def test_canonical_cache_keys():
+    """Test that every spelling of an entity maps to one cache key."""
+    print("Testing canonical cache keys...")
+
+    assert normalize_index("Tasha's Hideous Laughter") == "tashas-hideous-laughter"
+    assert normalize_index("  Tasha’s  Hideous_Laughter ") == "tashas-hideous-laughter"
+    assert normalize_index("Bag of Holding") == "bag-of-holding"
+    assert normalize_index("fireball") == "fireball"
+
+    assert item_key("Spells", "Tasha's Hideous Laughter") == "dnd_item_spells_tashas-hideous-laughter"
+    assert item_key("magic items", "bag-of-holding") == "dnd_item_magic-items_bag-of-holding"
+    assert category_items_key("Magic_Items") == "dnd_items_magic-items"
+
+    # The helpers answer from the entries cached by tools and resources
+    cache = APICache(ttl_hours=1, persistent=False)
+    cache.set(item_key("spells", "tashas-hideous-laughter"), {"name": "Tasha's Hideous Laughter"})
+    cache.set(category_items_key("monsters"), {"category": "monsters", "items": [], "count": 0})
+
+    assert validate_dnd_entity("spells", "Tasha's Hideous Laughter", cache=cache) is True
+    assert fetch_dnd_entity("Spells", "TASHA'S HIDEOUS LAUGHTER", cache=cache)["name"] == "Tasha's Hideous Laughter"
+    assert fetch_dnd_category("Monsters", cache=cache)["category"] == "monsters"
+    assert cache.stats.total("loads") == 0, "Cached entities must not be fetched again"
+    assert len(cache.keys()) == 2
+    print("✓ Canonical cache keys passed")
+
+
 def run_all_tests():
     """Run all cache tests."""
     print("=" * 60)
@@ -170,6 +860,23 @@ def run_all_tests():
     test_clear_prefix_no_matches()
     test_clear_prefix_persistent()
     test_cache_persistence_reload()
+    test_journal_backend_reload()
+    test_legacy_files_imported_into_journal()
+    test_journal_compaction_and_torn_write()
+    test_lru_eviction_by_entries()
+    test_lru_eviction_by_bytes()
+    test_purge_expired()
+    test_lazy_loading()
+    test_stale_while_revalidate()
+    test_bounded_background_refresh()
+    test_negative_cache()
+    test_single_flight_get_or_fetch()
+    test_concurrent_stress()
+    test_cache_stats()
+    test_clear_prefixes_batched()
+    test_namespace_policies()
+    test_shared_cache_across_processes()
+    test_canonical_cache_keys()
 
     print("=" * 60)
     print("All cache tests passed!")
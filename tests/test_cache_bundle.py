@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for SRD cache bundles.
+
+This script tests exporting a warmed cache to a bundle and importing it.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Allow running this file directly (python tests/test_cache_bundle.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache, open_server_cache
+from src.core.cache_bundle import (export_bundle, import_bundle, read_bundle_header,
+                                   main as bundle_main)
+
+
+def test_cache_bundle_round_trip():
+    """Test exporting SRD entries to a bundle and preloading a fresh cache from it."""
+    print("Testing cache bundle export/import...")
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        warm_dir = os.path.join(temp_dir, "warm")
+        warm = APICache(ttl_hours=1, persistent=True, cache_dir=warm_dir, backend="journal")
+        warm.set("dnd_categories", {"spells": "/api/spells"})
+        warm.set("dnd_item_spells_fireball", {"name": "Fireball", "level": 3})
+        warm.set("campaign_characters_abc123", [{"name": "Nico"}])
+        warm.close()
+
+        # Export from a lazily loaded cache so values come straight from disk
+        source = APICache(ttl_hours=1, persistent=True, cache_dir=warm_dir, backend="journal", lazy=True)
+        bundle_path = os.path.join(temp_dir, "srd.bundle")
+        assert export_bundle(source, bundle_path) == 2, "Only SRD entries are exported"
+        assert len(source) == 0, "Export should not load entries into memory"
+        header = read_bundle_header(bundle_path)
+        assert header["version"] == 1 and header["count"] == 2
+
+        fresh_dir = os.path.join(temp_dir, "fresh")
+        fresh = APICache(ttl_hours=1, persistent=True, cache_dir=fresh_dir, backend="journal")
+        fresh.set("dnd_item_spells_fireball", {"name": "Fireball (local)"})
+        assert import_bundle(fresh, bundle_path) == 1, "Existing entries are kept"
+        assert fresh.get("dnd_categories") == {"spells": "/api/spells"}
+        assert fresh.get("dnd_item_spells_fireball") == {"name": "Fireball (local)"}
+        fresh.close()
+
+        # The command-line import persists entries for the next start
+        cli_dir = os.path.join(temp_dir, "cli")
+        assert bundle_main(["--cache-dir", cli_dir, "import", bundle_path]) == 0
+        reloaded = APICache(ttl_hours=1, persistent=True, cache_dir=cli_dir, backend="journal")
+        assert reloaded.get("dnd_item_spells_fireball") == {"name": "Fireball", "level": 3}
+        reloaded.close()
+
+        # The command-line export keeps SRD entries the server would still serve stale
+        aged_dir = os.path.join(temp_dir, "aged")
+        aged = open_server_cache(aged_dir)
+        aged.set("dnd_item_spells_sleep", {"name": "Sleep"}, timestamp=datetime.now() - timedelta(days=30))
+        aged.close()
+        aged_bundle = os.path.join(temp_dir, "aged.bundle")
+        assert bundle_main(["--cache-dir", aged_dir, "export", aged_bundle]) == 0
+        assert read_bundle_header(aged_bundle)["count"] == 1
+
+        # Files that are not bundles are rejected
+        not_bundle = os.path.join(temp_dir, "not.bundle")
+        with open(not_bundle, "wb") as f:
+            f.write(b"not a bundle")
+        assert bundle_main(["info", not_bundle]) == 1
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("Cache bundle test passed!")
+
+
+def run_all_tests():
+    """Run all cache bundle tests."""
+    print("=" * 60)
+    print("Running Cache Bundle Tests")
+    print("=" * 60)
+
+    test_cache_bundle_round_trip()
+
+    print("=" * 60)
+    print("All cache bundle tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the cache value serializer.
+
+This script tests the versioned serialization format and the migration of
+legacy pickled cache values.
+"""
+
+import os
+import sys
+import json
+import pickle
+import tempfile
+import shutil
+from datetime import datetime
+
+# Allow running this file directly (python tests/test_cache_serialization.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core.cache_serialization import Serializer, legacy_loads
+from src.core.cache_storage import FileStore, JournalStore
+
+
+class _LegacyPickleSerializer:
+    """Writes values the way the journal did before serializers existed."""
+
+    dumps = staticmethod(pickle.dumps)
+    loads = staticmethod(pickle.loads)
+
+
+
+def test_serialization_and_migration():
+    """Test the versioned serializer and migration of legacy pickled values."""
+    print("Testing serialization and legacy migration...")
+
+    monster = {"index": "adult-red-dragon", "name": "Adult Red Dragon",
+               "actions": [{"name": f"Bite {i}", "desc": "Melee Weapon Attack: +14 to hit."}
+                           for i in range(50)]}
+
+    serializer = Serializer()
+    data = serializer.dumps(monster)
+    assert data.startswith(b"DNDC")
+    assert serializer.is_current(data)
+    assert len(data) < len(json.dumps(monster)) / 4, "Repetitive payloads should compress"
+    assert serializer.loads(data) == monster
+
+    # Small values skip compression; non-JSON values fall back to pickle only when allowed
+    assert serializer.loads(serializer.dumps({"count": 1})) == {"count": 1}
+    try:
+        serializer.dumps({"when": datetime(2024, 1, 1)})
+        assert False, "Pickle should not be used by default"
+    except TypeError:
+        pass
+    pickling = Serializer(allow_pickle=True)
+    assert pickling.loads(pickling.dumps({"when": datetime(2024, 1, 1)})) == {"when": datetime(2024, 1, 1)}
+
+    # Legacy pickles are refused by default and only read for migration
+    legacy = pickle.dumps(monster)
+    assert not serializer.is_current(legacy)
+    try:
+        serializer.loads(legacy)
+        assert False, "Pickle should be refused"
+    except ValueError:
+        pass
+    assert legacy_loads(legacy) == monster
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # A pickle-backed cache directory is readable by the file backend
+        old = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="pickle")
+        old.set("dnd_item_monsters_adult-red-dragon", monster)
+
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="file")
+        assert cache.get("dnd_item_monsters_adult-red-dragon") == monster
+        cache.set("dnd_item_monsters_adult-red-dragon", monster)
+        store = FileStore(temp_dir)
+        assert os.path.exists(store.path_for("dnd_item_monsters_adult-red-dragon"))
+        assert not os.path.exists(store.legacy_path_for("dnd_item_monsters_adult-red-dragon"))
+
+        # A journal from an older version (no format marker in its index) has its
+        # pickled records rewritten in the current format when opened
+        journal_dir = os.path.join(temp_dir, "journal")
+        os.makedirs(journal_dir)
+        journal = JournalStore(journal_dir)
+        journal.serializer = _LegacyPickleSerializer()
+        journal.write("dnd_item_monsters_adult-red-dragon", monster, datetime.now())
+        journal.close()
+        os.unlink(journal.index_path)
+        size_before = os.path.getsize(journal.journal_path)
+
+        journal = JournalStore(journal_dir)
+        assert os.path.getsize(journal.journal_path) < size_before
+        assert journal.read("dnd_item_monsters_adult-red-dragon") == monster
+        journal.close()
+
+        # Later opens read the journal as is
+        journal = JournalStore(journal_dir)
+        assert journal.read("dnd_item_monsters_adult-red-dragon") == monster
+        journal.close()
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("Serialization and migration test passed!")
+
+
+def run_all_tests():
+    """Run all cache serialization tests."""
+    print("=" * 60)
+    print("Running Cache Serialization Tests")
+    print("=" * 60)
+
+    test_serialization_and_migration()
+
+    print("=" * 60)
+    print("All cache serialization tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
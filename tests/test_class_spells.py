@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the class spell lists.
+"""
+
+import os
+import sys
+
+# Allow running this file directly (python tests/test_class_spells.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core.cache_keys import category_items_key, item_key
+from src.core.class_spells import ClassSpellLists
+import src.core.tools as tools
+from src.core import prompts
+from src.core.srd_store import SRDStore
+from tests.stand_ins import ToolRecorder, PromptRecorder
+
+
+def test_class_spell_index():
+    """Test class spell lists kept in the SRD store and used by the spell prompt and campaign tools."""
+    print("Testing class spell index...")
+
+    def spell(index, name, level, school, *classes):
+        return {"index": index, "name": name, "level": level, "school": {"name": school},
+                "classes": [{"index": c.lower(), "name": c} for c in classes]}
+
+    store = SRDStore()
+    store.upsert_many("spells", [spell("fire-bolt", "Fire Bolt", 0, "Evocation", "Wizard", "Sorcerer"),
+                                 spell("fireball", "Fireball", 3, "Evocation", "Wizard", "Sorcerer"),
+                                 spell("sleep", "Sleep", 1, "Enchantment", "Wizard", "Bard"),
+                                 spell("cure-wounds", "Cure Wounds", 1, "Evocation", "Bard", "Cleric")])
+    store.mark_loaded("spells", 4)
+    assert [e["spell"] for e in store.class_spells("Bard")] == ["cure-wounds", "sleep"]
+
+    class_spells = ClassSpellLists(store)
+    index = class_spells.current()
+    assert index.classes() == ["bard", "cleric", "sorcerer", "wizard"]
+    assert [s["name"] for s in index.spells("Wizard", 0, 1)] == ["Fire Bolt", "Sleep"]
+    assert index.has_spell("wizard", "Fireball") and not index.has_spell("Bard", "Fireball")
+    assert index.spell_level("fire bolt") == 0 and index.classes_for("Sleep") == ["bard", "wizard"]
+    assert class_spells.current() is index, "An unchanged store must not rebuild the index"
+
+    # Re-ingesting a spell replaces its class list entries
+    store.upsert_many("spells", [spell("sleep", "Sleep", 1, "Enchantment", "Wizard")])
+    store.mark_loaded("spells", 4)
+    assert [e["spell"] for e in store.class_spells("Bard")] == ["cure-wounds"]
+    assert not class_spells.current().has_spell("Bard", "Sleep")
+
+    # The spell prompt suggests spells from the index
+    cache = APICache(ttl_hours=1, persistent=False)
+    cache.set(item_key("classes", "wizard"), {"index": "wizard", "name": "Wizard"})
+    app = PromptRecorder()
+    prompts.register_prompts(app, cache, class_spells=class_spells)
+    text = app.prompts["spell_selection"]("Wizard", "3")
+    assert "up to level 2: Fire Bolt, Sleep." in text, text
+    assert "Fireball" not in text
+    assert "up to level 3: Fire Bolt, Fireball." in app.prompts["spell_selection"]("wizard", "5", "evocation")
+
+    # Campaign tools check class spells against the lists without refusing them
+    class _Campaign:
+        def get_character_by_name(self, name):
+            return {"id": 1, "name": name}
+
+        def get_character_spells(self, character_id, source_type=None):
+            return [{"spell_name": "Fireball", "spell_level": 3, "source_type": "class", "source_name": "Wizard"},
+                    {"spell_name": "Cure Wounds", "spell_level": 1, "source_type": "class", "source_name": "Wizard"},
+                    {"spell_name": "Fireball", "spell_level": 3, "source_type": "item", "source_name": "Wand"}]
+
+        def add_character_spell(self, **fields):
+            return fields
+
+    app = ToolRecorder()
+    tools.register_campaign_tools(app, _Campaign(), class_spells=class_spells)
+    listed = app.tools["get_character_spells"]("Elara")["spells"]
+    assert [s.get("on_class_spell_list") for s in listed] == [True, False, None]
+    added = app.tools["add_character_spell"]("Elara", "Fireball", 3, "class", "Wizard")
+    assert added["spell"]["spell_name"] == "Fireball" and "warnings" not in added
+    added = app.tools["add_character_spell"]("Elara", "Fireball", 2, "class", "Bard")
+    assert added["spell"]["spell_name"] == "Fireball"
+    assert added["warnings"] == ["Fireball is a level 3 spell in the SRD, not level 2",
+                                 "Fireball is not on the SRD Bard spell list"], added["warnings"]
+
+    # Without a loaded store the lists cover the spells already cached, fetching none
+    cache = APICache(ttl_hours=1, persistent=False)
+    cache.set(category_items_key("spells"), {"items": [{"index": "sleep"}, {"index": "fireball"}]})
+    cache.set(item_key("spells", "sleep"), spell("sleep", "Sleep", 1, "Enchantment", "Wizard", "Bard"))
+    partial = ClassSpellLists(SRDStore(), cache)
+    assert partial.current().has_spell("Bard", "Sleep")
+    assert not partial.current().has_spell("Wizard", "Fireball")
+    cache.set(item_key("spells", "fireball"), spell("fireball", "Fireball", 3, "Evocation", "Wizard"))
+    assert partial.current().has_spell("Wizard", "Fireball"), "Newly cached spells are picked up"
+    assert cache.stats.total("loads") == 0
+    store.close()
+
+    print("✓ Class spell index passed")
+
+
+def run_all_tests():
+    """Run all class spell tests."""
+    print("=" * 60)
+    print("Running Class Spell Tests")
+    print("=" * 60)
+
+    test_class_spell_index()
+
+    print("=" * 60)
+    print("All class spell tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
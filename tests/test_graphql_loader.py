@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the GraphQL bulk loader.
+"""
+
+import os
+import sys
+
+# Allow running this file directly (python tests/test_graphql_loader.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core import graphql_loader
+from src.core.resources import prefetch_category_items
+from tests.stand_ins import StandInAPI
+
+
+def test_graphql_bulk_load():
+    """Test caching a whole category's summaries from one GraphQL response."""
+    print("Testing GraphQL bulk load...")
+
+    api = StandInAPI()
+    queries = []
+    monsters = [{"index": f"monster-{i}", "name": f"Monster {i}", "challenge_rating": i % 5,
+                 "type": "beast", "size": "Medium"} for i in range(300)]
+
+    def graphql(query):
+        queries.append(query)
+        if "monsters(" in query:
+            return {"data": {"monsters": monsters}}
+        return {"errors": [{"message": "Cannot query field"}]}
+
+    api.graphql = graphql
+    url = f"{api.base_url}/graphql"
+    try:
+        cache = APICache(ttl_hours=1, persistent=False)
+        cache.set("dnd_item_monsters_monster-0", {"index": "monster-0", "armor_class": [{"value": 12}]})
+
+        assert graphql_loader.load_category(cache, "Monsters", url=url) == 300
+        assert len(api.requests) == 1, "A whole category must take one request"
+        assert "challenge_rating" in queries[0] and "limit:" in queries[0]
+
+        summaries = graphql_loader.cached_summaries(cache, "monsters")
+        assert summaries[7]["challenge_rating"] == 2 and summaries[7]["source"] == "D&D 5e API"
+        assert cache.get("dnd_item_monsters_monster-7") is None, "Summaries must not pose as item details"
+        assert "armor_class" in cache.get("dnd_item_monsters_monster-0"), "REST entries are kept"
+        listing = cache.get("dnd_items_monsters")
+        assert listing["count"] == 300 and listing["items"][0]["uri"] == "resource://dnd/item/monsters/monster-0"
+
+        # A warm cache is not queried again
+        assert graphql_loader.is_loaded(cache, "monsters")
+        assert graphql_loader.load_category(cache, "monsters", url=url) == 0
+        assert len(api.requests) == 1
+
+        # Errors and unsupported categories are reported to the caller
+        try:
+            graphql_loader.load_category(cache, "spells", url=url)
+            assert False, "Expected ValueError"
+        except ValueError as e:
+            assert "Cannot query field" in str(e)
+        assert not graphql_loader.supports("rules")
+    finally:
+        api.close()
+
+    print("✓ GraphQL bulk load passed")
+
+
+def test_prefetch_bulk_load():
+    """Test that prefetching a bulk-loadable category sends a single request."""
+    print("Testing prefetch through the bulk loader...")
+
+    api = StandInAPI()
+    monsters = [{"index": f"monster-{i}", "name": f"Monster {i}", "challenge_rating": i % 5}
+                for i in range(300)]
+    api.graphql = lambda query: ({"data": {"monsters": monsters}} if "monsters(" in query
+                                 else {"errors": [{"message": "Cannot query field"}]})
+    api.resources["/api/classes"] = ({"count": 2, "results": [
+        {"index": "wizard", "name": "Wizard"}, {"index": "cleric", "name": "Cleric"}]}, None, None)
+    api.resources["/api/classes/wizard"] = ({"index": "wizard", "name": "Wizard"}, None, None)
+    api.resources["/api/classes/cleric"] = ({"index": "cleric", "name": "Cleric"}, None, None)
+    api.resources["/api/spells"] = ({"count": 1, "results": [{"index": "sleep", "name": "Sleep"}]}, None, None)
+    api.resources["/api/spells/sleep"] = ({"index": "sleep", "name": "Sleep"}, None, None)
+    base_url = f"{api.base_url}/api"
+    graphql_url = f"{api.base_url}/graphql"
+    try:
+        cache = APICache(ttl_hours=1, persistent=False)
+
+        # The list and every summary come from one GraphQL query, with no REST requests
+        prefetch_category_items(cache, "monsters", base_url=base_url, graphql_url=graphql_url)
+        assert [path for path, _ in api.requests] == ["/graphql"]
+        assert cache.get("dnd_items_monsters")["count"] == 300
+        assert len(graphql_loader.cached_summaries(cache, "monsters")) == 300
+        prefetch_category_items(cache, "monsters", base_url=base_url, graphql_url=graphql_url)
+        assert len(api.requests) == 1, "A warm category is not fetched again"
+
+        # Categories without bulk loading, or whose bulk load fails, prefetch over REST
+        api.requests.clear()
+        prefetch_category_items(cache, "classes", base_url=base_url, graphql_url=graphql_url)
+        assert sorted(path for path, _ in api.requests) == ["/api/classes", "/api/classes/cleric",
+                                                           "/api/classes/wizard"]
+        api.requests.clear()
+        prefetch_category_items(cache, "spells", base_url=base_url, graphql_url=graphql_url)
+        assert [path for path, _ in api.requests] == ["/graphql", "/api/spells", "/api/spells/sleep"]
+        assert cache.get("dnd_item_spells_sleep")["name"] == "Sleep"
+    finally:
+        api.close()
+
+    print("✓ Prefetch through the bulk loader passed")
+
+
+def run_all_tests():
+    """Run all GraphQL loader tests."""
+    print("=" * 60)
+    print("Running GraphQL Loader Tests")
+    print("=" * 60)
+
+    test_graphql_bulk_load()
+    test_prefetch_bulk_load()
+
+    print("=" * 60)
+    print("All GraphQL loader tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
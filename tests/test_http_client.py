@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared HTTP client.
+
+This script tests conditional revalidation, connection pooling, retries,
+circuit breakers and rate limiting against a local stand-in API.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Allow running this file directly (python tests/test_http_client.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import api_helpers
+from src.core.cache import APICache
+from src.core.async_fetch import AsyncFetcher
+import src.core.tools as tools
+from src.core.http_client import fetch_json, configure_client, get_client
+from src.core.priority import background_priority
+from src.core.rate_limit import HostLimiter, RateLimit, RateLimiters
+from src.core.resilience import CircuitBreakers, CircuitOpenError, RetryPolicy
+from src.core.supabase_client import SupabaseClient
+from tests.stand_ins import StandInAPI, ToolRecorder
+
+
+def test_conditional_revalidation():
+    """Test ETag/Last-Modified revalidation against a stand-in API server."""
+    print("Testing conditional revalidation...")
+
+    api = StandInAPI()
+    temp_dir = tempfile.mkdtemp()
+    monsters = {"count": 2, "results": [{"index": "aboleth"}, {"index": "acolyte"}]}
+    api.resources["/api/monsters"] = (monsters, '"v1"', None)
+    api.resources["/api/spells"] = ({"count": 1}, None, "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    try:
+        cache = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal",
+                         max_stale_hours=1)
+        url = f"{api.base_url}/api/monsters"
+
+        result = fetch_json(url, cache=cache, cache_key="dnd_items_monsters")
+        assert result.status_code == 200 and not result.not_modified
+        assert cache.get_validators("dnd_items_monsters") == {"etag": '"v1"'}
+        cache.set("dnd_items_monsters", {"items": ["aboleth", "acolyte"]})
+
+        # An unchanged list returns the cached (transformed) value
+        result = fetch_json(url, cache=cache, cache_key="dnd_items_monsters")
+        assert result.not_modified and result.status_code == 304
+        assert result.data == {"items": ["aboleth", "acolyte"]}
+        assert api.requests[-1][1].get("If-None-Match") == '"v1"'
+
+        # Last-Modified is used when there is no ETag
+        spells_url = f"{api.base_url}/api/spells"
+        fetch_json(spells_url, cache=cache, cache_key="dnd_items_spells")
+        cache.set("dnd_items_spells", {"count": 1})
+        assert fetch_json(spells_url, cache=cache, cache_key="dnd_items_spells").not_modified
+
+        # A stale entry is revalidated in the background and its TTL restarts
+        cache.set("dnd_items_monsters", {"items": ["aboleth", "acolyte"]},
+                  timestamp=datetime.now() - timedelta(hours=2))
+        assert cache.get("dnd_items_monsters") is None
+
+        def load():
+            fetched = fetch_json(url, cache=cache, cache_key="dnd_items_monsters")
+            return fetched.data if fetched.not_modified else {"items": [r["index"] for r in fetched.data["results"]]}
+
+        assert cache.get_or_fetch("dnd_items_monsters", load) == {"items": ["aboleth", "acolyte"]}
+        deadline = time.time() + 5
+        while cache.get("dnd_items_monsters") is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get("dnd_items_monsters") == {"items": ["aboleth", "acolyte"]}
+        assert cache.get_stats()["revalidations"] == 3
+        cache.close()
+
+        # Validators survive a restart
+        reloaded = APICache(ttl_hours=1, persistent=True, cache_dir=temp_dir, backend="journal", lazy=True)
+        assert reloaded.get_validators("dnd_items_monsters") == {"etag": '"v1"'}
+        assert fetch_json(url, cache=reloaded, cache_key="dnd_items_monsters").not_modified
+
+        # A changed resource is downloaded again with its new validators
+        api.resources["/api/monsters"] = ({"count": 1, "results": [{"index": "aboleth"}]}, '"v2"', None)
+        result = fetch_json(url, cache=reloaded, cache_key="dnd_items_monsters")
+        assert result.status_code == 200 and result.data["count"] == 1
+        assert reloaded.get_validators("dnd_items_monsters") == {"etag": '"v2"'}
+
+        # Invalidation forgets validators along with the entry
+        reloaded.clear_prefix("dnd_items_")
+        assert reloaded.get_validators("dnd_items_monsters") is None
+        fetch_json(url, cache=reloaded, cache_key="dnd_items_monsters")
+        assert "If-None-Match" not in api.requests[-1][1]
+        reloaded.close()
+
+    finally:
+        api.close()
+        shutil.rmtree(temp_dir)
+
+    print("Conditional revalidation test passed!")
+
+
+
+def test_pooled_http_client():
+    """Test that every request shares one pooled keep-alive session."""
+    print("Testing pooled HTTP client...")
+
+    api = StandInAPI()
+    api.resources["/api/spells/fireball"] = ({"index": "fireball"}, None, None)
+    client = configure_client(timeout=5, pool_maxsize=2)
+
+    try:
+        assert get_client() is client
+        assert get_client().get_stats()["pool_maxsize"] == 2
+
+        for _ in range(10):
+            result = fetch_json(f"{api.base_url}/api/spells/fireball")
+            assert result.data == {"index": "fireball"}
+        assert fetch_json(f"{api.base_url}/api/spells/fierball").status_code == 404
+        assert len(api.requests) == 11
+        assert len(api.connections) == 1, "Sequential requests must reuse one connection"
+
+        supabase = SupabaseClient("https://example.supabase.co/rest/v1", "key",
+                                  cache=APICache(persistent=False))
+        assert supabase.http is client
+    finally:
+        configure_client()
+        api.close()
+
+    print("✓ Pooled HTTP client passed")
+
+
+
+def test_retries_and_circuit_breaker():
+    """Test jittered retries, the per-host circuit breaker and cache fallback."""
+    print("Testing retries and circuit breaker...")
+
+    api = StandInAPI()
+    base_url = f"{api.base_url}/api"
+    host = api.base_url.split("//")[1]
+    url = f"{base_url}/spells/fireball"
+    api.resources["/api"] = ({"spells": "/api/spells"}, None, None)
+    api.resources["/api/spells/fireball"] = ({"index": "fireball"}, '"v1"', None)
+    configure_client(timeout=2, retry=RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.02),
+                     breakers=CircuitBreakers(failure_threshold=2, reset_seconds=0.3))
+    original_base_url = tools.BASE_URL
+    tools.BASE_URL = base_url
+
+    try:
+        # Transient failures are retried
+        api.failures["/api/spells/fireball"] = 2
+        assert fetch_json(url).data == {"index": "fireball"}
+        assert len(api.requests) == 3
+
+        cache = APICache(ttl_hours=1, persistent=False)
+        cache.set("dnd_item_spells_fireball", {"index": "fireball", "source": "D&D 5e API"})
+
+        # A persistent failure falls back to the cached value
+        api.failures["/api/spells/fireball"] = 100
+        result = fetch_json(url, cache=cache, cache_key="dnd_item_spells_fireball")
+        assert result.stale and result.from_cache and result.status_code == 503
+        assert result.data["index"] == "fireball"
+        assert len(api.requests) == 6
+        assert get_client().get_stats()["circuits"][host]["state"] == "closed"
+
+        # The second failed request opens the circuit; later requests are not sent
+        fetch_json(url, cache=cache, cache_key="dnd_item_spells_fireball")
+        assert get_client().get_stats()["circuits"][host]["state"] == "open"
+        sent = len(api.requests)
+        assert fetch_json(url, cache=cache, cache_key="dnd_item_spells_fireball").stale
+        try:
+            fetch_json(url)
+            assert False, "Expected CircuitOpenError"
+        except CircuitOpenError as e:
+            assert e.host == host
+        assert len(api.requests) == sent
+        assert cache.get_stats()["fallbacks"] == 3
+
+        async def fetch_async():
+            async with AsyncFetcher(cache) as fetcher:
+                return await fetcher.fetch(url, "dnd_item_spells_fireball")
+
+        assert asyncio.run(fetch_async()).stale
+        assert len(api.requests) == sent
+
+        # The health check reports the open circuit
+        app = ToolRecorder()
+        tools.register_tools(app, cache)
+        health = app.tools["check_api_health"]()
+        assert health["resilience"]["circuits"][host]["state"] == "open"
+        assert health["resilience"]["retry"]["attempts"] == 3
+
+        # After the reset timeout a successful trial request closes the circuit
+        api.failures.clear()
+        time.sleep(0.35)
+        assert get_client().get_stats()["circuits"][host]["state"] == "half_open"
+        assert fetch_json(url).status_code == 200
+        assert get_client().get_stats()["circuits"][host]["state"] == "closed"
+    finally:
+        tools.BASE_URL = original_base_url
+        configure_client()
+        api.close()
+
+    print("✓ Retries and circuit breaker passed")
+
+
+def test_stale_fallback_bounds():
+    """Test that fallbacks respect the staleness bound and keep their timestamps."""
+    print("Testing stale fallback bounds...")
+
+    api = StandInAPI()
+    api.resources["/api/spells/sleep"] = ({"index": "sleep"}, None, None)
+    api.failures["/api/spells/sleep"] = 100
+    configure_client(timeout=2, retry=RetryPolicy(attempts=1),
+                     breakers=CircuitBreakers(failure_threshold=100))
+    original_base_url = api_helpers.API_BASE_URL
+    api_helpers.API_BASE_URL = f"{api.base_url}/api"
+
+    try:
+        cache = APICache(ttl_hours=1, persistent=False, max_stale_hours=1)
+        aged = datetime.now() - timedelta(minutes=90)
+        cache.set("dnd_item_spells_sleep", {"index": "sleep", "name": "Sleep"}, timestamp=aged)
+
+        # A failed background refresh serves the stale value without re-stamping it
+        assert api_helpers.fetch_dnd_entity("spells", "sleep", cache=cache)["name"] == "Sleep"
+        deadline = time.time() + 5
+        while "dnd_item_spells_sleep" in cache._inflight and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get_stats()["fallbacks"] == 1
+        assert cache.cache["dnd_item_spells_sleep"][1] == aged
+        assert cache.get("dnd_item_spells_sleep") is None
+
+        # Values past the staleness bound are not served in place of a failure
+        cache.set("dnd_item_spells_sleep", {"index": "sleep"}, timestamp=datetime.now() - timedelta(hours=3))
+        url = f"{api.base_url}/api/spells/sleep"
+        result = fetch_json(url, cache=cache, cache_key="dnd_item_spells_sleep")
+        assert not result.stale and result.status_code == 503
+        assert api_helpers.fetch_dnd_entity("spells", "sleep", cache=cache) == {}
+
+        # A 200 whose body is not JSON is a failure, with the same fallback
+        api.failures.clear()
+        api.resources["/api/spells/sleep"] = (b"<html>Bad gateway</html>", None, None)
+        cache.set("dnd_item_spells_sleep", {"index": "sleep"}, timestamp=aged)
+        result = fetch_json(url, cache=cache, cache_key="dnd_item_spells_sleep")
+        assert result.stale and result.data == {"index": "sleep"}
+        assert asyncio.run(AsyncFetcher(cache).fetch(url, "dnd_item_spells_sleep")).stale
+        result = fetch_json(url)
+        assert not result.ok and result.status_code == 0
+    finally:
+        api_helpers.API_BASE_URL = original_base_url
+        configure_client()
+        api.close()
+
+    print("✓ Stale fallback bounds passed")
+
+
+def test_rate_limiter():
+    """Test the token bucket, the in-flight cap and foreground priority."""
+    print("Testing rate limiter...")
+
+    # The bucket allows a burst, then paces requests at the configured rate
+    limiter = HostLimiter(RateLimit(rate=20, burst=2))
+    start = time.time()
+    for _ in range(6):
+        with limiter.slot():
+            pass
+    assert time.time() - start >= 0.18, "Requests beyond the burst must be paced"
+    assert limiter.to_dict()["requests"] == 6
+
+    # Requests to a host never exceed its in-flight cap
+    api = StandInAPI()
+    api.delay = 0.1
+    api.resources["/api/spells"] = ({"count": 0, "results": []}, None, None)
+    host = api.base_url.split("//")[1]
+    configure_client(limiters=RateLimiters({host: RateLimit(max_in_flight=2)}))
+    try:
+        threads = [threading.Thread(target=fetch_json, args=(f"{api.base_url}/api/spells",))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(api.requests) == 6
+        assert api.max_in_flight == 2
+        stats = get_client().get_stats()["rate_limits"][host]
+        assert stats["requests"] == 6 and stats["in_flight"] == 0 and stats["throttled"] >= 1
+    finally:
+        configure_client()
+        api.close()
+
+    # A waiting foreground request is served before a waiting background request
+    limiter = HostLimiter(RateLimit(max_in_flight=1))
+    order = []
+
+    def request(name):
+        with limiter.slot():
+            order.append(name)
+
+    def background_request():
+        with background_priority():
+            request("background")
+
+    limiter.acquire()
+    background = threading.Thread(target=background_request)
+    background.start()
+    while limiter.to_dict()["waiting_background"] == 0:
+        time.sleep(0.001)
+    foreground = threading.Thread(target=request, args=("foreground",))
+    foreground.start()
+    while limiter.to_dict()["waiting_foreground"] == 0:
+        time.sleep(0.001)
+    limiter.release()
+    background.join()
+    foreground.join()
+    assert order == ["foreground", "background"]
+
+    print("✓ Rate limiter passed")
+
+
+def run_all_tests():
+    """Run all HTTP client tests."""
+    print("=" * 60)
+    print("Running HTTP Client Tests")
+    print("=" * 60)
+
+    test_conditional_revalidation()
+    test_pooled_http_client()
+    test_retries_and_circuit_breaker()
+    test_stale_fallback_bounds()
+    test_rate_limiter()
+
+    print("=" * 60)
+    print("All HTTP client tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
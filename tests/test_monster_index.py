@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the monster facet index.
+"""
+
+import os
+import sys
+import random
+
+# Allow running this file directly (python tests/test_monster_index.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+from src.core.cache_keys import category_items_key, category_summaries_key, item_key
+from src.core import prompts
+from src.core.monster_index import MonsterFacetIndex, MonsterFacets
+from src.core.srd_store import SRDStore
+from tests.stand_ins import PromptRecorder, StandInAPI
+
+
+def test_monster_facet_index():
+    """Test combined monster facet filters, spread sampling and the encounter prompt using them."""
+    print("Testing monster facet index...")
+
+    def monster(index, name, cr, type, size, alignment, *environment):
+        return {"index": index, "name": name, "challenge_rating": cr, "type": type, "size": size,
+                "alignment": alignment, "environment": list(environment)}
+
+    monsters = [monster("goblin", "Goblin", 0.25, "humanoid", "Small", "neutral evil", "forest", "hill"),
+                monster("wolf", "Wolf", 0.25, "beast", "Medium", "unaligned", "forest"),
+                monster("ghoul", "Ghoul", 1, "undead", "Medium", "chaotic evil"),
+                monster("owlbear", "Owlbear", 3, "monstrosity", "Large", "unaligned", "forest"),
+                monster("ogre", "Ogre", 2, "giant", "Large", "chaotic evil", "hill", "mountain"),
+                monster("wight", "Wight", 3, "undead", "Medium", "neutral evil", "underdark")]
+    index = MonsterFacetIndex(monsters)
+    assert [m["name"] for m in index.filter(1, 3)] == ["Ghoul", "Ogre", "Owlbear", "Wight"]
+    assert [m["name"] for m in index.filter(type="undead", alignment="evil")] == ["Ghoul", "Wight"]
+    assert [m["name"] for m in index.filter(max_cr=2, size=["small", "large"])] == ["Goblin", "Ogre"]
+    # Untagged monsters (the Ghoul) match any environment
+    assert [m["name"] for m in index.filter(environment="dark forest")] == ["Goblin", "Wolf", "Ghoul", "Owlbear"]
+    assert index.count(2, 3, environment="mountain") == 1
+    assert index.facet_values("size") == {"large": 2, "medium": 3, "small": 1}
+    assert index.filter(4, 30) == [] and index.filter(type="dragon") == []
+
+    # Samples cover every matching challenge rating before repeating one
+    rng = random.Random(7)
+    for _ in range(20):
+        sample = index.sample(3, 0.25, 3, rng=rng)
+        assert len({m["challenge_rating"] for m in sample}) == 3, sample
+    seen = set()
+    for _ in range(50):
+        seen.update(m["name"] for m in index.sample(2, 0, 1, rng=rng))
+    assert seen == {"Goblin", "Wolf", "Ghoul"}, "Sampling must reach every match"
+    assert len(index.sample(10, type="undead")) == 2
+
+    # The encounter prompt samples from the store-backed index without fetching monsters
+    store = SRDStore()
+    store.upsert_many("monsters", monsters)
+    store.mark_loaded("monsters", len(monsters))
+    facets = MonsterFacets(store)
+    assert len(facets.current()) == 6 and facets.current() is facets.current()
+    app = PromptRecorder()
+    cache = APICache(ttl_hours=1, persistent=False)
+    prompts.register_prompts(app, cache, monster_facets=facets)
+    text = app.prompts["encounter_builder"]("4", "4", "medium")[0].content.text
+    suggested = [line for line in text.splitlines() if line.startswith("- ")]
+    assert suggested == ["- Ogre (CR 2, giant)", "- Owlbear (CR 3, monstrosity)", "- Wight (CR 3, undead)"], \
+        suggested
+    assert cache.stats.total("loads") == 0, "Monsters must come from the index"
+
+    # Without a loaded store the index covers the monsters already cached, fetching none
+    cache = APICache(ttl_hours=1, persistent=False)
+    cache.set(category_items_key("monsters"), {"items": [{"index": m["index"]} for m in monsters]})
+    for m in monsters[:2]:
+        cache.set(item_key("monsters", m["index"]), m)
+    facets = MonsterFacets(SRDStore(), cache)
+    assert [m["name"] for m in facets.current().filter()] == ["Goblin", "Wolf"]
+    cache.set(item_key("monsters", "ogre"), monsters[4])
+    assert len(facets.current()) == 3, "Newly cached monsters are picked up"
+    # Bulk-load summaries cover the whole category at once
+    cache.set(category_summaries_key("monsters"), monsters)
+    assert len(facets.current()) == 6
+    assert cache.stats.total("loads") == 0
+    store.close()
+
+    print("✓ Monster facet index passed")
+
+
+def test_monster_facets_cold_start():
+    """Test that an empty index bulk loads the monsters, and the prompt says when it cannot."""
+    print("Testing monster facets on a cold start...")
+
+    api = StandInAPI()
+    monsters = [{"index": "ogre", "name": "Ogre", "challenge_rating": 2, "type": "giant", "size": "Large"},
+                {"index": "wight", "name": "Wight", "challenge_rating": 3, "type": "undead", "size": "Medium"}]
+    available = {"monsters": False}
+    api.graphql = lambda query: ({"data": {"monsters": monsters}} if available["monsters"]
+                                 else {"errors": [{"message": "unavailable"}]})
+    try:
+        # With nothing stored or cached, and the bulk load failing, the prompt says so
+        cache = APICache(ttl_hours=1, persistent=False)
+        facets = MonsterFacets(SRDStore(), cache, graphql_url=f"{api.base_url}/graphql")
+        app = PromptRecorder()
+        prompts.register_prompts(app, cache, monster_facets=facets)
+        text = app.prompts["encounter_builder"]("4", "4", "medium")[0].content.text
+        assert "Monster data is still loading" in text
+        assert not [line for line in text.splitlines() if line.startswith("- ")]
+
+        # Once the bulk load works, the empty index is filled with one request
+        available["monsters"] = True
+        api.requests.clear()
+        text = app.prompts["encounter_builder"]("4", "4", "medium")[0].content.text
+        suggested = [line for line in text.splitlines() if line.startswith("- ")]
+        assert suggested == ["- Ogre (CR 2, giant)", "- Wight (CR 3, undead)"], suggested
+        assert "still loading" not in text
+        assert [path for path, _ in api.requests] == ["/graphql"]
+
+        # A filled index is not loaded again
+        app.prompts["encounter_builder"]("4", "4", "medium")
+        assert len(api.requests) == 1
+    finally:
+        api.close()
+
+    print("✓ Monster facets on a cold start passed")
+
+
+def run_all_tests():
+    """Run all monster index tests."""
+    print("=" * 60)
+    print("Running Monster Index Tests")
+    print("=" * 60)
+
+    test_monster_facet_index()
+    test_monster_facets_cold_start()
+
+    print("=" * 60)
+    print("All monster index tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the full-text search index.
+"""
+
+import os
+import sys
+import asyncio
+import time
+
+# Allow running this file directly (python tests/test_search_index.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+import src.core.tools as tools
+from src.core.search_index import SearchIndex, tokenize
+from src.core.srd_store import SRDStore
+from tests.stand_ins import StandInAPI, ToolRecorder
+
+
+def test_search_index_bm25():
+    """Test BM25 ranking over names, indexes and descriptions, and the search tool using it."""
+    print("Testing BM25 search index...")
+
+    assert tokenize("Tasha's Hideous-Laughter") == ["tashas", "hideous", "laughter"]
+
+    index = SearchIndex()
+    index.add("spells", "fireball", "Fireball", {"desc": ["A bright streak blossoms into an explosion of flame."]})
+    index.add("spells", "fire-bolt", "Fire Bolt", {"desc": ["You hurl a mote of fire."]})
+    index.add("spells", "shield", "Shield", {"desc": ["An invisible barrier of magical force appears."]})
+    index.add("monsters", "fire-giant", "Fire Giant")
+
+    # Prefix matches are found; an exact match in name and description ranks first
+    ranked = [hit.index for hit in index.search(["fire"])]
+    assert ranked[0] == "fire-bolt" and set(ranked) == {"fire-bolt", "fireball", "fire-giant"}, ranked
+    # Description-only matches are found
+    assert [hit.index for hit in index.search(["barrier"])] == ["shield"]
+    assert index.search(["barrier"])[0].fields == ("desc",)
+    assert [hit.index for hit in index.search(["fire"], categories=["monsters"])] == ["fire-giant"]
+    assert not index.has_details("monsters", "fire-giant") and index.has_details("spells", "shield")
+    # Infix queries fall back to substring matches, but only when nothing else matches
+    assert [hit.index for hit in index.search(["ball"])] == ["fireball"]
+    assert [hit.index for hit in index.search(["arrier"])] == ["shield"]
+    assert [hit.index for hit in index.search(["bolt", "ball"])] == ["fire-bolt"]
+
+    # Re-indexing replaces a category's items
+    index.replace_category("spells", [("shield", "Shield", None)], stamp="v2")
+    assert index.stamp("spells") == "v2" and len(index) == 2
+    assert index.search(["barrier"]) == []
+
+    # A large index answers in well under a millisecond per query
+    index = SearchIndex()
+    for i in range(3000):
+        index.add("monsters", f"monster-{i}", f"Monster {i}",
+                  {"desc": [f"A creature of the deep woods number {i} with venomous fangs"]})
+    index.search(["venom"])
+    start = time.perf_counter()
+    for _ in range(20):
+        index.search(["creature", "woods"], limit=10)
+    assert (time.perf_counter() - start) / 20 < 0.05
+
+    # The search tool ranks stored categories from the index without any request
+    api = StandInAPI()
+    api.resources["/api"] = ({"spells": "/api/spells"}, None, None)
+    original_base_url = tools.BASE_URL
+    tools.BASE_URL = f"{api.base_url}/api"
+    store = SRDStore()
+    try:
+        store.upsert_many("spells", [
+            {"index": "shield", "name": "Shield", "desc": ["An invisible barrier of magical force."]},
+            {"index": "wall-of-force", "name": "Wall of Force", "desc": ["An invisible wall springs into existence."]}])
+        store.mark_loaded("spells", 2)
+        app = ToolRecorder()
+        tools.register_tools(app, APICache(ttl_hours=1, persistent=False), store=store)
+        search = app.tools["search_all_categories"]
+
+        result = asyncio.run(search("invisible barrier"))
+        assert [match["index"] for match in result["top_results"]] == ["shield", "wall-of-force"]
+        assert [path for path, _ in api.requests] == ["/api"], "Only the category root may be fetched"
+        api.requests.clear()
+        asyncio.run(search("barrier"))
+        assert api.requests == []
+        result = asyncio.run(search("force"))
+        assert {match["index"] for match in result["top_results"]} == {"shield", "wall-of-force"}
+        result = asyncio.run(search("orce"))
+        assert {match["index"] for match in result["top_results"]} == {"shield", "wall-of-force"}
+    finally:
+        tools.BASE_URL = original_base_url
+        store.close()
+        api.close()
+
+    print("✓ BM25 search index passed")
+
+
+def run_all_tests():
+    """Run all search index tests."""
+    print("=" * 60)
+    print("Running Search Index Tests")
+    print("=" * 60)
+
+    test_search_index_bm25()
+
+    print("=" * 60)
+    print("All search index tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Test script for the local SRD store.
+
+This script tests ingesting SRD categories into SQLite and the tools
+answering from the store.
+"""
+
+import os
+import sys
+import asyncio
+import socket
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Allow running this file directly (python tests/test_srd_store.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.cache import APICache
+import src.core.tools as tools
+from src.core.http_client import configure_client
+from src.core.resilience import RetryPolicy
+from src.core.srd_store import SRDStore, cost_in_copper, ingest, ingest_category
+from tests.stand_ins import StandInAPI, ToolRecorder
+
+
+def test_srd_store_ingestion():
+    """Test ingesting SRD categories into the SQLite store and querying it from the tools."""
+    print("Testing SRD store ingestion...")
+
+    api = StandInAPI()
+    base_url = f"{api.base_url}/api"
+    api.resources["/api"] = ({"spells": "/api/spells", "equipment": "/api/equipment",
+                              "monsters": "/api/monsters"}, None, None)
+    spells = [{"index": "fire-bolt", "name": "Fire Bolt", "level": 0, "school": {"name": "Evocation"}},
+              {"index": "fireball", "name": "Fireball", "level": 3, "school": {"name": "Evocation"}},
+              {"index": "sleep", "name": "Sleep", "level": 1, "school": {"name": "Enchantment"}}]
+    equipment = [{"index": "torch", "name": "Torch", "cost": {"quantity": 1, "unit": "cp"}, "properties": []},
+                 {"index": "rope", "name": "Rope", "cost": {"quantity": 1, "unit": "gp"}, "properties": []},
+                 {"index": "plate", "name": "Plate", "cost": {"quantity": 1500, "unit": "gp"},
+                  "armor_class": {"base": 18}}]
+    # GraphQL summaries are partial records
+    summaries = [{key: item[key] for key in ("index", "name", "cost")} for item in equipment]
+    for category, items in [("spells", spells), ("equipment", equipment)]:
+        api.resources[f"/api/{category}"] = ({"results": [{"index": item["index"], "name": item["name"]}
+                                                          for item in items]}, None, None)
+        for item in items:
+            api.resources[f"/api/{category}/{item['index']}"] = (item, None, None)
+    # The monster list has an item the API cannot return
+    api.resources["/api/monsters"] = ({"results": [{"index": "goblin", "name": "Goblin"},
+                                                   {"index": "ghost", "name": "Ghost"}]}, None, None)
+    api.resources["/api/monsters/goblin"] = ({"index": "goblin", "name": "Goblin", "challenge_rating": 0.25,
+                                              "type": "humanoid", "size": "Small"}, None, None)
+    api.graphql = lambda query: ({"data": {"equipments": summaries}} if "equipments(" in query
+                                 else {"errors": [{"message": "unavailable"}]})
+
+    temp_dir = tempfile.mkdtemp()
+    original_base_url = tools.BASE_URL
+    tools.BASE_URL = base_url
+    try:
+        assert cost_in_copper({"quantity": 2, "unit": "sp"}) == 20
+        assert cost_in_copper({"quantity": 1, "unit": "pp"}) == 1000
+
+        db_path = os.path.join(temp_dir, "srd.sqlite3")
+        cache = APICache(ttl_hours=1, persistent=False)
+        store = SRDStore(db_path)
+        counts = ingest(store, cache, base_url=base_url, graphql_url=f"{api.base_url}/graphql")
+        assert counts == {"spells": 3, "equipment": 3, "monsters": 1}, counts
+        assert ("/api/equipment" not in [path for path, _ in api.requests]), \
+            "The equipment listing must come from the GraphQL bulk load"
+        assert len(cache.get("dnd_summaries_equipment")) == 3
+        assert store.get("equipment", "plate")["armor_class"] == {"base": 18}, \
+            "The store must hold complete REST records, not summaries"
+        assert store.is_loaded("spells") and store.is_loaded("equipment")
+        assert not store.is_loaded("monsters"), "A partly ingested category must not be marked loaded"
+
+        # Typed, indexed queries
+        assert [s["index"] for s in store.spells(0, 3, "evoc")] == ["fire-bolt", "fireball"]
+        assert [e["index"] for e in store.equipment(max_cost_cp=100)] == ["torch", "rope"]
+        assert store.get("Spells", "Fireball")["level"] == 3
+        assert store.listing("equipment")["count"] == 3
+        store.close()
+
+        # The store persists, and the tools query it instead of the API
+        store = SRDStore(db_path)
+        assert store.count() == 7 and store.is_loaded("spells")
+        app = ToolRecorder()
+        tools.register_tools(app, APICache(ttl_hours=1, persistent=False), store=store)
+        api.requests.clear()
+        spells_result = app.tools["filter_spells_by_level"](min_level=1, max_level=9)
+        assert [s["name"] for s in spells_result["items"]] == ["Sleep", "Fireball"]
+        cheap = app.tools["search_equipment_by_cost"](max_cost=10, cost_unit="sp")
+        assert [e["name"] for e in cheap["items"]] == ["Torch", "Rope"]
+        assert api.requests == [], "Loaded categories must not touch the network"
+
+        # Categories not fully ingested still fall back to the API
+        monsters = app.tools["find_monsters_by_challenge_rating"](min_cr=0, max_cr=1)
+        assert [m["name"] for m in monsters["items"]] == ["Goblin"]
+        assert api.requests
+        store.close()
+    finally:
+        tools.BASE_URL = original_base_url
+        api.close()
+        shutil.rmtree(temp_dir)
+
+    print("✓ SRD store ingestion passed")
+
+
+def test_srd_store_refresh():
+    """Test that stale categories are re-ingested and old store versions are rebuilt."""
+    print("Testing SRD store refresh...")
+
+    api = StandInAPI()
+    base_url = f"{api.base_url}/api"
+    api.resources["/api/spells"] = ({"results": [{"index": "sleep", "name": "Sleep"}]}, None, None)
+    api.resources["/api/spells/sleep"] = ({"index": "sleep", "name": "Sleep", "level": 1}, None, None)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # A store written by an older version (here with a partial row) is rebuilt
+        db_path = os.path.join(temp_dir, "srd.sqlite3")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE items (category TEXT, idx TEXT, name TEXT, data TEXT, updated TEXT)")
+        conn.execute("INSERT INTO items VALUES ('spells', 'sleep', 'Sleep', '{}', '2024-01-01')")
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        conn.close()
+        store = SRDStore(db_path)
+        assert store.count() == 0 and store.get("spells", "sleep") is None
+
+        cache = APICache(ttl_hours=1, persistent=False)
+        assert ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None) == {"spells": 1}
+        assert store.is_fresh("spells")
+
+        # Fresh categories are skipped without touching the cache or the network
+        api.requests.clear()
+        assert ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None) == {"spells": 1}
+        assert api.requests == []
+
+        # Once the loaded marker is older than max_age, expired entries are fetched and re-stored
+        store.max_age = timedelta(0)
+        assert not store.is_fresh("spells") and store.is_loaded("spells")
+        api.resources["/api/spells/sleep"] = ({"index": "sleep", "name": "Sleep", "level": 1,
+                                               "ritual": True}, None, None)
+        cache.set("dnd_item_spells_sleep", cache.get("dnd_item_spells_sleep"),
+                  timestamp=datetime.now() - timedelta(hours=2))
+        loaded_before = store.loaded_at("spells")
+        ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None)
+        assert store.get("spells", "sleep")["ritual"] is True
+        assert store.loaded_at("spells") > loaded_before
+
+        # Items the API revalidates with 304 Not Modified are re-cached and count as current;
+        # the stale window keeps the expired entry (and its validators) around to revalidate
+        cache = APICache(ttl_hours=1, persistent=False, max_stale_hours=24)
+        api.resources["/api/spells/sleep"] = ({"index": "sleep", "name": "Sleep", "level": 1,
+                                               "ritual": True}, '"v2"', None)
+        cache.set("dnd_item_spells_sleep", cache.get("dnd_item_spells_sleep"),
+                  timestamp=datetime.now() - timedelta(hours=2))
+        ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None)
+        cache.set("dnd_item_spells_sleep", cache.get("dnd_item_spells_sleep"),
+                  timestamp=datetime.now() - timedelta(hours=2))
+        api.requests.clear()
+        loaded_before = store.loaded_at("spells")
+        ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None)
+        assert [headers.get("If-None-Match") for path, headers in api.requests
+                if path == "/api/spells/sleep"] == ['"v2"']
+        assert cache.get("dnd_item_spells_sleep")["ritual"] is True
+        assert store.loaded_at("spells") > loaded_before
+
+        # Items a refreshed listing no longer has are removed from the store
+        api.resources["/api/spells"] = ({"results": [{"index": "shield", "name": "Shield"}]}, None, None)
+        api.resources["/api/spells/shield"] = ({"index": "shield", "name": "Shield", "level": 1,
+                                                "classes": [{"index": "wizard", "name": "Wizard"}]}, None, None)
+        cache = APICache(ttl_hours=1, persistent=False)
+        assert ingest(store, cache, ["spells"], base_url=base_url, graphql_url=None, force=True) == {"spells": 1}
+        assert store.get("spells", "sleep") is None and store.count("spells") == 1
+        assert [spell["index"] for spell in store.spells(0, 9)] == ["shield"]
+
+        # Ingestion can be called from a running event loop, such as an async tool's
+        async def ingest_from_loop():
+            return ingest_category(store, APICache(ttl_hours=1, persistent=False), "spells",
+                                   base_url=base_url, graphql_url=None, force=True)
+
+        assert asyncio.run(ingest_from_loop()) == 1
+
+        # Offline with a cold cache, ingestion reports nothing loaded instead of raising
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            offline_url = f"http://127.0.0.1:{unused.getsockname()[1]}/api"
+        configure_client(retry=RetryPolicy(attempts=1))
+        assert ingest(store, APICache(ttl_hours=1, persistent=False), base_url=offline_url,
+                      graphql_url=None) == {}
+        store.close()
+    finally:
+        configure_client()
+        api.close()
+        shutil.rmtree(temp_dir)
+
+    print("✓ SRD store refresh passed")
+
+
+def run_all_tests():
+    """Run all SRD store tests."""
+    print("=" * 60)
+    print("Running SRD Store Tests")
+    print("=" * 60)
+
+    test_srd_store_ingestion()
+    test_srd_store_refresh()
+
+    print("=" * 60)
+    print("All SRD store tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()